@@ -101,6 +101,7 @@ class Config:
 
     kt_actor_idname = operators + '.actor'
     kt_bake_wireframe_sequence_idname = operators + '.bake_wireframe_sequence'
+    kt_export_point_cache_idname = operators + '.export_point_cache'
 
     kt_move_wrapper_idname = operators + '.move_wrapper'
     kt_pan_detector_idname = operators + '.pan_detector'
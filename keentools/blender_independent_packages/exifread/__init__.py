@@ -16,12 +16,16 @@ def increment_base(data, base):
     return ord_(data[base + 2]) * 256 + ord_(data[base + 3]) + 2
 
 
-def process_file(f, stop_tag=DEFAULT_STOP_TAG, details=True, strict=False, debug=False):
+def process_file(f, stop_tag=DEFAULT_STOP_TAG, details=True, strict=False, debug=False,
+                 tag_whitelist=None):
     """
     Process an image file (expects an open file object).
 
     This is the function that has to deal with all the arbitrary nasty bits
     of the EXIF standard.
+
+    With tag_whitelist (a set of tag ids) only these tags of the first IFD
+    and of the EXIF SubIFD are decoded, other IFDs are skipped.
     """
 
     # by default do not fake an EXIF beginning
@@ -188,11 +192,14 @@ def process_file(f, stop_tag=DEFAULT_STOP_TAG, details=True, strict=False, debug
         'd': 'XMP/Adobe unknown'
     }[endian])
 
-    hdr = ExifHeader(f, endian, offset, fake_exif, strict, debug, details)
+    hdr = ExifHeader(f, endian, offset, fake_exif, strict, debug, details,
+                     tag_whitelist)
     ifd_list = hdr.list_ifd()
     thumb_ifd = False
     ctr = 0
     for ifd in ifd_list:
+        if tag_whitelist is not None and ctr > 0:
+            break
         if ctr == 0:
             ifd_name = 'Image'
         elif ctr == 1:
@@ -51,7 +51,7 @@ class ExifHeader:
     """
 
     def __init__(self, file, endian, offset, fake_exif, strict,
-                 debug=False, detailed=True):
+                 debug=False, detailed=True, tag_whitelist=None):
         self.file = file
         self.endian = endian
         self.offset = offset
@@ -59,6 +59,8 @@ class ExifHeader:
         self.strict = strict
         self.debug = debug
         self.detailed = detailed
+        # When set, only tags with these ids are decoded
+        self.tag_whitelist = tag_whitelist
         self.tags = {}
 
     def s2n(self, offset, length, signed=0):
@@ -131,6 +133,8 @@ class ExifHeader:
             # entry is index of start of this IFD in the file
             entry = ifd + 2 + 12 * i
             tag = self.s2n(entry, 2)
+            if self.tag_whitelist is not None and tag not in self.tag_whitelist:
+                continue
 
             # get tag name early to avoid errors, help debug
             tag_entry = tag_dict.get(tag)
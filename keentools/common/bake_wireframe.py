@@ -11,7 +11,7 @@ from ..utils.bpy_common import (bpy_context,
                                 bpy_set_current_frame,
                                 bpy_render_frame,
                                 bpy_timer_register)
-from ..utils.mesh_builder import build_geo
+from ..utils.mesh_builder import get_cached_geo
 from ..utils.images import (create_compatible_bpy_image,
                             assign_pixels_data,
                             remove_bpy_image)
@@ -60,67 +60,46 @@ def get_wireframer():
     return _wireframer
 
 
-def bake_generator(area: Area, geotracker: Any, filepath_pattern: str,
-                   *, file_format: str = 'PNG', frames: List[int],
-                   digits: int = 4, product: int) -> Any:
-    def _finish():
-        settings.stop_calculating()
-        revert_default_screen_message(unregister=not settings.pinmode,
-                                      product=product)
-        if tex is not None:
-            remove_bpy_image(tex)
-        if not settings.pinmode:
-            settings.viewport_state.show_ui_elements(area)
-            exit_area_localview(area)
-        settings.user_interrupts = True
-        total_redraw_ui()
-
-    delta = 0.001
-    settings = get_settings(product)
-    settings.start_calculating('REPROJECT')
-
-    single_line_screen_message('Wireframe baking… Please wait',
-                               product=product)
-
-    tex = None
-    total_frames = len(frames)
-    for num, frame in enumerate(frames):
-        if settings.user_interrupts:
-            _finish()
-            return None
-
-        texture_projection_screen_message(num + 1, total_frames, product=product)
-
-        settings.user_percent = 100 * num / total_frames
-        bpy_set_current_frame(frame)
-
-        yield delta
+class WireframeBakeContext:
+    ''' Offscreen buffer and wireframe batches kept for the whole bake.
+        Batches are rebuilt only when get_cached_geo returns another geo
+        (deformed mesh) or the object scale changes, other per-frame
+        changes are matrices passed as uniforms. '''
+    def __init__(self, width: int, height: int):
+        self.width: int = width
+        self.height: int = height
+        self.offscreen: Optional[Any] = gpu.types.GPUOffScreen(width, height)
+        self.wireframer: LitWireframeRenderer = get_wireframer()
+        self.wireframer.viewport_size = (width, height)
+        self._geo: Optional[Any] = None
+        self._scale: Optional[Tuple] = None
+
+    def update_geometry(self, geomobj: Object, loader: Any) -> None:
+        geo = get_cached_geo(geomobj, get_uv=True)
+        scale = tuple(geomobj.matrix_world.to_scale())
+        if geo is self._geo and scale == self._scale:
+            return
+        _log.output('WireframeBakeContext: update batches')
+        wireframer = self.wireframer
+        wireframer.init_geom_data_from_mesh(geomobj)
+        wireframer.init_geom_data_from_core(*loader.get_geo_shader_data(
+            geo, geomobj.matrix_world))
+        wireframer.create_batches()
+        self._geo = geo
+        self._scale = scale
 
-        rx, ry = bpy_render_frame()
-        offscreen = gpu.types.GPUOffScreen(rx, ry)
+    def render(self, camobj: Object, geomobj: Object) -> Any:
+        rx, ry = self.width, self.height
         context = bpy_context()
-        camobj = geotracker.camobj
-        geomobj = geotracker.geomobj
         view_matrix = camobj.matrix_world.inverted()
         projection_matrix = camobj.calc_matrix_camera(
             context.evaluated_depsgraph_get(), x=rx, y=ry)
 
-        settings = get_settings(product)
-        loader = settings.loader()
-
-        wireframer = get_wireframer()
-        wireframer.viewport_size = (rx, ry)
-        wireframer.init_geom_data_from_mesh(geomobj)
+        wireframer = self.wireframer
         wireframer.set_object_world_matrix(geomobj.matrix_world)
         wireframer.set_camera_pos(geomobj.matrix_world, camobj.matrix_world)
 
-        geo = build_geo(geomobj, get_uv=True)
-        wireframer.init_geom_data_from_core(*loader.get_geo_shader_data(geo,
-                                            geomobj.matrix_world))
-
-        wireframer.create_batches()
-
-        with offscreen.bind():
+        with self.offscreen.bind():
             set_depth_mask(True)
             set_depth_test('LESS')
             framebuffer = gpu.state.active_framebuffer_get()
@@ -135,18 +114,75 @@ def bake_generator(area: Area, geotracker: Any, filepath_pattern: str,
                 built_texture = np.array(buffer, dtype=np.float32)
             set_depth_mask(False)
             set_depth_test('NONE')
+        return built_texture
 
-        offscreen.free()
+    def free(self) -> None:
+        if self.offscreen is not None:
+            self.offscreen.free()
+            self.offscreen = None
+        self._geo = None
 
-        if tex is None:
-            tex = create_compatible_bpy_image(built_texture)
-        tex.filepath_raw = filepath_pattern.format(str(frame).zfill(digits))
-        tex.file_format = file_format
-        assign_pixels_data(tex.pixels, built_texture.T.ravel() / 255)
-        tex.save()
-        _log.info(f'TEXTURE SAVED: {tex.filepath}')
 
-        yield delta
+def bake_generator(area: Area, geotracker: Any, filepath_pattern: str,
+                   *, file_format: str = 'PNG', frames: List[int],
+                   digits: int = 4, product: int) -> Any:
+    def _finish():
+        if bake_context is not None:
+            bake_context.free()
+        settings.stop_calculating()
+        revert_default_screen_message(unregister=not settings.pinmode,
+                                      product=product)
+        if tex is not None:
+            remove_bpy_image(tex)
+        if not settings.pinmode:
+            settings.viewport_state.show_ui_elements(area)
+            exit_area_localview(area)
+        settings.user_interrupts = True
+        total_redraw_ui()
+
+    delta = 0.001
+    settings = get_settings(product)
+    settings.start_calculating('REPROJECT')
+    loader = settings.loader()
+
+    single_line_screen_message('Wireframe baking… Please wait',
+                               product=product)
+
+    tex = None
+    bake_context = None
+    total_frames = len(frames)
+    try:
+        for num, frame in enumerate(frames):
+            if settings.user_interrupts:
+                _finish()
+                return None
+
+            texture_projection_screen_message(num + 1, total_frames,
+                                              product=product)
+
+            settings.user_percent = 100 * num / total_frames
+            bpy_set_current_frame(frame)
+
+            yield delta
+
+            if bake_context is None:
+                bake_context = WireframeBakeContext(*bpy_render_frame())
+            bake_context.update_geometry(geotracker.geomobj, loader)
+            built_texture = bake_context.render(geotracker.camobj,
+                                                geotracker.geomobj)
+
+            if tex is None:
+                tex = create_compatible_bpy_image(built_texture)
+            tex.filepath_raw = filepath_pattern.format(str(frame).zfill(digits))
+            tex.file_format = file_format
+            assign_pixels_data(tex.pixels, built_texture.T.ravel() / 255)
+            tex.save()
+            _log.info(f'TEXTURE SAVED: {tex.filepath}')
+
+            yield delta
+    finally:
+        if bake_context is not None:
+            bake_context.free()
 
     _finish()
     return None
@@ -207,6 +207,13 @@ class COMMON_FB_PT_ViewsPanel:
         self._draw_add_images_button(headnum, common_col,
                                      scale=Config.btn_scale_y, icon='ADD')
 
+        if not settings.pinmode:
+            col = layout.column(align=True)
+            col.scale_y = Config.btn_scale_y
+            op = col.operator(FBConfig.fb_auto_align_all_idname,
+                              **KTIcons.key_value('align_face'))
+            op.headnum = headnum
+
     def _draw_add_images_button(self, headnum, layout, scale=2.0,
                                 icon='OUTLINER_OB_IMAGE'):
         col = layout.column(align=True)
@@ -0,0 +1,248 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+# KeenTools for blender is a blender addon for using KeenTools in Blender.
+# Copyright (C) 2024 KeenTools
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ##### END GPL LICENSE BLOCK #####
+
+import os
+import struct
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from ..utils.kt_logging import KTLogger
+from ..addon_config import Config, ProductType, get_settings, get_operator
+from ..utils.bpy_common import (bpy_current_frame,
+                                bpy_set_current_frame,
+                                bpy_scene,
+                                bpy_timer_register,
+                                bpy_progress_begin,
+                                bpy_progress_end,
+                                bpy_progress_update)
+from ..utils.coords import get_obj_verts, multiply_verts_on_matrix_4x4
+from ..tracker.tracking_blendshapes import tracked_frame_vertices
+from ..tracker.vertex_cache import uses_vertex_cache, facetracker_vertex_cache
+from ..geotracker.utils.prechecks import show_warning_dialog
+
+
+_log = KTLogger(__name__)
+
+
+_export_generator_var: Optional[Any] = None
+
+
+class PointCacheWriter:
+    ''' Writes one frame at a time, so only the current frame is in memory '''
+    def __init__(self, filepath: str, point_count: int, frames: List[int],
+                 fps: float):
+        self.point_count: int = point_count
+        self.frames_written: int = 0
+        self._file: Any = open(filepath, 'wb')
+        try:
+            self._file.write(self.header(frames, fps))
+        except OSError:
+            self._file.close()
+            raise
+
+    def header(self, frames: List[int], fps: float) -> bytes:
+        return b''
+
+    def frame_bytes(self, verts: np.ndarray) -> bytes:
+        return b''
+
+    def write_frame(self, verts: np.ndarray) -> None:
+        assert len(verts) == self.point_count, 'Wrong vertex count'
+        self._file.write(self.frame_bytes(verts))
+        self.frames_written += 1
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+
+class PC2Writer(PointCacheWriter):
+    def header(self, frames: List[int], fps: float) -> bytes:
+        return struct.pack('<12siiffi', b'POINTCACHE2\0', 1, self.point_count,
+                           float(frames[0]), 1.0, len(frames))
+
+    def frame_bytes(self, verts: np.ndarray) -> bytes:
+        return np.ascontiguousarray(verts, dtype='<f4').tobytes()
+
+
+class MDDWriter(PointCacheWriter):
+    def header(self, frames: List[int], fps: float) -> bytes:
+        times = (np.array(frames, dtype=np.float64) - frames[0]) / fps
+        return struct.pack('>ii', len(frames), self.point_count) + \
+            times.astype('>f4').tobytes()
+
+    def frame_bytes(self, verts: np.ndarray) -> bytes:
+        return np.ascontiguousarray(verts, dtype='>f4').tobytes()
+
+
+def create_point_cache_writer(filepath: str, file_format: str,
+                              point_count: int, frames: List[int],
+                              fps: float) -> PointCacheWriter:
+    writer_class = MDDWriter if file_format == 'MDD' else PC2Writer
+    return writer_class(filepath, point_count, frames, fps)
+
+
+class TrackedVerticesSource:
+    ''' Object-space FaceTracker vertices per frame taken from the core.
+        Untracked frames are blended between the nearest tracked ones,
+        only these two neighbours are kept in memory. '''
+    def __init__(self, geomobj: Any, gt: Any, tracked_frames: List[int]):
+        self.geomobj: Any = geomobj
+        self.gt: Any = gt
+        self.frames: List[int] = sorted(tracked_frames)
+        self._loaded: Dict[int, np.ndarray] = {}
+
+    def _frame_vertices(self, frame: int) -> np.ndarray:
+        verts = self._loaded.get(frame)
+        if verts is None:
+            if len(self._loaded) >= 2:
+                oldest = min(self._loaded.keys())
+                del self._loaded[oldest]
+            verts = tracked_frame_vertices(self.geomobj, self.gt, frame)
+            self._loaded[frame] = verts
+        return verts
+
+    def __call__(self, frame: int) -> np.ndarray:
+        if len(self.frames) == 0:
+            return get_obj_verts(self.geomobj)
+        i = bisect_left(self.frames, frame)
+        if i < len(self.frames) and self.frames[i] == frame:
+            return self._frame_vertices(frame)
+        if i == 0:
+            return self._frame_vertices(self.frames[0])
+        if i == len(self.frames):
+            return self._frame_vertices(self.frames[-1])
+        left, right = self.frames[i - 1], self.frames[i]
+        t = (frame - left) / (right - left)
+        return (1.0 - t) * self._frame_vertices(left) + \
+            t * self._frame_vertices(right)
+
+
+def tracked_vertices_source(geotracker: Any, *,
+                            product: int) -> Callable[[int], np.ndarray]:
+    geomobj = geotracker.geomobj
+    if product != ProductType.FACETRACKER:
+        verts = get_obj_verts(geomobj)
+        return lambda frame: verts
+
+    if uses_vertex_cache(geotracker):
+        cache = facetracker_vertex_cache(geotracker)
+        if not cache.is_empty():
+            return cache.vertices_at
+
+    gt = get_settings(product).loader().kt_geotracker()
+    return TrackedVerticesSource(geomobj, gt, gt.track_frames())
+
+
+def export_generator(geotracker: Any, filepath: str, *,
+                     writer: PointCacheWriter,
+                     source: Callable[[int], np.ndarray], frames: List[int],
+                     world_space: bool = True, product: int) -> Any:
+    ''' The writer and the vertex source are created before the timer
+        starts, so only per-frame errors can happen here '''
+    def _finish():
+        writer.close()
+        bpy_progress_end()
+        bpy_set_current_frame(current_frame)
+        settings.stop_calculating()
+        settings.user_interrupts = True
+
+    def _remove_incomplete_file():
+        try:
+            os.remove(filepath)
+        except OSError as err:
+            _log.error(f'Cannot remove incomplete point cache:\n{str(err)}')
+
+    delta = 0.001
+    settings = get_settings(product)
+    settings.start_calculating('EXPORT')
+    current_frame = bpy_current_frame()
+
+    geomobj = geotracker.geomobj
+    total_frames = len(frames)
+    bpy_progress_begin(0, total_frames)
+    for num, frame in enumerate(frames):
+        if settings.user_interrupts:
+            _finish()
+            _log.info(f'Point cache export interrupted: {filepath}')
+            _remove_incomplete_file()
+            return None
+
+        settings.user_percent = 100 * num / total_frames
+        bpy_progress_update(num)
+
+        try:
+            verts = source(frame)
+            if world_space:
+                bpy_set_current_frame(frame)
+                mat = np.array(geomobj.matrix_world,
+                               dtype=np.float32).transpose()
+                verts = multiply_verts_on_matrix_4x4(verts, mat)
+            writer.write_frame(verts)
+        except Exception as err:
+            _log.error(f'export_generator Exception:\n{str(err)}')
+            _finish()
+            _remove_incomplete_file()
+            show_warning_dialog(f'Point cache export failed '
+                                f'at frame {frame}:\n{str(err)}')
+            return None
+
+        yield delta
+
+    _finish()
+    _log.info(f'POINT CACHE SAVED: {filepath} frames: {writer.frames_written}')
+    return None
+
+
+def _export_caller() -> Optional[float]:
+    global _export_generator_var
+    if _export_generator_var is None:
+        return None
+    try:
+        return next(_export_generator_var)
+    except StopIteration:
+        _log.output('Point cache export generator is over')
+    _export_generator_var = None
+    return None
+
+
+def export_point_cache(geotracker: Any, filepath: str, *,
+                       file_format: str = 'PC2', frames: List[int],
+                       world_space: bool = True, product: int) -> None:
+    ''' Raises when the vertex source or the output file cannot be created,
+        nothing is started in that case '''
+    _log.yellow('export_point_cache start')
+    source = tracked_vertices_source(geotracker, product=product)
+    writer = create_point_cache_writer(filepath, file_format,
+                                       len(geotracker.geomobj.data.vertices),
+                                       frames, bpy_scene().render.fps)
+
+    op = get_operator(Config.kt_interrupt_modal_idname)
+    op('INVOKE_DEFAULT', product=product)
+
+    global _export_generator_var
+    _export_generator_var = export_generator(geotracker, filepath,
+                                             writer=writer,
+                                             source=source,
+                                             frames=frames,
+                                             world_space=world_space,
+                                             product=product)
+    bpy_timer_register(_export_caller, first_interval=0.0)
+    _log.output('export_point_cache end >>>')
@@ -39,6 +39,8 @@ from ..utils.ui_redraw import (find_modules_by_name_starting_with,
                                collapse_all_modules,
                                mark_old_modules)
 from ..preferences.hotkeys import all_keymaps_unregister
+from ..utils.materials import (register_bake_image_feed_handler,
+                               unregister_bake_image_feed_handler)
 
 
 _log = KTLogger(__name__)
@@ -169,6 +171,7 @@ def facebuilder_register():
     _log.output('MAIN FACEBUILDER VARIABLE REGISTER')
     add_addon_settings_var(Config.fb_global_var_name, FBSceneSettings)
     _log.output('MAIN FACEBUILDER VARIABLE REGISTERED')
+    register_bake_image_feed_handler()
     _log.green('=== FACEBUILDER REGISTERED ===')
 
 
@@ -185,6 +188,7 @@ def facebuilder_unregister() -> None:
 
     _log.output('FACEBUILDER ADD MESH MENU UNREGISTER')
     VIEW3D_MT_mesh_add.remove(menu_fb_func)
+    unregister_bake_image_feed_handler()
 
     try:
         if check_addon_settings_var_type(Config.fb_global_var_name) == FBSceneSettings:
@@ -28,6 +28,7 @@ from .fbloader import FBLoader
 from ..utils import coords
 from ..utils.manipulate import (get_vertex_groups,
                                 create_vertex_groups)
+from ..utils.materials import invalidate_bake_image_feed
 from ..utils.blendshapes import (restore_facs_blendshapes,
                                  disconnect_blendshapes_action)
 from ..blender_independent_packages.pykeentools_loader import module as pkt_module
@@ -342,6 +343,8 @@ def update_model_scale(head: Any, context: Any) -> None:
 
 
 def update_cam_image(camera: Any, context: Any) -> None:
+    if camera.cam_image:
+        invalidate_bake_image_feed(camera.cam_image)
     FBLoader.update_cam_image_size(camera)
 
 
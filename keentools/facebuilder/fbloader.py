@@ -49,6 +49,7 @@ from ..utils.bpy_common import (bpy_create_object,
                                 bpy_load_image,
                                 bpy_new_mesh)
 from ..utils.fb_wireframe_image import create_wireframe_image
+from ..utils.images import lazy_image_size
 from .prechecks import common_fb_checks
 from ..utils.manipulate import switch_to_camera, center_viewports_on_object
 
@@ -611,7 +612,7 @@ class FBLoader:
         w = 0
         h = 0
         if img is not None:
-            w, h = img.size
+            w, h = lazy_image_size(img)
 
         if w == 0 and h == 0:
             w, h = bpy_render_frame()
@@ -30,6 +30,7 @@ from ...facebuilder_config import FBConfig
 from ..fbloader import FBLoader
 from ..utils.exif_reader import (read_exif_to_camera,
                                  auto_setup_camera_from_exif)
+from ..utils.image_import import import_images
 from ...utils.materials import find_bpy_image_by_name
 from ...utils.blendshapes import load_csv_animation_to_blendshapes
 from ..ui_strings import buttons
@@ -306,44 +307,12 @@ class FB_OT_MultipleFilebrowser(Operator, ImportHelper):
             settings.fix_heads()
             return {'CANCELLED'}
 
-        FBLoader.load_model(self.headnum)
+        if settings.is_calculating():
+            _log.error('Another calculation is in progress')
+            return {'CANCELLED'}
 
-        head = settings.get_head(self.headnum)
-        last_camnum = head.get_last_camnum()
-        _log.output(f'last_camnum: {last_camnum}')
-
-        for f in self.files:
-            try:
-                filepath = os.path.join(self.directory, f.name)
-                _log.output(f'{self.__class__.__name__} IMAGE:\n{filepath}')
-
-                camera = FBLoader.add_new_camera_with_image(self.headnum,
-                                                            filepath)
-                _log.output(f'read_exif_to_camera')
-                read_exif_to_camera(
-                    self.headnum, head.get_last_camnum(), filepath)
-                camera.orientation = camera.exif.orientation
-
-            except RuntimeError as ex:
-                _log.error(f'FILE READ ERROR: {f.name}')
-
-        fb = FBLoader.get_builder()
-        for i, camera in enumerate(head.cameras):
-            if i > last_camnum:
-                _log.output(f'auto_setup_camera_from_exif: {i}')
-                auto_setup_camera_from_exif(camera)
-
-                mode = fb.focal_length_estimation_mode()
-                _log.output(f'focal_length_estimation_mode: {mode}')
-                if mode in ['FB_ESTIMATE_VARYING_FOCAL_LENGTH',
-                            'FB_ESTIMATE_STATIC_FOCAL_LENGTH']:
-                    fb.set_focal_length_at(
-                        camera.get_keyframe(),
-                        camera.get_focal_length_in_pixels_coef() * camera.focal)
-
-                FBLoader.center_geo_camera_projection(self.headnum, i)
-
-        FBLoader.save_fb_serial_and_image_pathes(self.headnum)
+        import_images(self.headnum, self.directory,
+                      [f.name for f in self.files])
         return {'FINISHED'}
 
 
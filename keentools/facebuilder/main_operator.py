@@ -70,6 +70,7 @@ from .facebuilder_acts import (remove_pins_act,
                                reset_expression_act,
                                center_geo_act)
 from .prechecks import common_fb_checks
+from .utils.auto_align import auto_align_all_views
 from .integration import FB_OT_ExportToCC
 from ..preferences.hotkeys import viewport_native_pan_operator_activate
 
@@ -334,6 +335,43 @@ class FB_OT_RemovePins(ButtonOperator, Operator):
         return {'FINISHED'}
 
 
+class FB_OT_AutoAlignAll(Operator):
+    bl_idname = FBConfig.fb_auto_align_all_idname
+    bl_label = buttons[bl_idname].label
+    bl_description = buttons[bl_idname].description
+    bl_options = {'REGISTER', 'INTERNAL'}
+
+    headnum: IntProperty(default=0)
+
+    def draw(self, context):
+        pass
+
+    def execute(self, context):
+        _log.green(f'{self.__class__.__name__} execute')
+        check_status = common_fb_checks(object_mode=True,
+                                        pinmode_out=True,
+                                        is_calculating=True,
+                                        fix_facebuilders=True,
+                                        reload_facebuilder=True,
+                                        head_only=True,
+                                        headnum=self.headnum)
+        if not check_status.success:
+            self.report({'ERROR'}, check_status.error_message)
+            return {'CANCELLED'}
+
+        if not FBLoader.get_builder().is_face_detector_available():
+            message = 'Align face is unavailable on your system ' \
+                      'because Windows 7 doesn\'t support ' \
+                      'ONNX neural network runtime'
+            self.report({'ERROR'}, message)
+            _log.error(message)
+            return {'CANCELLED'}
+
+        auto_align_all_views(self.headnum)
+        _log.output(f'{self.__class__.__name__} execute end >>>')
+        return {'FINISHED'}
+
+
 class FB_OT_WireframeColor(ButtonOperator, Operator):
     bl_idname = FBConfig.fb_wireframe_color_idname
     bl_label = buttons[bl_idname].label
@@ -1193,6 +1231,7 @@ CLASSES_TO_REGISTER = (FB_OT_SelectHead,
                        FB_OT_CenterGeo,
                        FB_OT_Unmorph,
                        FB_OT_RemovePins,
+                       FB_OT_AutoAlignAll,
                        FB_OT_WireframeColor,
                        FB_OT_FilterCameras,
                        FB_OT_ProperViewMenuExec,
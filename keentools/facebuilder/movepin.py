@@ -27,7 +27,6 @@ from ..utils.bpy_common import bpy_background_mode, get_scene_camera_shift
 from ..utils.coords import (get_image_space_coord,
                             image_space_to_frame,
                             update_head_mesh_non_neutral,
-                            nearest_point,
                             point_is_in_area,
                             point_is_in_service_region)
 from ..addon_config import fb_settings
@@ -131,7 +130,7 @@ class FB_OT_MovePin(Operator):
         x, y = get_image_space_coord(mouse_x, mouse_y, area)
 
         pins = vp.pins()
-        nearest, dist2 = nearest_point(x, y, pins.arr())
+        nearest, dist2 = pins.nearest_pin(x, y)
         if nearest >= 0 and dist2 < vp.tolerance_dist2():
             pins.set_current_pin_num(nearest)
             if nearest not in pins.get_selected_pins():
@@ -202,7 +201,7 @@ class FB_OT_MovePin(Operator):
         x, y = get_image_space_coord(mouse_x, mouse_y, area, shift_x, shift_y)
         pins = loader.viewport().pins()
         pin_index = pins.current_pin_num()
-        pins.arr()[pin_index] = (x, y)
+        pins.set_pin_position(pin_index, (x, y))
         selected_pins = pins.get_selected_pins()
 
         if len(selected_pins) == 1:
@@ -31,7 +31,7 @@ from ..facebuilder_config import FBConfig
 from ..utils.coords import update_head_mesh_non_neutral, get_image_space_coord, get_area_region
 from ..utils.focal_length import configure_focal_mode_and_fixes
 from .utils.manipulate import push_head_in_undo_history
-from ..utils.images import load_rgba
+from .utils.auto_align import detect_camera_faces
 from ..utils.bpy_common import bpy_view_camera, operator_with_context
 from ..blender_independent_packages.pykeentools_loader import module as pkt_module
 from .ui_strings import buttons
@@ -44,7 +44,10 @@ from ..utils.detect_faces import (get_detected_faces,
 _log = KTLogger(__name__)
 
 
-def _init_fb_detected_faces(fb: Any, headnum: int, camnum: int) -> Optional[Any]:
+def _init_fb_detected_faces(fb: Any, headnum: int,
+                            camnum: int) -> Optional[Tuple[int, int]]:
+    ''' :return: oriented image size, None for unreadable images.
+        Pixels are decoded only when faces are not cached for the image '''
     _log.yellow('_init_fb_detected_faces start')
     settings = _get_settings()
     head = settings.get_head(headnum)
@@ -53,16 +56,17 @@ def _init_fb_detected_faces(fb: Any, headnum: int, camnum: int) -> Optional[Any]
     camera = head.get_camera(camnum)
     if camera is None:
         return None
-    img = load_rgba(camera)
-    if img is None:
-        return None
-
     fb.set_use_emotions(head.should_use_emotions())
-    pixel_aspect_ratio = fb.pixel_aspect_ratio(camera.get_keyframe())
-    set_detected_faces(fb.detect_faces(img, pixel_aspect_ratio))
+    faces = detect_camera_faces(fb, camera)
+    if faces is None:
+        return None
+    set_detected_faces(faces)
 
+    w, h = camera.get_image_size()
     _log.output('_init_fb_detected_faces end >>>')
-    return img
+    if w <= 0 or h <= 0:
+        return None
+    return (w, h) if camera.orientation % 2 == 0 else (h, w)
 
 
 def _get_settings() -> Any:
@@ -330,8 +334,8 @@ class FB_OT_PickModeStarter(Operator):
             _log.output(f'{self.__class__.__name__} _action 1 cancelled >>>')
             return {'CANCELLED'}
 
-        img = _init_fb_detected_faces(fb, self.headnum, self.camnum)
-        if img is None:
+        image_size = _init_fb_detected_faces(fb, self.headnum, self.camnum)
+        if image_size is None:
             message = 'Face detection failed because of a corrupted image'
             self.report({'INFO'} if self.auto_detect_single else {'ERROR'},
                         message)
@@ -339,7 +343,7 @@ class FB_OT_PickModeStarter(Operator):
             _log.output(f'{self.__class__.__name__} _action 2 cancelled >>>')
             return {'CANCELLED'}
 
-        h, w, _ = img.shape
+        w, h = image_size
         rects = sort_detected_faces()
 
         rectangler = _get_rectangler()
@@ -42,7 +42,6 @@ from ..utils.bpy_common import (operator_with_context,
                                 get_scene_camera_shift)
 from ..utils.coords import (update_head_mesh_non_neutral,
                             get_image_space_coord,
-                            nearest_point,
                             point_is_in_area,
                             point_is_in_service_region,
                             get_area_region,
@@ -187,8 +186,8 @@ class FB_OT_PinMode(Operator):
         pin_index_list.sort()
         for i in reversed(pin_index_list):
             fb.remove_pin(kid, i)
-            pins.remove_pin(i)
             _log.output(f'FB PIN REMOVED {i}')
+        pins.remove_pins(pin_index_list)
 
         if not loader.solve(headnum, camnum):
             _log.error('FB DELETE PIN PROBLEM')
@@ -253,7 +252,7 @@ class FB_OT_PinMode(Operator):
 
         x, y = get_image_space_coord(mouse_x, mouse_y, area)
 
-        nearest, dist2 = nearest_point(x, y, vp.pins().arr())
+        nearest, dist2 = vp.pins().nearest_pin(x, y)
         if nearest >= 0 and dist2 < vp.tolerance_dist2():
             return self._delete_pins([nearest])
 
@@ -290,7 +289,7 @@ class FB_OT_PinMode(Operator):
 
         x, y = get_image_space_coord(mouse_x, mouse_y, area,
                                      *get_scene_camera_shift())
-        nearest, dist2 = nearest_point(x, y, vp.pins().arr())
+        nearest, dist2 = vp.pins().nearest_pin(x, y)
         if nearest >= 0 and dist2 < vp.tolerance_dist2():
             _log.output(f'CHANGE SELECTION PIN FOUND: {nearest}')
             pins.set_current_pin_num(nearest)
@@ -64,7 +64,9 @@ from .callbacks import (update_mesh_with_dialog,
                         update_camera_focal,
                         update_background_tone_mapping)
 from .utils.manipulate import get_current_head
-from ..utils.images import tone_mapping, reset_tone_mapping
+from ..utils.images import (tone_mapping,
+                            reset_tone_mapping,
+                            lazy_image_size)
 from ..utils.viewport_state import ViewportStateItem
 from ..utils.bpy_common import (bpy_render_frame,
                                 bpy_scene,
@@ -200,7 +202,7 @@ class FBCameraItem(PropertyGroup):
         img = self.get_camera_background()
         if img is not None:
             if img.image:
-                return img.image.size
+                return lazy_image_size(img.image)
         return -1, -1
 
     def reset_background_image_rotation(self) -> None:
@@ -289,7 +291,7 @@ class FBCameraItem(PropertyGroup):
         w = -1
         h = -1
         if self.cam_image:
-            w, h = self.cam_image.size
+            w, h = lazy_image_size(self.cam_image)
             self.image_width = w
             self.image_height = h
         return w, h
@@ -801,9 +803,18 @@ class FBSceneSettings(PropertyGroup):
     tmp_headnum: IntProperty(name='Temporary Head Number', default=-1)
     tmp_camnum: IntProperty(name='Temporary Camera Number', default=-1)
 
+    user_interrupts: BoolProperty(name='Interrupted by user',
+                                  default = False)
+    user_percent: FloatProperty(name='Percentage',
+                                subtype='PERCENTAGE',
+                                default=0.0, min=0.0, max=100.0,
+                                precision=1)
+
     calculating_mode: EnumProperty(name='Calculating mode', items=[
         ('NONE', 'NONE', 'No calculation mode', 0),
         ('TEXTURE_BAKING', 'TEXTURE_BAKING', 'Project and bake texture is calculating', 1),
+        ('IMAGE_IMPORT', 'IMAGE_IMPORT', 'Images are importing', 2),
+        ('AUTO_ALIGN', 'AUTO_ALIGN', 'All views are auto aligning', 3),
     ])
 
     selection_mode: BoolProperty(name='Selection mode', default=False)
@@ -92,6 +92,10 @@ buttons = {
         'FaceBuilder Pick Face mode starter',
         'Auto align mesh in current view'
     ),
+    FBConfig.fb_auto_align_all_idname: Button(
+        'Auto Align All Views',
+        'Detect faces and auto align mesh in all views'
+    ),
     FBConfig.fb_pinmode_idname: Button(
         'FaceBuilder Pinmode',
         'Operator for in-Viewport drawing'
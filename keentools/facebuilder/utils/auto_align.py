@@ -0,0 +1,168 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+# KeenTools for blender is a blender addon for using KeenTools in Blender.
+# Copyright (C) 2024 KeenTools
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ##### END GPL LICENSE BLOCK #####
+
+import os
+from typing import Any, List, Optional, Tuple
+
+from ...utils.kt_logging import KTLogger
+from ...addon_config import (Config,
+                             ErrorType,
+                             ProductType,
+                             fb_settings,
+                             get_operator)
+from ...blender_independent_packages.pykeentools_loader import module as pkt_module
+from ...utils.bpy_common import (bpy_abspath,
+                                 bpy_timer_register,
+                                 bpy_progress_begin,
+                                 bpy_progress_end,
+                                 bpy_progress_update)
+from ...utils.images import load_rgba
+from ...utils.coords import update_head_mesh_non_neutral
+from ...utils.focal_length import configure_focal_mode_and_fixes
+from ...utils.detect_faces import (get_cached_detected_faces,
+                                   cache_detected_faces,
+                                   largest_face_index)
+from .manipulate import push_head_in_undo_history
+
+
+_log = KTLogger(__name__)
+
+
+_auto_align_generator_var: Optional[Any] = None
+
+
+def _detected_faces_key(camera: Any,
+                        pixel_aspect_ratio: float) -> Optional[Tuple]:
+    ''' Built without decoding the image, None for images edited in memory '''
+    img = camera.cam_image
+    if img is None or img.is_dirty:
+        return None
+    filepath = bpy_abspath(img.filepath) if img.filepath else ''
+    mtime = os.path.getmtime(filepath) \
+        if filepath != '' and os.path.exists(filepath) else None
+    packed_size = img.packed_file.size if img.packed_file else 0
+    return (img.name, filepath, mtime, packed_size, camera.orientation,
+            pixel_aspect_ratio)
+
+
+def detect_camera_faces(fb: Any, camera: Any,
+                        img: Optional[Any] = None) -> Optional[List[Any]]:
+    ''' Face detection on the camera image, repeated calls for the same
+        image return the cached result. None when the image is unreadable '''
+    pixel_aspect_ratio = fb.pixel_aspect_ratio(camera.get_keyframe())
+    key = _detected_faces_key(camera, pixel_aspect_ratio)
+    if key is not None:
+        faces = get_cached_detected_faces(key)
+        if faces is not None:
+            _log.output(f'detect_camera_faces cached: {len(faces)}')
+            return faces
+
+    if img is None:
+        img = load_rgba(camera)
+        if img is None:
+            return None
+    faces = fb.detect_faces(img, pixel_aspect_ratio)
+    if key is not None:
+        cache_detected_faces(key, faces)
+    return faces
+
+
+def auto_align_generator(headnum: int) -> Any:
+    ''' Detects faces in all views of the head and aligns the mesh
+        with the largest face found in each view '''
+    def _finish():
+        if aligned > 0:
+            update_head_mesh_non_neutral(fb, head)
+        loader.update_all_camera_positions(headnum)
+        loader.update_all_camera_focals(headnum)
+        loader.save_fb_serial_and_image_pathes(headnum)
+        if aligned > 0:
+            push_head_in_undo_history(head, 'Auto align all views')
+        bpy_progress_end()
+        settings.stop_calculating()
+        settings.user_interrupts = True
+
+    delta = 0.001
+    settings = fb_settings()
+    settings.start_calculating('AUTO_ALIGN')
+    loader = settings.loader()
+    head = settings.get_head(headnum)
+    fb = loader.get_builder()
+    fb.set_use_emotions(head.should_use_emotions())
+    configure_focal_mode_and_fixes(fb, head)
+
+    aligned = 0
+    total_views = len(head.cameras)
+    bpy_progress_begin(0, total_views)
+    for camnum in range(total_views):
+        if settings.user_interrupts:
+            _log.info(f'Auto align interrupted: {camnum}/{total_views}')
+            _finish()
+            return None
+
+        settings.user_percent = 100 * camnum / total_views
+        bpy_progress_update(camnum)
+        camera = head.get_camera(camnum)
+        kid = camera.get_keyframe()
+        try:
+            faces = detect_camera_faces(fb, camera)
+            index = -1 if faces is None else largest_face_index(faces)
+            if index >= 0 and fb.detect_face_pose(kid, faces[index]):
+                fb.remove_pins(kid)
+                fb.add_preset_pins_and_solve(kid)
+                aligned += 1
+            else:
+                _log.output(f'auto align failed kid: {kid}')
+        except pkt_module().UnlicensedException as err:
+            _log.error(f'UnlicensedException auto_align_generator\n{str(err)}')
+            warn = get_operator(Config.kt_warning_idname)
+            warn('INVOKE_DEFAULT', msg=ErrorType.NoFaceBuilderLicense)
+            _finish()
+            return None
+        except Exception as err:
+            _log.error(f'auto_align_generator Exception:\n{str(err)}')
+        loader.update_camera_pins_count(headnum, camnum)
+
+        yield delta
+
+    _finish()
+    _log.info(f'AUTO ALIGNED VIEWS: {aligned}/{total_views}')
+    return None
+
+
+def _auto_align_caller() -> Optional[float]:
+    global _auto_align_generator_var
+    if _auto_align_generator_var is None:
+        return None
+    try:
+        return next(_auto_align_generator_var)
+    except StopIteration:
+        _log.output('Auto align generator is over')
+    _auto_align_generator_var = None
+    return None
+
+
+def auto_align_all_views(headnum: int) -> None:
+    _log.yellow('auto_align_all_views start')
+    op = get_operator(Config.kt_interrupt_modal_idname)
+    op('INVOKE_DEFAULT', product=ProductType.FACEBUILDER)
+
+    global _auto_align_generator_var
+    _auto_align_generator_var = auto_align_generator(headnum)
+    bpy_timer_register(_auto_align_caller, first_interval=0.0)
+    _log.output('auto_align_all_views end >>>')
@@ -18,12 +18,15 @@
 
 from typing import Optional, Any, Tuple, Dict
 import os
+import json
+import hashlib
 
 from ...blender_independent_packages.exifread import process_file
 from ...blender_independent_packages.exifread import \
     DEFAULT_STOP_TAG, FIELD_TYPES
 
 from ...utils.kt_logging import KTLogger
+from ...utils.images import lazy_image_size
 from ...addon_config import fb_settings
 from ...facebuilder_config import FBConfig
 
@@ -56,7 +59,7 @@ def _get_safe_exif_param_num(p: str, data: Dict) -> Optional[float]:
 
 def _get_safe_exif_param_str(p: str, data: Dict) -> Optional[str]:
     if data is not None and p in data.keys():
-        return data[p]
+        return str(data[p])
     return None
 
 
@@ -117,13 +120,90 @@ def get_sensor_size_35mm_equivalent(head: Any) -> Tuple[float, float]:
     return w, h
 
 
+# Only the tags used by FaceBuilder are decoded
+_exif_tag_whitelist = frozenset([
+    0x0100,  # ImageWidth
+    0x0101,  # ImageLength
+    0x010F,  # Make
+    0x0110,  # Model
+    0x0112,  # Orientation
+    0x8769,  # ExifOffset
+    0x920A,  # FocalLength
+    0xA002,  # ExifImageWidth
+    0xA003,  # ExifImageLength
+    0xA20E,  # FocalPlaneXResolution
+    0xA20F,  # FocalPlaneYResolution
+    0xA210,  # FocalPlaneResolutionUnit
+    0xA405,  # FocalLengthIn35mmFilm
+])
+_exif_cache_version: int = 1
+
+
+def _exif_cache_entry(filepath: str) -> Optional[Tuple[str, Dict]]:
+    ''' :return: cache file path and the key of the current file state '''
+    try:
+        abspath = os.path.abspath(str(filepath))
+        stat = os.stat(abspath)
+    except OSError:
+        return None
+    key = {'version': _exif_cache_version, 'path': abspath,
+           'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+    name = hashlib.blake2b(abspath.encode('utf-8'),
+                           digest_size=16).hexdigest()
+    return os.path.join(FBConfig.exif_cache_folder, f'{name}.json'), key
+
+
+def _load_cached_exif(cache_path: str, key: Dict) -> Optional[Dict]:
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get('key') != key:
+        return None
+    return cached.get('exif')
+
+
+def _save_cached_exif(cache_path: str, key: Dict, exif: Dict) -> None:
+    ''' Written through a temporary file, so concurrent readers
+        never see a partial record '''
+    tmp_path = f'{cache_path}.{os.getpid()}.{id(exif)}.tmp'
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'exif': exif}, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as err:
+        _log.error(f'EXIF cache is not saved: {cache_path}\n{str(err)}')
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
 def _read_exif(filepath: str) -> Dict:
+    ''' Parsed EXIF is kept on disk until the file size or mtime change '''
+    cache_entry = _exif_cache_entry(filepath)
+    if cache_entry is not None:
+        exif = _load_cached_exif(*cache_entry)
+        if exif is not None:
+            _log.output(f'EXIF from cache: {filepath}')
+            return {'filepath': os.path.basename(filepath), **exif}
+
+    exif = _parse_exif(filepath)
+    if cache_entry is not None and exif['status']:
+        _save_cached_exif(*cache_entry, exif)
+    return {'filepath': os.path.basename(filepath), **exif}
+
+
+def _parse_exif(filepath: str) -> Dict:
     status = False
     try:
         with open(str(filepath), 'rb') as img_file:
             data = process_file(img_file, stop_tag=DEFAULT_STOP_TAG,
-                                details=True, strict=False,
-                                debug=False)
+                                details=False, strict=False,
+                                debug=False,
+                                tag_whitelist=_exif_tag_whitelist)
             status = True
 
         # This call is needed only for full EXIF review
@@ -134,7 +214,6 @@ def _read_exif(filepath: str) -> Dict:
         data = None
 
     return {
-        'filepath': os.path.basename(filepath),
         'exif_focal': _get_safe_exif_param_num('EXIF FocalLength', data),
         'exif_focal35mm': _get_safe_exif_param_num(
             'EXIF FocalLengthIn35mmFilm', data),
@@ -261,7 +340,7 @@ def _exif_sizes_message(headnum: int, image: Any) -> str:
         rw = -1
         rh = -1
     else:
-        rw, rh = image.size
+        rw, rh = lazy_image_size(image)
 
     iw = head.exif.image_width
     ih = head.exif.image_length
@@ -326,14 +405,21 @@ def reload_all_camera_exif(headnum: int) -> None:
     _log.output('reload_all_camera_exif end >>>')
 
 
-def read_exif_to_camera(headnum: int, camnum: int, filepath: str) -> bool:
+def read_exif_data(filepath: str) -> Dict:
+    ''' Does not touch Blender data, so it can be called from threads '''
+    return _read_exif(filepath)
+
+
+def read_exif_to_camera(headnum: int, camnum: int, filepath: str,
+                        exif_data: Optional[Dict] = None) -> bool:
     _log.yellow('read_exif_to_camera start')
     settings = fb_settings()
     camera = settings.get_camera(headnum, camnum)
     if camera is None:
         _log.red('read_exif_to_camera no camera end >>>')
         return False
-    exif_data = _read_exif(filepath)
+    if exif_data is None:
+        exif_data = _read_exif(filepath)
     _init_exif_settings(camera.exif, exif_data)
     camera.exif.info_message = _exif_info_message(camera.exif, exif_data)
     _log.output('read_exif_to_camera end >>>')
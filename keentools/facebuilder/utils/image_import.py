@@ -0,0 +1,136 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+# KeenTools for blender is a blender addon for using KeenTools in Blender.
+# Copyright (C) 2024 KeenTools
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ##### END GPL LICENSE BLOCK #####
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional
+
+from ...utils.kt_logging import KTLogger
+from ...addon_config import Config, ProductType, fb_settings, get_operator
+from ...utils.bpy_common import (bpy_timer_register,
+                                 bpy_progress_begin,
+                                 bpy_progress_end,
+                                 bpy_progress_update)
+from ..fbloader import FBLoader
+from .exif_reader import (read_exif_data,
+                          read_exif_to_camera,
+                          auto_setup_camera_from_exif)
+
+
+_log = KTLogger(__name__)
+
+
+_import_generator_var: Optional[Any] = None
+_max_exif_workers: int = 4
+
+
+def _setup_new_camera(headnum: int, camnum: int) -> None:
+    head = fb_settings().get_head(headnum)
+    camera = head.get_camera(camnum)
+    _log.output(f'auto_setup_camera_from_exif: {camnum}')
+    auto_setup_camera_from_exif(camera)
+
+    fb = FBLoader.get_builder()
+    mode = fb.focal_length_estimation_mode()
+    _log.output(f'focal_length_estimation_mode: {mode}')
+    if mode in ['FB_ESTIMATE_VARYING_FOCAL_LENGTH',
+                'FB_ESTIMATE_STATIC_FOCAL_LENGTH']:
+        fb.set_focal_length_at(
+            camera.get_keyframe(),
+            camera.get_focal_length_in_pixels_coef() * camera.focal)
+
+    FBLoader.center_geo_camera_projection(headnum, camnum)
+
+
+def import_generator(headnum: int, filepaths: List[str]) -> Any:
+    ''' EXIF of all files is parsed in a thread pool, cameras are created
+        in the file order as soon as their EXIF is ready. Images are only
+        loaded as datablocks, pixels are decoded on first use. '''
+    def _finish():
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+        bpy_progress_end()
+        settings.stop_calculating()
+        settings.user_interrupts = True
+        FBLoader.save_fb_serial_and_image_pathes(headnum)
+
+    delta = 0.001
+    settings = fb_settings()
+    settings.start_calculating('IMAGE_IMPORT')
+    FBLoader.load_model(headnum)
+
+    executor = ThreadPoolExecutor(max_workers=_max_exif_workers,
+                                  thread_name_prefix='kt_exif_reader')
+    futures = [executor.submit(read_exif_data, x) for x in filepaths]
+
+    total_files = len(filepaths)
+    bpy_progress_begin(0, total_files)
+    for num, (filepath, future) in enumerate(zip(filepaths, futures)):
+        while not future.done() and not settings.user_interrupts:
+            yield delta
+
+        if settings.user_interrupts:
+            _log.info(f'Image import interrupted: {num}/{total_files}')
+            _finish()
+            return None
+
+        settings.user_percent = 100 * num / total_files
+        bpy_progress_update(num)
+        _log.output(f'IMAGE:\n{filepath}')
+        try:
+            exif_data = future.result()
+            camera = FBLoader.add_new_camera_with_image(headnum, filepath)
+            camnum = fb_settings().get_head(headnum).get_last_camnum()
+            read_exif_to_camera(headnum, camnum, filepath, exif_data)
+            camera.orientation = camera.exif.orientation
+            _setup_new_camera(headnum, camnum)
+        except RuntimeError as err:
+            _log.error(f'FILE READ ERROR: {filepath}\n{str(err)}')
+        except Exception as err:
+            _log.error(f'import_generator Exception: {filepath}\n{str(err)}')
+
+        yield delta
+
+    _finish()
+    _log.info(f'IMAGES IMPORTED: {total_files}')
+    return None
+
+
+def _import_caller() -> Optional[float]:
+    global _import_generator_var
+    if _import_generator_var is None:
+        return None
+    try:
+        return next(_import_generator_var)
+    except StopIteration:
+        _log.output('Image import generator is over')
+    _import_generator_var = None
+    return None
+
+
+def import_images(headnum: int, directory: str, filenames: List[str]) -> None:
+    _log.yellow('import_images start')
+    op = get_operator(Config.kt_interrupt_modal_idname)
+    op('INVOKE_DEFAULT', product=ProductType.FACEBUILDER)
+
+    global _import_generator_var
+    _import_generator_var = import_generator(
+        headnum, [os.path.join(directory, x) for x in filenames])
+    bpy_timer_register(_import_caller, first_interval=0.0)
+    _log.output('import_images end >>>')
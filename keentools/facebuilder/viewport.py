@@ -30,11 +30,12 @@ from ..addon_config import (Config,
 from ..facebuilder_config import FBConfig
 from ..utils.bpy_common import bpy_render_frame, get_scene_camera_shift
 from ..utils.coords import (multiply_verts_on_matrix_4x4,
-                            pin_to_xyz_from_mesh,
-                            pin_to_xyz_from_geo_mesh,
+                            pins_to_xyz_from_mesh,
+                            pins_to_xyz_from_geo_mesh,
                             xy_to_xz_rotation_matrix_3x3,
-                            frame_to_image_space,
-                            image_space_to_region,
+                            frame_to_image_space_array,
+                            image_space_to_region_array,
+                            frame_to_region_array,
                             get_camera_border,
                             get_area_region_3d,
                             to_homogeneous)
@@ -105,7 +106,7 @@ class FBViewport(KTViewport):
             self, fb: Any, headobj: Object, keyframe: int = -1,
             color: Tuple[float, float, float, float] = FBConfig.surface_point_color) -> None:
         verts = self.surface_points_from_fb(fb, keyframe)
-        colors = [color] * len(verts)
+        colors = np.full((len(verts), 4), color, dtype=np.float32)
 
         if len(verts) > 0:
             m = np.array(headobj.matrix_world, dtype=np.float32).transpose()
@@ -144,32 +145,23 @@ class FBViewport(KTViewport):
 
     def surface_points_from_mesh(self, fb: Any, headobj: Object,
                                  keyframe: int = -1) -> Any:
-        pins_count = fb.pins_count(keyframe)
-        verts = np.empty((pins_count, 3), dtype=np.float32)
-        for i in range(pins_count):
-            pin = fb.pin(keyframe, i)
-            verts[i] = pin_to_xyz_from_mesh(pin, headobj)
-        return verts
+        return pins_to_xyz_from_mesh(
+            [fb.pin(keyframe, i) for i in range(fb.pins_count(keyframe))],
+            headobj)
 
     def surface_points_from_fb(self, fb: Any, keyframe: int = -1) -> Any:
         geo = fb.applied_args_model_at(keyframe)
         geo_mesh = geo.mesh(0)
-        pins_count = fb.pins_count(keyframe)
-        verts = np.empty((pins_count, 3), dtype=np.float32)
-        for i in range(fb.pins_count(keyframe)):
-            pin = fb.pin(keyframe, i)
-            verts[i] = pin_to_xyz_from_geo_mesh(pin, geo_mesh)
+        verts = pins_to_xyz_from_geo_mesh(
+            [fb.pin(keyframe, i) for i in range(fb.pins_count(keyframe))],
+            geo_mesh)
         return verts @ xy_to_xz_rotation_matrix_3x3()
 
     def img_points(self, fb: Any, keyframe: int) -> Any:
         w, h = bpy_render_frame()
-        pins_count = fb.pins_count(keyframe)
-        verts = np.empty((pins_count, 2), dtype=np.float32)
-        for i in range(pins_count):
-            pin = fb.pin(keyframe, i)
-            x, y = pin.img_pos
-            verts[i] = frame_to_image_space(x, y, w, h)
-        return verts
+        return frame_to_image_space_array(
+            [fb.pin(keyframe, i).img_pos
+             for i in range(fb.pins_count(keyframe))], w, h)
 
     def create_batch_2d(self, area: Area) -> None:
         x1, y1, x2, y2 = get_camera_border(area)
@@ -177,23 +169,13 @@ class FBViewport(KTViewport):
         pins = self.pins()
 
         shift_x, shift_y = get_scene_camera_shift()
-        points = [image_space_to_region(p[0], p[1], x1, y1, x2, y2,
-                                        shift_x, shift_y) for p in pins.arr()]
-        points_count = len(points)
-
-        vertex_colors = [FBConfig.pin_color] * points_count
-
-        color = (*FBConfig.disabled_pin_color[:3], 0.0) \
-            if pins.move_pin_mode() else FBConfig.disabled_pin_color
-        for i in [x for x in pins.get_disabled_pins() if x < points_count]:
-            vertex_colors[i] = color
-
-        for i in [x for x in pins.get_selected_pins() if x < points_count]:
-            vertex_colors[i] = FBConfig.selected_pin_color
-
-        pin_num = pins.current_pin_num()
-        if pins.current_pin() and pin_num < points_count:
-            vertex_colors[pin_num] = FBConfig.current_pin_color
+        points = image_space_to_region_array(pins.arr(), x1, y1, x2, y2,
+                                             shift_x, shift_y)
+        vertex_colors = pins.vertex_colors(len(points),
+                                           FBConfig.pin_color,
+                                           FBConfig.disabled_pin_color,
+                                           FBConfig.selected_pin_color,
+                                           FBConfig.current_pin_color)
 
         self.points2d().set_vertices_and_colors(points, vertex_colors)
         self.points2d().create_batch()
@@ -214,23 +196,13 @@ class FBViewport(KTViewport):
         x1, y1, x2, y2 = get_camera_border(area)
         kt_pins = fb.projected_pins(keyframe)
 
-        verts_count = len(kt_pins)
-        verts = np.empty((verts_count * 2, 2), dtype=np.float32)
-        for i, pin in enumerate(kt_pins):
-            x, y = frame_to_image_space(*pin.img_pos, rx, ry)
-            verts[i * 2] = image_space_to_region(x, y, x1, y1, x2, y2)
-            x, y = frame_to_image_space(*pin.surface_point, rx, ry)
-            verts[i * 2 + 1] = image_space_to_region(x, y, x1, y1, x2, y2)
-
         wire = self.residuals()
-        wire.vertices = verts
-        wire.vertex_colors = np.full((verts_count * 2, 4),
-                                     FBConfig.residual_color,
-                                     dtype=np.float32)
-
-        # For pin dashes drawing template like this: O- - - -o
-        wire.edge_lengths = np.full((verts_count, 2), (0.0, 22.0),
-                                    dtype=np.float32).ravel()
+        wire.set_residual_lines(
+            frame_to_region_array([pin.img_pos for pin in kt_pins],
+                                  rx, ry, x1, y1, x2, y2),
+            frame_to_region_array([pin.surface_point for pin in kt_pins],
+                                  rx, ry, x1, y1, x2, y2),
+            FBConfig.residual_color, Config.residual_dashed_line_length)
         wire.create_batch()
 
     def unhide_all_shaders(self):
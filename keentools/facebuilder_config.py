@@ -17,6 +17,8 @@
 # ##### END GPL LICENSE BLOCK #####
 
 import math
+import os
+import tempfile
 
 from .utils.kt_logging import KTLogger
 
@@ -83,6 +85,7 @@ class FBConfig:
     fb_movepin_idname = operators + '.movepin'
     fb_pickmode_idname = operators + '.pickmode'
     fb_pickmode_starter_idname = operators + '.pickmode_starter'
+    fb_auto_align_all_idname = operators + '.auto_align_all'
     fb_history_actor_idname = operators + '.history_actor'
     fb_camera_actor_idname = operators + '.camera_actor'
 
@@ -208,6 +211,11 @@ class FBConfig:
 
     recreate_vertex_groups = True
 
+    bake_image_feed_budget_mb: float = 512.0
+
+    exif_cache_folder: str = os.path.join(tempfile.gettempdir(),
+                                          'kt_fb_exif_cache')
+
     # In Material
     image_node_layout_coord = (-300, 0)
 
@@ -16,6 +16,7 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 # ##### END GPL LICENSE BLOCK #####
 
+from bpy.app import handlers as app_handlers
 from bpy.utils import register_class, unregister_class
 
 from ..utils.kt_logging import KTLogger
@@ -29,6 +30,9 @@ from .pick_operator import FT_OT_PickMode, FT_OT_PickModeStarter
 from .interface import CLASSES_TO_REGISTER as INTERFACE_CLASSES
 from .operators import BUTTON_CLASSES
 from ..preferences.hotkeys import all_keymaps_unregister
+from ..tracker.loader import register_app_handler, unregister_app_handler
+from ..tracker.vertex_cache import (vertex_cache_frame_change_handler,
+                                    vertex_cache_load_pre_handler)
 
 
 _log = KTLogger(__name__)
@@ -53,12 +57,24 @@ def facetracker_register() -> None:
     _log.output('MAIN FACETRACKER VARIABLE REGISTER')
     add_addon_settings_var(Config.ft_global_var_name, FTSceneSettings)
 
+    _log.output('FACETRACKER VERTEX CACHE HANDLER REGISTER')
+    register_app_handler(app_handlers.frame_change_pre,
+                         vertex_cache_frame_change_handler)
+    register_app_handler(app_handlers.load_pre,
+                         vertex_cache_load_pre_handler)
+
     _log.green('=== FACETRACKER REGISTERED ===')
 
 
 def facetracker_unregister() -> None:
     _log.green('--- START FACETRACKER UNREGISTER ---')
 
+    _log.output('FACETRACKER VERTEX CACHE HANDLER UNREGISTER')
+    unregister_app_handler(app_handlers.frame_change_pre,
+                           vertex_cache_frame_change_handler)
+    unregister_app_handler(app_handlers.load_pre,
+                           vertex_cache_load_pre_handler)
+
     _log.output('FACETRACKER KEYMAPS UNREGISTER')
     all_keymaps_unregister()
 
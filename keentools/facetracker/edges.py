@@ -28,7 +28,8 @@ from ..addon_config import ft_settings
 from ..facetracker_config import FTConfig
 from ..facebuilder.utils.edges import FBRasterEdgeShader3D
 from ..utils.fb_wireframe_image import get_ft_edge_indices_and_uvs
-from ..utils.coords import get_triangles_in_vertex_group, get_mesh_verts
+from ..utils.coords import get_mesh_verts
+from ..utils.mesh_builder import get_triangles_in_vertex_group
 from ..utils.bpy_common import evaluated_mesh
 from ..utils.gpu_control import (set_depth_test,
                                  set_depth_mask,
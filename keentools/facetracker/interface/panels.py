@@ -1179,6 +1179,19 @@ class FT_PT_ScenePanel(AllVisible):
             op = row.operator(FTConfig.ft_export_animated_empty_idname)
             op.product = ProductType.FACETRACKER
 
+        layout.separator()
+
+        col = layout.column(align=True)
+        col.label(text='Tracked geometry')
+        if geotracker.vertex_storage == 'VERTEX_CACHE':
+            col.prop(geotracker, 'vertex_cache_path', text='')
+            col.operator(FTConfig.ft_convert_to_shape_keys_idname)
+        else:
+            col.operator(FTConfig.ft_convert_to_vertex_cache_idname)
+
+        op = layout.operator(Config.kt_export_point_cache_idname)
+        op.product = ProductType.FACETRACKER
+
 
 class FT_UL_selected_frame_list(UIList):
     bl_idname = FTConfig.ft_selected_frame_list_item_idname
@@ -83,7 +83,9 @@ from ..geotracker.utils.geotracker_acts import (create_facetracker_action,
                                                 refine_all_async_action,
                                                 create_animated_empty_action,
                                                 create_soft_empties_from_selected_pins_action,
-                                                save_facs_as_csv_action)
+                                                save_facs_as_csv_action,
+                                                convert_to_vertex_cache_action,
+                                                convert_to_shape_keys_action)
 from ..tracker.calc_timer import FTTrackTimer, FTRefineTimer
 from ..preferences.hotkeys import (pan_keymaps_register,
                                    all_keymaps_unregister)
@@ -995,6 +997,36 @@ class FT_OT_SaveFACS(Operator, ExportHelper):
         return super().invoke(context, event)
 
 
+class FT_OT_ConvertToVertexCache(ButtonOperator, Operator):
+    bl_idname = FTConfig.ft_convert_to_vertex_cache_idname
+    bl_label = buttons[bl_idname].label
+    bl_description = buttons[bl_idname].description
+
+    def execute(self, context):
+        _log.green(f'{self.__class__.__name__} execute')
+        act_status = convert_to_vertex_cache_action()
+        if not act_status.success:
+            self.report({'ERROR'}, act_status.error_message)
+            return {'CANCELLED'}
+        _log.output(f'{self.__class__.__name__} execute end >>>')
+        return {'FINISHED'}
+
+
+class FT_OT_ConvertToShapeKeys(ButtonOperator, Operator):
+    bl_idname = FTConfig.ft_convert_to_shape_keys_idname
+    bl_label = buttons[bl_idname].label
+    bl_description = buttons[bl_idname].description
+
+    def execute(self, context):
+        _log.green(f'{self.__class__.__name__} execute')
+        act_status = convert_to_shape_keys_action()
+        if not act_status.success:
+            self.report({'ERROR'}, act_status.error_message)
+            return {'CANCELLED'}
+        _log.output(f'{self.__class__.__name__} execute end >>>')
+        return {'FINISHED'}
+
+
 class FT_OT_ChooseFrameMode(Operator):
     bl_idname = FTConfig.ft_choose_frame_mode_idname
     bl_label = buttons[bl_idname].label
@@ -1349,6 +1381,8 @@ BUTTON_CLASSES = (FT_OT_CreateFaceTracker,
                   FT_OT_RemoveFocalKeyframes,
                   FT_OT_ExportAnimatedEmpty,
                   FT_OT_SaveFACS,
+                  FT_OT_ConvertToVertexCache,
+                  FT_OT_ConvertToShapeKeys,
                   FT_OT_ChooseFrameMode,
                   FT_OT_CreateNewHead,
                   FT_OT_EditHead,
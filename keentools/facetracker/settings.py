@@ -303,6 +303,21 @@ class FaceTrackerItem(TrackerItem):
         name='Neck', default=2.0, min=0.001, max=1000.0,
         update=update_neck_movement_rigidity)
 
+    vertex_storage: EnumProperty(
+        name='Tracked geometry storage',
+        items=[('SHAPE_KEYS', 'Shape keys',
+                'Store tracked geometry as one shape key per frame', 0),
+               ('VERTEX_CACHE', 'Vertex cache',
+                'Store tracked geometry in a compact vertex cache on disk '
+                'and apply it to the mesh on frame change', 1)],
+        default='SHAPE_KEYS')
+    vertex_cache_path: StringProperty(
+        name='Vertex cache directory',
+        description='Directory for the vertex cache files. '
+                    'When empty, a new directory next to the blend-file '
+                    'is set on conversion',
+        subtype='DIR_PATH')
+
 
 class FTSceneSettings(TRSceneSetting):
     def product_type(self) -> int:
@@ -415,6 +430,7 @@ class FTSceneSettings(TRSceneSetting):
         ('JUMP', 'JUMP', 'Jump to frame', 5),
         ('ESTIMATE_FL', 'ESTIMATE_FL', 'Focal length estimation is calculating', 6),
         ('NO_SHADER_UPDATE', 'NO_SHADER_UPDATE', 'No shader update in calculating', 7),
+        ('EXPORT', 'EXPORT', 'Point cache export is calculating', 8),
     ])
 
     selection_mode: BoolProperty(name='Selection mode', default=False)
@@ -326,6 +326,14 @@ buttons = {
         'Save FACS animation',
         'Save FACS as a CSV file'
     ),
+    FTConfig.ft_convert_to_vertex_cache_idname: Button(
+        'Move to vertex cache',
+        'Move tracked frame shape keys into the on-disk vertex cache'
+    ),
+    FTConfig.ft_convert_to_shape_keys_idname: Button(
+        'Move to shape keys',
+        'Create frame shape keys from the vertex cache'
+    ),
     FTConfig.ft_create_new_head_idname: Button(
         'New',
         'Create new FaceBuilder Head'
@@ -33,7 +33,7 @@ from ..utils.edges import (KTEdgeShader2D,
                            KTScreenDashedRectangleShader2D)
 from ..utils.polygons import KTRasterMask
 from .edges import FTRasterEdgeShader3D
-from ..utils.coords import (pin_to_xyz_from_geo_mesh,
+from ..utils.coords import (pins_to_xyz_from_geo_mesh,
                             xy_to_xz_rotation_matrix_3x3,
                             InvScaleFromMatrix)
 
@@ -70,12 +70,8 @@ class FTViewport(GTViewport):
                                  keyframe: int) -> Any:
         geo = gt.applied_args_model_at(keyframe)
         geo_mesh = geo.mesh(0)
-        pins_count = gt.pins_count()
-        verts = np.empty((pins_count, 3), dtype=np.float32)
-        for i in range(pins_count):
-            pin = gt.pin(keyframe, i)
-            p = pin_to_xyz_from_geo_mesh(pin, geo_mesh)
-            verts[i] = p
+        verts = pins_to_xyz_from_geo_mesh(
+            [gt.pin(keyframe, i) for i in range(gt.pins_count())], geo_mesh)
 
         scale_inv = np.array(InvScaleFromMatrix(obj.matrix_world),
                              dtype=np.float32)
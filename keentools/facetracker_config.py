@@ -125,6 +125,8 @@ class FTConfig:
     ft_auto_name_precalc_idname = operators + '.auto_name_precalc'
     ft_unbreak_rotation_idname = operators + '.unbreak_rotation'
     ft_save_facs_idname = operators + '.save_facs'
+    ft_convert_to_vertex_cache_idname = operators + '.convert_to_vertex_cache'
+    ft_convert_to_shape_keys_idname = operators + '.convert_to_shape_keys'
 
     ft_create_new_head_idname = operators + '.create_new_head'
     ft_edit_head_idname = operators + '.edit_head'
@@ -187,4 +189,6 @@ class FTConfig:
     ft_updates_installation_panel_idname = _PT + 'updates_installation_panel'
 
     ft_action_name = 'ftAction'
+    ft_vertex_cache_shape_name = 'ft_vertex_cache'
+    ft_vertex_cache_folder_suffix = '_kt_vertex_cache'
     ft_wireframe_offset_constant: float = 0.001
@@ -53,6 +53,7 @@ CLASSES_TO_REGISTER = (GT_PT_GeotrackersPanel,  # UI panels
                        GT_OT_TextureFileExport,
                        GT_OT_ConfirmRecreatePrecalc,
                        KT_OT_BakeWireframeSequence,
+                       KT_OT_ExportPointCache,
                        GTHELP_OT_InputsHelp,  # helps
                        GTHELP_OT_MasksHelp,
                        GTHELP_OT_AnalyzeHelp,
@@ -54,6 +54,7 @@ from ..ui_strings import buttons
 from ..utils.textures import bake_texture_sequence
 from ...utils.ui_redraw import timeline_view_all
 from ...common.bake_wireframe import bake_wireframe_sequence
+from ...common.point_cache import export_point_cache
 
 
 _log = KTLogger(__name__)
@@ -1028,3 +1029,108 @@ class KT_OT_BakeWireframeSequence(Operator, ExportHelper):
                                 backface_culling=self.wireframe_backface_culling,
                                 product=self.product)
         return {'FINISHED'}
+
+
+class KT_OT_ExportPointCache(Operator, ExportHelper):
+    bl_idname = Config.kt_export_point_cache_idname
+    bl_label = 'Export point cache'
+    bl_description = 'Export tracked mesh animation to a PC2 or MDD file'
+    bl_options = {'REGISTER', 'INTERNAL'}
+
+    filter_glob: StringProperty(
+        default='*.pc2;*.mdd',
+        options={'HIDDEN'}
+    )
+
+    filepath: StringProperty(
+        default='',
+        subtype='FILE_PATH'
+    )
+    file_format: EnumProperty(name='Point cache format', items=[
+        ('PC2', 'PC2', 'PointCache2 format', 0),
+        ('MDD', 'MDD', 'LightWave MDD format', 1)],
+        description='Choose point cache file format')
+    world_space: BoolProperty(
+        name='World space',
+        description='Bake object animation into the exported points',
+        default=True)
+
+    from_frame: IntProperty(name='from', default=1)
+    to_frame: IntProperty(name='to', default=1)
+    filename_ext: StringProperty(default='.pc2')
+
+    product: IntProperty(default=ProductType.UNDEFINED)
+
+    def check(self, context):
+        self.filename_ext = f'.{self.file_format.lower()}'
+        filepath = ensure_ext(os.path.splitext(self.filepath)[0],
+                              self.filename_ext)
+        if filepath != self.filepath:
+            self.filepath = filepath
+            return True
+        return False
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, 'file_format', expand=True)
+        layout.prop(self, 'world_space')
+
+        layout.label(text='Frame range:')
+        row = layout.row()
+        row.prop(self, 'from_frame', expand=True)
+        row.prop(self, 'to_frame', expand=True)
+
+    def invoke(self, context, _event):
+        _log.output(f'{self.__class__.__name__} invoke '
+                    f'[{product_name(self.product)}]')
+        check_status = common_checks(product=self.product,
+                                     object_mode=True, is_calculating=True,
+                                     reload_geotracker=True,
+                                     geotracker=True, geometry=True)
+        if not check_status.success:
+            self.report({'ERROR'}, check_status.error_message)
+            return {'CANCELLED'}
+
+        self.from_frame = bpy_start_frame()
+        self.to_frame = bpy_end_frame()
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        _log.output(f'{self.__class__.__name__} execute '
+                    f'[{product_name(self.product)}]')
+        check_status = common_checks(product=self.product,
+                                     object_mode=True, is_calculating=True,
+                                     reload_geotracker=True,
+                                     geotracker=True, geometry=True)
+        if not check_status.success:
+            self.report({'ERROR'}, check_status.error_message)
+            return {'CANCELLED'}
+
+        if self.to_frame < self.from_frame:
+            msg = 'Wrong frame range'
+            _log.error(msg)
+            self.report({'ERROR'}, msg)
+            return {'CANCELLED'}
+
+        if os.path.isdir(self.filepath):
+            msg = 'Wrong file destination'
+            _log.error(msg)
+            self.report({'ERROR'}, msg)
+            return {'CANCELLED'}
+
+        settings = get_settings(self.product)
+        geotracker = settings.get_current_geotracker_item()
+        frames = [x for x in range(self.from_frame, self.to_frame + 1)]
+        try:
+            export_point_cache(geotracker, self.filepath,
+                               file_format=self.file_format,
+                               frames=frames,
+                               world_space=self.world_space,
+                               product=self.product)
+        except Exception as err:
+            msg = f'Cannot start point cache export: {str(err)}'
+            _log.error(msg)
+            self.report({'ERROR'}, msg)
+            return {'CANCELLED'}
+        return {'FINISHED'}
@@ -1045,6 +1045,9 @@ class GT_PT_ScenePanel(AllVisible):
         op = row.operator(GTConfig.gt_export_animated_empty_idname)
         op.product = ProductType.GEOTRACKER
 
+        op = layout.operator(Config.kt_export_point_cache_idname)
+        op.product = ProductType.GEOTRACKER
+
 
 class GT_PT_RenderingPanel(AllVisible):
     bl_idname = GTConfig.gt_rendering_panel_idname
@@ -356,6 +356,7 @@ class GTSceneSettings(TRSceneSetting):
         ('JUMP', 'JUMP', 'Jump to frame', 5),
         ('ESTIMATE_FL', 'ESTIMATE_FL', 'Focal length estimation is calculating', 6),
         ('NO_SHADER_UPDATE', 'NO_SHADER_UPDATE', 'No shader update in calculating', 7),
+        ('EXPORT', 'EXPORT', 'Point cache export is calculating', 8),
     ])
 
     selection_mode: BoolProperty(name='Selection mode', default=False)
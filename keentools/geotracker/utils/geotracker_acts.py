@@ -25,7 +25,6 @@ from bpy.types import Object, Operator, Area
 from mathutils import Matrix, Euler, Vector
 
 from ...utils.kt_logging import KTLogger
-from ...utils.version import BVersion
 from ...addon_config import (ActionStatus,
                              get_addon_preferences,
                              ProductType,
@@ -65,6 +64,7 @@ from ...utils.manipulate import (select_object_only,
                                  select_objects_only,
                                  center_viewport,
                                  switch_to_mode)
+from ...utils.uv_overlap import get_overlapping_uv_polygons
 from .prechecks import (common_checks,
                         track_checks,
                         get_alone_object_in_scene_selection_by_type,
@@ -85,8 +85,8 @@ from ...utils.coords import (LocRotScale,
                              InvScaleMatrix,
                              InvScaleFromMatrix,
                              change_near_and_far_clip_planes,
-                             pin_to_xyz_from_geo_mesh,
-                             pin_to_normal_from_geo_mesh,
+                             pins_to_xyz_from_geo_mesh,
+                             pins_to_normals_from_geo_mesh,
                              xy_to_xz_rotation_matrix_3x3)
 from .textures import bake_texture, preview_material_with_texture, get_bad_frame
 from ..interface.screen_mesages import clipping_changed_screen_message
@@ -105,7 +105,13 @@ from ...utils.unbreak import (mark_object_keyframes,
                               unbreak_object_rotation_act,
                               unbreak_rotation_act,
                               unbreak_rotation_with_status)
-from ...tracker.tracking_blendshapes import create_relative_shape_keyframe
+from ...tracker.tracking_blendshapes import (
+    create_relative_shape_keyframe,
+    convert_frame_shapes_to_vertex_cache,
+    convert_vertex_cache_to_frame_shapes)
+from ...tracker.vertex_cache import (facetracker_vertex_cache,
+                                     default_vertex_cache_path,
+                                     apply_vertex_cache)
 
 
 _log = KTLogger(__name__)
@@ -744,10 +750,9 @@ def remove_pins_action(*, product: int) -> ActionStatus:
         pins.clear_disabled_pins()
         pins.clear_selected_pins()
     else:
-        selected_pins.sort()
         for i in reversed(selected_pins):
             gt.remove_pin(i)
-            pins.remove_pin(i)
+        pins.remove_pins(selected_pins)
         pins.clear_selected_pins()
         if gt.is_key_at(bpy_current_frame()) and not loader.solve():
             return ActionStatus(False, 'Could not remove selected pins')
@@ -922,12 +927,10 @@ def create_hard_empties_from_selected_pins_action(
     geo = loader.get_geo()
     geo_mesh = geo.mesh(0)
 
-    points = np.empty((selected_pins_count, 3), dtype=np.float32)
-    normals = np.empty((selected_pins_count, 3), dtype=np.float32)
-    for i, pin_index in enumerate(selected_pins):
-        pin = gt.pin(current_frame, pin_index)
-        points[i] = pin_to_xyz_from_geo_mesh(pin, geo_mesh)
-        normals[i] = pin_to_normal_from_geo_mesh(pin, geo_mesh)
+    selected_kt_pins = [gt.pin(current_frame, pin_index)
+                        for pin_index in selected_pins]
+    points = pins_to_xyz_from_geo_mesh(selected_kt_pins, geo_mesh)
+    normals = pins_to_normals_from_geo_mesh(selected_kt_pins, geo_mesh)
 
     pin_positions = points @ xy_to_xz_rotation_matrix_3x3()
     scale_inv = InvScaleFromMatrix(geomobj.matrix_world)
@@ -1044,17 +1047,20 @@ def create_soft_empties_from_selected_pins_action(
         scale_inv = InvScaleFromMatrix(geomobj_matrix_world)
         inv_mat = geomobj_matrix_world.inverted_safe()
 
-        for i, pin_index in enumerate(selected_pins):
-            empty = empties[i]
-            pin = gt.pin(frame, pin_index)
-            point = pin_to_xyz_from_geo_mesh(pin, geo_mesh)
-            normal = pin_to_normal_from_geo_mesh(pin, geo_mesh)
-            pos = np.array(point, dtype=np.float32) @ xy_to_xz_rotation_matrix_3x3()
+        frame_kt_pins = [gt.pin(frame, pin_index)
+                         for pin_index in selected_pins]
+        positions = pins_to_xyz_from_geo_mesh(frame_kt_pins, geo_mesh) @ \
+            xy_to_xz_rotation_matrix_3x3()
+        if orientation == 'NORMAL':
+            normals = pins_to_normals_from_geo_mesh(frame_kt_pins, geo_mesh) @ \
+                xy_to_xz_rotation_matrix_3x3()
+
+        for i, empty in enumerate(empties):
+            pos = positions[i]
 
             if orientation == 'NORMAL':
                 quaternion_matrix = zv.rotation_difference(
-                    np.array(normal, dtype=np.float32) @
-                    xy_to_xz_rotation_matrix_3x3()).to_matrix().to_4x4()
+                    normals[i]).to_matrix().to_4x4()
                 empty.matrix_world = quaternion_matrix
             elif orientation == 'WORLD':
                 empty.matrix_world = inv_mat
@@ -1106,26 +1112,18 @@ def check_uv_exists(obj: Optional[Object]) -> ActionStatus:
 
 
 def check_uv_overlapping(obj: Optional[Object]) -> ActionStatus:
-    if not BVersion.uv_select_overlap_exists:
-        return ActionStatus(False, 'Too old Blender version for overlapping check')
-
-    old_mode = obj.mode
-    select_object_only(obj)
-
-    mesh = obj.data
-    mesh.polygons.foreach_set('select', [True] * len(mesh.polygons))
-
-    switch_to_mode('EDIT')
-    bpy.ops.uv.select_overlap()
-    switch_to_mode('OBJECT')
-
-    uvmap = obj.data.uv_layers.active.data
-    selected = np.empty((len(uvmap),), dtype=np.bool_)
-    uvmap.foreach_get('select', selected.ravel())
-
-    switch_to_mode(old_mode)
-    if np.any(selected):
-        return ActionStatus(False, 'Overlapping UVs detected')
+    if not obj:
+        return ActionStatus(False, 'No object for overlapping check')
+    overlapping = get_overlapping_uv_polygons(obj)
+    if overlapping is None:
+        return ActionStatus(False, 'No UV map found')
+    if len(overlapping) > 0:
+        shown = ', '.join(str(x) for x in overlapping[:10].tolist())
+        more = ', ...' if len(overlapping) > 10 else ''
+        msg = f'Overlapping UVs detected: {len(overlapping)} polygons ' \
+              f'({shown}{more})'
+        _log.output(msg)
+        return ActionStatus(False, msg)
     return ActionStatus(True, 'ok')
 
 
@@ -1476,6 +1474,67 @@ def save_facs_as_csv_action(*, filepath: str,
     return ActionStatus(True, 'ok')
 
 
+def convert_to_vertex_cache_action() -> ActionStatus:
+    _log.yellow('convert_to_vertex_cache_action start')
+    check_status = common_checks(product=ProductType.FACETRACKER,
+                                 object_mode=True, is_calculating=True,
+                                 pinmode_out=True, geotracker=True,
+                                 geometry=True)
+    if not check_status.success:
+        return check_status
+
+    settings = ft_settings()
+    geotracker = settings.get_current_geotracker_item()
+    if geotracker.vertex_storage == 'VERTEX_CACHE':
+        return ActionStatus(False, 'Vertex cache is already used')
+
+    if geotracker.vertex_cache_path == '':
+        vertex_cache_path = default_vertex_cache_path()
+        if vertex_cache_path == '':
+            return ActionStatus(False, 'Save the blend-file or set '
+                                       'the vertex cache directory first')
+        geotracker.vertex_cache_path = vertex_cache_path
+
+    cache = facetracker_vertex_cache(geotracker)
+    try:
+        count = convert_frame_shapes_to_vertex_cache(geotracker.geomobj, cache)
+    except Exception as err:
+        _log.error(f'convert_to_vertex_cache_action Exception:\n{str(err)}')
+        return ActionStatus(False, 'Cannot write vertex cache')
+    geotracker.vertex_storage = 'VERTEX_CACHE'
+    apply_vertex_cache(geotracker.geomobj, cache, bpy_current_frame())
+    _log.output(f'convert_to_vertex_cache_action: {count} frames end >>>')
+    return ActionStatus(True, 'ok')
+
+
+def convert_to_shape_keys_action() -> ActionStatus:
+    _log.yellow('convert_to_shape_keys_action start')
+    check_status = common_checks(product=ProductType.FACETRACKER,
+                                 object_mode=True, is_calculating=True,
+                                 pinmode_out=True, reload_geotracker=True,
+                                 geotracker=True, geometry=True)
+    if not check_status.success:
+        return check_status
+
+    settings = ft_settings()
+    geotracker = settings.get_current_geotracker_item()
+    if geotracker.vertex_storage == 'SHAPE_KEYS':
+        return ActionStatus(False, 'Shape keys are already used')
+
+    gt = settings.loader().kt_geotracker()
+    cache = facetracker_vertex_cache(geotracker)
+    try:
+        count = convert_vertex_cache_to_frame_shapes(
+            geotracker.geomobj, cache, keyframe_set=set(gt.keyframes()))
+    except Exception as err:
+        _log.error(f'convert_to_shape_keys_action Exception:\n{str(err)}')
+        return ActionStatus(False, 'Cannot read vertex cache')
+    geotracker.vertex_storage = 'SHAPE_KEYS'
+    cache.clear()
+    _log.output(f'convert_to_shape_keys_action: {count} frames end >>>')
+    return ActionStatus(True, 'ok')
+
+
 _stored_data: Dict = {}
 
 
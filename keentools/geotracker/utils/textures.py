@@ -32,13 +32,14 @@ from ...utils.bpy_common import (bpy_current_frame,
                                  bpy_progress_end,
                                  bpy_progress_update)
 from ...blender_independent_packages.pykeentools_loader import module as pkt_module
-from ...utils.mesh_builder import build_geo
+from ...utils.mesh_builder import get_cached_geo
 from ...utils.images import (np_array_from_background_image,
                              create_bpy_image_from_np_array,
                              create_compatible_bpy_image,
                              assign_pixels_data,
                              remove_bpy_image)
 from ...utils.coords import camera_projection
+from ...utils.image_writer import AsyncImageWriter
 from ...utils.ui_redraw import (total_redraw_ui,
                                 total_redraw_ui_overriding_window)
 from ...utils.materials import (remove_bpy_texture_if_exists,
@@ -46,7 +47,7 @@ from ...utils.materials import (remove_bpy_texture_if_exists,
                                 assign_material_to_object,
                                 switch_to_mode)
 from ..gtloader import GTLoader
-from .prechecks import prepare_camera
+from .prechecks import prepare_camera, show_warning_dialog
 from ...utils.localview import exit_area_localview
 from ..interface.screen_mesages import (revert_default_screen_message,
                                         single_line_screen_message,
@@ -94,7 +95,10 @@ def bake_texture(geotracker: Any, selected_frames: List[int],
                 _set_bad_frame(frame)
                 return None
 
-            geo = build_geo(geotracker.geomobj, get_uv=True)
+            # Topology and UVs are read once per bake below,
+            # only vertices are checked for every frame
+            geo = get_cached_geo(geotracker.geomobj, get_uv=True,
+                                 check_topology=False)
             frame_data = pkt_module().texture_builder.FrameData()
             frame_data.geo = geo
             frame_data.image = np_img
@@ -115,6 +119,7 @@ def bake_texture(geotracker: Any, selected_frames: List[int],
     current_frame = bpy_current_frame()
     bpy_progress_begin(0, 1)
     _set_bad_frame()
+    get_cached_geo(geotracker.geomobj, get_uv=True)
     built_texture = pkt_module().texture_builder.build_texture(
         len(selected_frames),
         _create_frame_data_loader(geotracker, selected_frames),
@@ -157,6 +162,7 @@ def bake_generator(area: Area, geotracker: Any, filepath_pattern: str,
                    *, file_format: str = 'PNG', frames: List[int],
                    digits: int = 4, product: int) -> Any:
     def _finish():
+        errors = writer.shutdown() if writer is not None else []
         settings.stop_calculating()
         revert_default_screen_message(unregister=not settings.pinmode,
                                       product=product)
@@ -166,6 +172,12 @@ def bake_generator(area: Area, geotracker: Any, filepath_pattern: str,
             settings.viewport_state.show_ui_elements(area)
             exit_area_localview(area)
         settings.user_interrupts = True
+        return errors
+
+    def _report(errors: List[str]) -> None:
+        if len(errors) > 0:
+            show_warning_dialog('Texture sequence is not saved:\n' +
+                                '\n'.join(errors))
 
     delta = 0.001
     settings = get_settings(product)
@@ -175,31 +187,55 @@ def bake_generator(area: Area, geotracker: Any, filepath_pattern: str,
                                product=product)
 
     tex = None
-    total_frames = len(frames)
-    for num, frame in enumerate(frames):
-        if settings.user_interrupts:
-            _finish()
-            return None
-
-        texture_projection_screen_message(num + 1, total_frames, product=product)
+    writer = AsyncImageWriter() \
+        if AsyncImageWriter.supports(file_format) else None
+    try:
+        total_frames = len(frames)
+        for num, frame in enumerate(frames):
+            while writer is not None and writer.is_full() \
+                    and not settings.user_interrupts:
+                yield delta
+
+            if settings.user_interrupts:
+                _report(_finish())
+                return None
 
-        settings.user_percent = 100 * num / total_frames
-        bpy_set_current_frame(frame)
+            if writer is not None:
+                errors = writer.take_errors()
+                if len(errors) > 0:
+                    _report(errors + _finish())
+                    return None
 
-        yield delta
+            texture_projection_screen_message(num + 1, total_frames, product=product)
 
-        built_texture = bake_texture(geotracker, [frame], product=product)
-        if tex is None:
-            tex = create_compatible_bpy_image(built_texture)
-        tex.filepath_raw = filepath_pattern.format(str(frame).zfill(digits))
-        tex.file_format = file_format
-        assign_pixels_data(tex.pixels, built_texture.ravel())
-        tex.save()
-        _log.info(f'TEXTURE SAVED: {tex.filepath}')
+            settings.user_percent = 100 * num / total_frames
+            bpy_set_current_frame(frame)
 
-        yield delta
+            yield delta
 
-    _finish()
+            built_texture = bake_texture(geotracker, [frame], product=product)
+            filepath = filepath_pattern.format(str(frame).zfill(digits))
+            if writer is not None:
+                writer.submit(filepath, built_texture)
+            else:
+                if tex is None:
+                    tex = create_compatible_bpy_image(built_texture)
+                tex.filepath_raw = filepath
+                tex.file_format = file_format
+                assign_pixels_data(tex.pixels, built_texture.ravel())
+                tex.save()
+                _log.info(f'TEXTURE SAVED: {tex.filepath}')
+
+            yield delta
+
+        _report(_finish())
+    except Exception as err:
+        _log.error(f'bake_generator Exception:\n{str(err)}')
+        _report([str(err)] + _finish())
+        return None
+    finally:
+        if writer is not None:
+            writer.shutdown()
     return None
 
 
@@ -20,6 +20,7 @@ import os
 from typing import Tuple, Optional, Any, List
 from math import pi
 
+import numpy as np
 from bpy.types import Object
 
 from ...utils.kt_logging import KTLogger
@@ -33,7 +34,9 @@ from ...utils.animation import (get_action,
                                 get_object_keyframe_numbers,
                                 get_rot_dict,
                                 get_action_fcurve,
-                                get_fcurve_data)
+                                get_fcurve_points_array,
+                                set_fcurve_point_values)
+from ...utils.euler import unbreak_euler_array
 
 
 _log = KTLogger(__name__)
@@ -135,14 +138,38 @@ def get_previous_tracking_keyframe(kt_geotracker: Any, current_frame: int) -> in
         return current_frame
 
 
-def unbreak_rotation(obj: Object, frame_list: List[int]) -> bool:
-    if len(frame_list) < 2:
-        return False
-
+def _unbreak_rotation_fast(obj: Object, frame_list: List[int]) -> bool:
     action = get_action(obj)
-    if action is None:
+    fcurves = [get_action_fcurve(action, 'rotation_euler', index=i)
+               for i in range(3)]
+    if not all(fcurves):
         return False
 
+    frames = np.array(frame_list, dtype=np.float32)
+    points_list = []
+    indices_list = []
+    for fcurve in fcurves:
+        points = get_fcurve_points_array(fcurve)
+        order = np.argsort(points[:, 0], kind='stable')
+        positions = np.searchsorted(points[order, 0], frames)
+        positions = np.clip(positions, 0, max(len(order) - 1, 0))
+        if len(order) == 0 or \
+                not np.array_equal(points[order[positions], 0], frames):
+            return False
+        points_list.append(points)
+        indices_list.append(order[positions])
+
+    euler = np.column_stack([points[indices, 1] for points, indices
+                             in zip(points_list, indices_list)])
+    rot = unbreak_euler_array(euler.astype(np.float64))
+
+    for i, (fcurve, indices) in enumerate(zip(fcurves, indices_list)):
+        set_fcurve_point_values(fcurve, indices, rot[:, i])
+    return True
+
+
+def _unbreak_rotation_per_frame(obj: Object, frame_list: List[int]) -> bool:
+    action = get_action(obj)
     euler_list = list()
     for frame in frame_list:
         x_rot = get_safe_evaluated_fcurve(obj, frame, 'rotation_euler', 0)
@@ -162,6 +189,21 @@ def unbreak_rotation(obj: Object, frame_list: List[int]) -> bool:
         insert_point_in_fcurve(y_rot_fcurve, frame, rot[1])
         insert_point_in_fcurve(z_rot_fcurve, frame, rot[2])
         euler_prev = rot
+    return True
+
+
+def unbreak_rotation(obj: Object, frame_list: List[int]) -> bool:
+    if len(frame_list) < 2:
+        return False
+
+    action = get_action(obj)
+    if action is None:
+        return False
+
+    if obj.rotation_mode != 'XYZ' or \
+            not _unbreak_rotation_fast(obj, frame_list):
+        _log.output('unbreak_rotation: per-frame fallback')
+        _unbreak_rotation_per_frame(obj, frame_list)
 
     update_depsgraph()
     return True
@@ -191,17 +233,14 @@ def check_unbreak_rotaion_is_needed(obj: Object) -> bool:
         if not fcurve:
             continue
 
-        points = get_fcurve_data(fcurve)
+        points = get_fcurve_points_array(fcurve)
         if len(points) < 2:
             continue
 
-        points.sort(key = lambda x: x[0])
-        prev = points[0][1]
-        for point in points[1:]:
-            if abs(prev - point[1]) > pi:
-                _log.magenta('check_unbreak_rotaion_is_needed True end >>>')
-                return True
-            prev = point[1]
+        values = points[np.argsort(points[:, 0], kind='stable'), 1]
+        if np.any(np.abs(np.diff(values)) > pi):
+            _log.magenta('check_unbreak_rotaion_is_needed True end >>>')
+            return True
 
     _log.output('check_unbreak_rotaion_is_needed False end >>>')
     return False
@@ -30,10 +30,13 @@ from ..addon_config import (Config,
 from ..geotracker_config import GTConfig
 from ..utils.coords import (get_camera_border,
                             image_space_to_region,
+                            image_space_to_region_array,
                             frame_to_image_space,
+                            frame_to_image_space_array,
+                            frame_to_region_array,
                             multiply_verts_on_matrix_4x4,
                             to_homogeneous,
-                            pin_to_xyz_from_mesh,
+                            pins_to_xyz_from_mesh,
                             get_area_region,
                             get_area_region_3d,
                             calc_camera_zoom_and_offset,
@@ -113,9 +116,9 @@ class GTViewport(KTViewport):
             rx, ry = bpy_render_frame()
 
             try:
-                verts = [frame_to_image_space(*kt_pins[i].surface_point,
-                                              rx, ry, shift_x, shift_y)
-                         for i in selected_pins]
+                verts = frame_to_image_space_array(
+                    [kt_pins[i].surface_point for i in selected_pins],
+                    rx, ry, shift_x, shift_y)
                 point = image_space_to_region(*np.average(verts, axis=0),
                                               x1, y1, x2, y2, shift_x, shift_y)
             except Exception as err:
@@ -205,9 +208,9 @@ class GTViewport(KTViewport):
 
         pins = self.pins()
         if pins.move_pin_mode():
-            hidden_color = (*color[:3], 0.0)
-            for i in [x for x in pins.get_disabled_pins() if x < verts_count]:
-                colors[i] = hidden_color
+            disabled_pins = pins.get_disabled_pins()
+            colors[disabled_pins[disabled_pins < verts_count]] = \
+                (*color[:3], 0.0)
 
         if len(verts) > 0:
             m = np.array(obj.matrix_world, dtype=np.float32).transpose()
@@ -239,18 +242,13 @@ class GTViewport(KTViewport):
                                  keyframe: int) -> Any:
         _log.yellow('surface_points_from_mesh start')
         pins_count = gt.pins_count()
-        verts = np.zeros((pins_count, 3), dtype=np.float32)
         obj = evaluated_object(geomobj)
-        if pins_count ==0 or len(obj.data.vertices) == 0:
+        if pins_count == 0 or len(obj.data.vertices) == 0:
             _log.output('surface_points_from_mesh empty end >>>')
-            return verts
-
-        for i in range(pins_count):
-            pin = gt.pin(keyframe, i)
-            if pin is not None:
-                p = pin_to_xyz_from_mesh(pin, obj)
-                if p is not None:
-                    verts[i] = p
+            return np.zeros((pins_count, 3), dtype=np.float32)
+
+        verts = pins_to_xyz_from_mesh(
+            [gt.pin(keyframe, i) for i in range(pins_count)], obj)
         _log.output('surface_points_from_mesh end >>>')
         return verts
 
@@ -262,23 +260,13 @@ class GTViewport(KTViewport):
         pins = self.pins()
 
         shift_x, shift_y = get_scene_camera_shift()
-        points = [image_space_to_region(p[0], p[1], x1, y1, x2, y2,
-                                        shift_x, shift_y) for p in pins.arr()]
-        points_count = len(points)
-
-        vertex_colors = [GTConfig.pin_color] * points_count
-
-        color = (*GTConfig.disabled_pin_color[:3], 0.0) \
-            if pins.move_pin_mode() else GTConfig.disabled_pin_color
-        for i in [x for x in pins.get_disabled_pins() if x < points_count]:
-            vertex_colors[i] = color
-
-        for i in [x for x in pins.get_selected_pins() if x < points_count]:
-            vertex_colors[i] = GTConfig.selected_pin_color
-
-        pin_num = pins.current_pin_num()
-        if pins.current_pin() and pin_num < points_count:
-            vertex_colors[pin_num] = GTConfig.current_pin_color
+        points = image_space_to_region_array(pins.arr(), x1, y1, x2, y2,
+                                             shift_x, shift_y)
+        vertex_colors = pins.vertex_colors(len(points),
+                                           GTConfig.pin_color,
+                                           GTConfig.disabled_pin_color,
+                                           GTConfig.selected_pin_color,
+                                           GTConfig.current_pin_color)
 
         self.points2d().set_vertices_and_colors(points, vertex_colors)
         self.points2d().create_batch()
@@ -329,32 +317,13 @@ class GTViewport(KTViewport):
         vv = to_homogeneous(p3d) @ transform
         vv = (vv.T / vv[:, 3]).T
 
-        residual_count = len(vv)
-        verts = np.empty((residual_count * 2, 2), dtype=np.float32)
-
         shift_x, shift_y = camobj.data.shift_x, camobj.data.shift_y
-        for i, v in enumerate(vv):
-            x, y = frame_to_image_space(v[0], v[1], rx, ry, shift_x, shift_y)
-            verts[i * 2] = image_space_to_region(x, y, x1, y1, x2, y2,
-                                                 shift_x, shift_y)
-            verts[i * 2 + 1] = p2d[i][:2]
-            # length = np.linalg.norm((v[0]-p2d[i][0], v[1]-p2d[i][1]))
-
-        wire.edge_lengths = np.full((residual_count, 2),
-                                    (0.0, Config.residual_dashed_line_length),
-                                    dtype=np.float32).ravel()
-
-        wire.vertices = verts
-        wire.vertex_colors = np.full((residual_count * 2, 4),
-                                     GTConfig.residual_color,
-                                     dtype=np.float32)
         pins = self.pins()
-        if pins.move_pin_mode():
-            points_count = len(wire.vertex_colors)
-            hidden_color = (*GTConfig.residual_color[:3], 0.0)
-            for i in [x for x in pins.get_disabled_pins() if 2 * x < points_count]:
-                wire.vertex_colors[i * 2] = hidden_color
-                wire.vertex_colors[i * 2 + 1] = hidden_color
+        wire.set_residual_lines(
+            frame_to_region_array(vv[:, :2], rx, ry, x1, y1, x2, y2,
+                                  shift_x, shift_y),
+            p2d, GTConfig.residual_color, Config.residual_dashed_line_length,
+            pins.get_disabled_pins() if pins.move_pin_mode() else None)
         wire.create_batch()
 
     def hide_pins_and_residuals(self):
@@ -18,7 +18,6 @@
 
 import numpy as np
 from typing import Any, Tuple, List, Dict, Optional
-from math import frexp
 
 from ..utils.kt_logging import KTLogger
 from ..addon_config import ProductType
@@ -47,7 +46,9 @@ from ..utils.images import (np_array_from_background_image,
                             np_threshold_image_with_channels,
                             np_array_from_bpy_image)
 from ..utils.ui_redraw import total_redraw_ui
-from ..utils.mesh_builder import build_geo
+from ..utils.mesh_builder import (get_cached_geo,
+                                  mesh_fingerprint,
+                                  invalidate_mesh_fingerprint)
 from ..tracker.tracking_blendshapes import remove_relative_shape_keyframe
 
 
@@ -77,9 +78,9 @@ class CameraInput(pkt_module().TrackerCameraInputI):
 class GeoInput(pkt_module().GeoInputI):
     _previous_val: int = 0
     _previous_hash: Any = pkt_module().Hash(_previous_val)
-    _hash_counter: int = 0
 
     hash_is_cached: bool = False
+    from_basis: bool = False
 
     @classmethod
     def get_settings(cls) -> Any:
@@ -91,15 +92,9 @@ class GeoInput(pkt_module().GeoInputI):
 
     @classmethod
     def increment_hash(cls) -> None:
-        cls._hash_counter += 1
-        if cls._hash_counter > 1000:
-            cls._hash_counter = 0
+        invalidate_mesh_fingerprint()
         cls.clear_cache()
 
-    @classmethod
-    def get_hash_counter(cls) -> int:
-        return cls._hash_counter
-
     @classmethod
     def _set_previous_val(cls, val: int) -> Any:
         if cls._previous_val != val:
@@ -108,34 +103,18 @@ class GeoInput(pkt_module().GeoInputI):
         cls.hash_is_cached = True
         return cls._previous_hash
 
-
-    def _rounded(self, val: float) -> int:
-        p = frexp(val)
-        return int(round(p[0] * 10000, 0) + 3 * p[1])
-
     def geo_hash(self) -> Any:
         settings = self.get_settings()
 
         if self.hash_is_cached or settings.is_calculating():
             return self._previous_hash
 
-        _log.output(_log.color('magenta', 'new geo_hash'))
         geotracker = settings.get_current_geotracker_item()
-        if geotracker and geotracker.geomobj:
-            vert_count = len(geotracker.geomobj.data.vertices)
-            empirical_const = 3
-            poly_count = len(geotracker.geomobj.data.polygons) * empirical_const
-            scale = geotracker.geomobj.matrix_world.to_scale()
-            scale_val = self._rounded(29 * scale[0]) + \
-                        self._rounded(31 * scale[1]) + \
-                        self._rounded(37 * scale[2])
-        else:
-            vert_count = 0
-            poly_count = 0
-            scale_val = 0
-
-        val = abs(hash(settings.pinmode_id) + vert_count + poly_count +
-                  scale_val + self.get_hash_counter())
+        fingerprint = mesh_fingerprint(geotracker.geomobj, self.from_basis) \
+            if geotracker else 0
+        val = abs(hash((settings.pinmode_id, fingerprint)))
+        if val != self._previous_val:
+            _log.output(_log.color('magenta', 'new geo_hash'))
         return self._set_previous_val(val)
 
     def geo(self) -> Any:
@@ -143,7 +122,8 @@ class GeoInput(pkt_module().GeoInputI):
         geotracker = settings.get_current_geotracker_item()
         if not geotracker:
             return None
-        return build_geo(geotracker.geomobj, get_uv=False)
+        return get_cached_geo(geotracker.geomobj, get_uv=False,
+                              from_basis=self.from_basis)
 
 
 class ImageInput(pkt_module().ImageInputI):
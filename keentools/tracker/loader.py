@@ -33,7 +33,7 @@ from ..utils.coords import (image_space_to_frame,
                             calc_bpy_model_mat_relative_to_camera,
                             focal_by_projection_matrix_mm,
                             compensate_view_scale,
-                            frame_to_image_space,
+                            frame_to_image_space_array,
                             camera_sensor_width,
                             xy_to_xz_rotation_matrix_3x3,
                             xz_to_xy_rotation_matrix_3x3,
@@ -53,6 +53,8 @@ from ..blender_independent_packages.pykeentools_loader import module as pkt_modu
 from ..utils.images import get_background_image_strict
 from ..geotracker.utils.prechecks import common_checks
 from ..utils.manipulate import switch_to_camera
+from ..utils.mesh_builder import (invalidate_geo_cache,
+                                  invalidate_mesh_fingerprint)
 
 
 _log = KTLogger(__name__)
@@ -74,6 +76,12 @@ def depsgraph_update_handler_wrapper(settings_func: Callable) -> Callable:
                 return True
             return False
 
+        def _check_geometry_updated(depsgraph, names):
+            for update in depsgraph.updates:
+                if update.is_updated_geometry and update.id.name in names:
+                    return True
+            return False
+
         if bpy_is_animation_playing():
             return
 
@@ -101,6 +109,11 @@ def depsgraph_update_handler_wrapper(settings_func: Callable) -> Callable:
         geomobj = geotracker.geomobj
         camobj = geotracker.camobj
 
+        if geomobj and _check_geometry_updated(
+                depsgraph, {geomobj.name, geomobj.data.name}):
+            invalidate_geo_cache(geomobj)
+            invalidate_mesh_fingerprint(geomobj)
+
         if geomobj and _check_updated(depsgraph, geomobj.name):
             loader.update_viewport_shaders(geomobj_matrix=True,
                                            pins_and_residuals=True)
@@ -354,9 +367,8 @@ class Loader:
             pins.clear_pins()
             _log.output('load_pins_into_viewport 1 end>>>')
             return
-        pins.set_pins(np.array([frame_to_image_space(*pin.img_pos, w, h,
-                                                     *get_scene_camera_shift())
-                                for pin in kt_pins], dtype=np.float32))
+        pins.set_pins(frame_to_image_space_array(
+            [pin.img_pos for pin in kt_pins], w, h, *get_scene_camera_shift()))
         pins.set_disabled_pins([i for i, pin in enumerate(kt_pins)
                                 if not pin.enabled])
         _log.output('load_pins_into_viewport end >>>')
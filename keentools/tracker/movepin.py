@@ -25,7 +25,6 @@ from ..utils.kt_logging import KTLogger
 from ..geotracker_config import GTConfig
 from ..utils.coords import (get_image_space_coord,
                             image_space_to_frame,
-                            nearest_point,
                             point_is_in_area,
                             point_is_in_service_region,
                             change_near_and_far_clip_planes,
@@ -107,7 +106,7 @@ class MovePin(bpy.types.Operator):
         x, y = get_image_space_coord(mouse_x, mouse_y, area,
                                      *get_scene_camera_shift())
 
-        nearest, dist2 = nearest_point(x, y, pins.arr())
+        nearest, dist2 = pins.nearest_pin(x, y)
 
         if nearest >= 0 and dist2 < vp.tolerance_dist2():
             _log.output(f'init_action PIN FOUND: {nearest}')
@@ -236,7 +235,7 @@ class MovePin(bpy.types.Operator):
         x, y = get_image_space_coord(mouse_x, mouse_y, area, shift_x, shift_y)
         pins = loader.viewport().pins()
         pin_index = pins.current_pin_num()
-        pins.arr()[pin_index] = (x, y)
+        pins.set_pin_position(pin_index, (x, y))
         selected_pins = pins.get_selected_pins()
 
         loader.safe_keyframe_add(kid)
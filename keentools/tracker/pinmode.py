@@ -33,7 +33,6 @@ from ..geotracker_config import GTConfig
 from ..utils.coords import (point_is_in_area,
                             point_is_in_service_region,
                             get_image_space_coord,
-                            nearest_point,
                             change_near_and_far_clip_planes,
                             get_camera_border)
 from ..utils.manipulate import (force_undo_push,
@@ -152,7 +151,7 @@ class PinMode(Operator):
 
         x, y = get_image_space_coord(mouse_x, mouse_y, area,
                                      *get_scene_camera_shift())
-        nearest, dist2 = nearest_point(x, y, vp.pins().arr())
+        nearest, dist2 = vp.pins().nearest_pin(x, y)
         if nearest >= 0 and dist2 < vp.tolerance_dist2():
             _log.output(f'CHANGE SELECTION PIN FOUND: {nearest}')
             pins.set_current_pin_num(nearest)
@@ -189,7 +188,7 @@ class PinMode(Operator):
         x, y = get_image_space_coord(mouse_x, mouse_y, area,
                                      *get_scene_camera_shift())
 
-        nearest, dist2 = nearest_point(x, y, vp.pins().arr())
+        nearest, dist2 = vp.pins().nearest_pin(x, y)
         if nearest >= 0 and dist2 < vp.tolerance_dist2():
             return self._delete_pins([nearest])
 
@@ -218,8 +217,8 @@ class PinMode(Operator):
         pin_index_list.sort()
         for i in reversed(pin_index_list):
             gt.remove_pin(i)
-            pins.remove_pin(i)
             _log.output(f'GT PIN REMOVED {i}')
+        pins.remove_pins(pin_index_list)
 
         kid = bpy_current_frame()
         loader.safe_keyframe_add(kid)
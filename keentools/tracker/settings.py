@@ -17,7 +17,7 @@
 # ##### END GPL LICENSE BLOCK #####
 
 import numpy as np
-from typing import Optional, Tuple, Any, List, Set
+from typing import Optional, Tuple, Any
 from contextlib import contextmanager
 
 from bpy.types import (Object, CameraBackgroundImage, Area, Image, Mask,
@@ -31,11 +31,13 @@ from ..utils.images import (get_background_image_object,
                             get_background_image_strict,
                             set_background_image_by_movieclip)
 from ..geotracker.utils.tracking import reload_precalc
+from ..utils.mesh_builder import (get_polygons_in_vertex_group,
+                                  invalidate_vertex_group_selections)
 from ..utils.coords import (xz_to_xy_rotation_matrix_4x4,
                             get_scale_vec_4_from_matrix_world,
                             get_image_space_coord,
                             get_camera_border,
-                            get_polygons_in_vertex_group,
+                            PinsGeometryValidator,
                             LocRotScale)
 from ..utils.bpy_common import (bpy_render_frame,
                                 bpy_current_frame,
@@ -182,53 +184,25 @@ class TrackerItem(PropertyGroup):
         return nm
 
     def check_pins_on_geometry(self, gt: Any, deep_analyze: bool=False) -> bool:
-        def _polygon_exists(vertices: List, poly_sets: List) -> bool:
-            vert_set = set(vertices)
-            for poly_set in poly_sets:
-                if poly_set.issuperset(vert_set):
-                    return True
-            return False
-
         geomobj = self.geomobj
         if not geomobj or not geomobj.type == 'MESH':
             gt.remove_pins()
             return False
 
-        verts_count = len(geomobj.data.vertices)
-
         keyframes = gt.keyframes()
         if len(keyframes) == 0:
             gt.remove_pins()
             return False
 
-        mesh = geomobj.data
-        poly_set_list: List[Set] = []
-
-        if deep_analyze:
-            for p in mesh.polygons:
-                poly_set_list.append(set(p.vertices[:]))
-
-        wrong_pins: List[int] = []
+        validator = PinsGeometryValidator(geomobj.data, deep_analyze)
         try:
-            for i in range(gt.pins_count()):
-                pin = gt.pin(keyframes[0], i)
-                if not pin:
-                    wrong_pins.append(i)
-                    continue
-                sp = pin.surface_point
-                gp = sp.geo_point_idxs
-                if len(gp) < 3 or gp[0] >= verts_count or \
-                        gp[1] >= verts_count or gp[2] >= verts_count:
-                    wrong_pins.append(i)
-                    continue
-                if deep_analyze and not _polygon_exists(sp.geo_point_idxs[:],
-                                                        poly_set_list):
-                    wrong_pins.append(i)
+            reports = validator.keyframe_reports(gt, keyframes[:1])
         except pkt_module().FaceGeoInputException as err:
             _log.red(f'check_pins_on_geometry FaceGeoInputException:\n{str(err)}')
             gt.remove_pins()
             return False
 
+        wrong_pins = reports[keyframes[0]]
         if len(wrong_pins) > 0:
             _log.output(f'WRONG PINS: {wrong_pins}')
             for i in reversed(wrong_pins):
@@ -328,6 +302,7 @@ class TRSceneSetting(PropertyGroup):
         gt = self.loader().kt_geotracker()
         if not geotracker.geomobj:
             return
+        invalidate_vertex_group_selections(geotracker.geomobj)
         polys = get_polygons_in_vertex_group(geotracker.geomobj,
                                              geotracker.mask_3d,
                                              geotracker.mask_3d_inverted)
@@ -18,7 +18,8 @@
 
 import numpy as np
 import re
-from typing import Any, Set, Tuple, List, Optional
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Set, Tuple, List, Optional, Dict
 
 from bpy.types import Area, Object
 
@@ -27,13 +28,17 @@ from ..addon_config import ft_settings
 from ..facetracker_config import FTConfig
 from ..utils.bpy_common import (bpy_new_action,
                                 bpy_shape_key_move_top,
-                                bpy_shape_key_move_up,
                                 bpy_shape_key_move_bottom)
 from ..utils.coords import xy_to_xz_rotation_matrix_3x3, InvScaleFromMatrix
 from ..utils.blendshapes import get_blendshape
 from ..utils.fcurve_operations import (get_safe_action_fcurve,
                                        get_action_fcurve,
                                        clear_fcurve)
+from .vertex_cache import (FrameVertexCache,
+                           facetracker_vertex_cache,
+                           uses_vertex_cache,
+                           get_neutral_vertices,
+                           remove_vertex_cache_shape)
 
 
 _log = KTLogger(__name__)
@@ -47,17 +52,222 @@ def get_all_tracking_frame_shapes(key_blocks: Any) -> List:
             if tracking_frame_name_pattern.match(kb.name)]
 
 
+class FrameShapeIndex:
+    ''' Positions of frame_XXXX shapes in key_blocks (sorted) and their frames.
+        Built with one scan of key_blocks and reused until the shape key
+        names change, so prev/next lookups are bisections instead of scans.
+        ordered_count is the length of the frame prefix known to be sorted
+        by frame. '''
+    def __init__(self, key_blocks: Any):
+        self.key_names: List[str] = [kb.name for kb in key_blocks]
+        self.count: int = len(self.key_names)
+        self.positions: List[int] = []
+        self.frames: List[int] = []
+        self.names: List[str] = []
+        self.frame_positions: Dict[int, int] = {}
+        for i, name in enumerate(self.key_names):
+            res = tracking_frame_name_pattern.match(name)
+            if not res:
+                continue
+            frame = int(res[1])
+            self.positions.append(i)
+            self.frames.append(frame)
+            self.names.append(name)
+            self.frame_positions[frame] = i
+        self.ordered_count: int = 0
+        self._update_ordered_count()
+
+    def _update_ordered_count(self) -> None:
+        count = min(1, len(self.frames))
+        while count < len(self.frames) and \
+                self.frames[count - 1] < self.frames[count]:
+            count += 1
+        self.ordered_count = count
+
+    def is_actual(self, key_blocks: Any) -> bool:
+        if len(key_blocks) != self.count:
+            return False
+        return [kb.name for kb in key_blocks] == self.key_names
+
+    def prev_shape(self, shape_index: int) -> Tuple[int, int]:
+        i = bisect_left(self.positions, shape_index) - 1
+        if i < 0 or self.positions[i] < 1:
+            return -1, -1
+        return self.positions[i], self.frames[i]
+
+    def next_shape(self, shape_index: int) -> Tuple[int, int]:
+        i = bisect_right(self.positions, shape_index)
+        if i >= len(self.positions):
+            return -1, -1
+        return self.positions[i], self.frames[i]
+
+    def frame_position(self, frame: int) -> int:
+        return self.frame_positions.get(frame, -1)
+
+    def _shift_positions(self, start: int, shift: int) -> None:
+        for i in range(start, len(self.positions)):
+            self.positions[i] += shift
+            self.frame_positions[self.frames[i]] = self.positions[i]
+
+    def append_shape(self, name: str) -> None:
+        ''' New shape was added to the end of key_blocks '''
+        position = self.count
+        self.count += 1
+        self.key_names.append(name)
+        res = tracking_frame_name_pattern.match(name)
+        if not res:
+            return
+        frame = int(res[1])
+        if self.ordered_count == len(self.frames) and \
+                (len(self.frames) == 0 or self.frames[-1] < frame):
+            self.ordered_count += 1
+        self.positions.append(position)
+        self.frames.append(frame)
+        self.names.append(name)
+        self.frame_positions[frame] = position
+
+    def move_to_bottom(self, shape_index: int) -> None:
+        self.key_names.append(self.key_names.pop(shape_index))
+        self.ordered_count = 0
+        i = bisect_left(self.positions, shape_index)
+        if i >= len(self.positions) or self.positions[i] != shape_index:
+            self._shift_positions(i, -1)
+            return
+        frame = self.frames.pop(i)
+        name = self.names.pop(i)
+        self.positions.pop(i)
+        self._shift_positions(i, -1)
+        self.positions.append(self.count - 1)
+        self.frames.append(frame)
+        self.names.append(name)
+        self.frame_positions[frame] = self.count - 1
+
+    def move_to_top(self, shape_index: int) -> None:
+        ''' Blender moves a relative shape key to index 1,
+            the reference key stays at index 0 '''
+        self.key_names.insert(1, self.key_names.pop(shape_index))
+        self.ordered_count = 0
+        start = bisect_left(self.positions, 1)
+        i = bisect_left(self.positions, shape_index)
+        if i >= len(self.positions) or self.positions[i] != shape_index:
+            for j in range(start, i):
+                self.positions[j] += 1
+                self.frame_positions[self.frames[j]] = self.positions[j]
+            return
+        frame = self.frames.pop(i)
+        name = self.names.pop(i)
+        self.positions.pop(i)
+        for j in range(start, i):
+            self.positions[j] += 1
+            self.frame_positions[self.frames[j]] = self.positions[j]
+        self.positions.insert(start, 1)
+        self.frames.insert(start, frame)
+        self.names.insert(start, name)
+        self.frame_positions[frame] = 1
+
+    def target_order(self) -> List[int]:
+        ''' Current indices in the wanted order: all other shapes keep
+            their order and go first, frame shapes follow sorted by frame '''
+        frame_position_set = set(self.positions)
+        others = [i for i in range(self.count) if i not in frame_position_set]
+        order = sorted(range(len(self.frames)), key=lambda x: self.frames[x])
+        return others + [self.positions[i] for i in order]
+
+    def insertion_moves(self, frame: int) -> Optional[Tuple[str, List[int]]]:
+        ''' Moves for a new frame shape at the bottom of key_blocks when
+            all other frame shapes are sorted and go last. One bisection
+            finds the place, then either the later frames are sent to the
+            bottom or the new shape and the earlier frames go to the top.
+            None when the layout is different.
+            :return: direction ('BOTTOM' or 'TOP'), shape indices to move
+        '''
+        n = len(self.frames) - 1
+        if n < 0 or self.frames[-1] != frame or \
+                self.positions[-1] != self.count - 1 or \
+                self.ordered_count < n or \
+                (n > 0 and self.positions[n - 1] != self.count - 2) or \
+                (n > 0 and self.positions[n - 1] - self.positions[0] != n - 1):
+            return None
+        i = bisect_left(self.frames, frame, 0, n)
+        if i < n and self.frames[i] == frame:
+            return None
+        later = n - i
+        if later == 0:
+            return 'BOTTOM', []
+        if n > 0 and self.positions[0] == 1 and i + 1 < later:
+            return 'TOP', [self.count - 1] + [i + 1] * i
+        return 'BOTTOM', [self.positions[i]] * later
+
+    def reorder_moves(self) -> Tuple[str, List[int]]:
+        ''' Moves to get target_order with the smallest number of operator
+            calls. Shapes which are already in order at the beginning (or at
+            the end) of the target stay in place, the rest is sent to the
+            bottom (or to the top) one by one. TOP puts a shape right below
+            the reference key, so it is used only when the reference key
+            is not a frame shape and never moves.
+            :return: direction ('BOTTOM' or 'TOP'), shape indices to move
+        '''
+        target = self.target_order()
+        prefix = 1
+        while prefix < len(target) and target[prefix - 1] < target[prefix]:
+            prefix += 1
+        suffix = 1
+        while suffix < len(target) - 1 and \
+                target[-suffix - 1] < target[-suffix]:
+            suffix += 1
+
+        if target[0] != 0 or prefix > suffix:
+            direction = 'BOTTOM'
+            to_move = target[prefix:]
+        else:
+            direction = 'TOP'
+            to_move = target[-suffix - 1:0:-1]
+
+        moved: List[int] = []
+        moves: List[int] = []
+        for position in to_move:
+            index = position - bisect_left(moved, position)
+            moves.append(index if direction == 'BOTTOM' else
+                         index + len(moved))
+            insort(moved, position)
+        return direction, moves
+
+
+_frame_shape_indices: Dict[int, FrameShapeIndex] = {}
+
+
+def get_frame_shape_index(key_blocks: Any) -> FrameShapeIndex:
+    key_id = key_blocks.id_data.as_pointer()
+    index = _frame_shape_indices.get(key_id)
+    if index is None or not index.is_actual(key_blocks):
+        index = FrameShapeIndex(key_blocks)
+        _frame_shape_indices[key_id] = index
+    return index
+
+
+def invalidate_frame_shape_index(obj: Object) -> None:
+    shape_keys = obj.data.shape_keys
+    if not shape_keys:
+        return
+    _frame_shape_indices.pop(shape_keys.as_pointer(), None)
+
+
+def append_frame_shape_to_index(obj: Object, shape_name: str) -> None:
+    shape_keys = obj.data.shape_keys
+    index = _frame_shape_indices.get(shape_keys.as_pointer())
+    if index is None or index.count != len(shape_keys.key_blocks) - 1:
+        invalidate_frame_shape_index(obj)
+        return
+    index.append_shape(shape_name)
+
+
 def get_prev_frame_shape(key_blocks: Any, shape_index: int) -> Tuple[int, int]:
     '''
     :return: shape_index, frame_number
     '''
     if shape_index == -1:
         return -1, -1
-    for i in range(shape_index - 1, 0, -1):
-        res = tracking_frame_name_pattern.match(key_blocks[i].name)
-        if res:
-            return i, int(res[1])
-    return -1, -1
+    return get_frame_shape_index(key_blocks).prev_shape(shape_index)
 
 
 def get_next_frame_shape(key_blocks: Any, shape_index: int) -> Tuple[int, int]:
@@ -66,11 +276,7 @@ def get_next_frame_shape(key_blocks: Any, shape_index: int) -> Tuple[int, int]:
     '''
     if shape_index == -1:
         return -1, -1
-    for i in range(shape_index + 1, len(key_blocks)):
-        res = tracking_frame_name_pattern.match(key_blocks[i].name)
-        if res:
-            return i, int(res[1])
-    return -1, -1
+    return get_frame_shape_index(key_blocks).next_shape(shape_index)
 
 
 def check_tracking_frames(key_blocks: Any) -> Tuple[bool, Any]:
@@ -103,20 +309,28 @@ def check_tracking_frames(key_blocks: Any) -> Tuple[bool, Any]:
     return check_status, arr
 
 
+def _apply_reorder_moves(obj: Object, shape_index_data: FrameShapeIndex,
+                         direction: str, moves: List[int]) -> None:
+    for index in moves:
+        obj.active_shape_key_index = index
+        if direction == 'BOTTOM':
+            bpy_shape_key_move_bottom(obj)
+            shape_index_data.move_to_bottom(index)
+        else:
+            bpy_shape_key_move_top(obj)
+            shape_index_data.move_to_top(index)
+    shape_index_data.ordered_count = len(shape_index_data.frames)
+
+
 def reorder_tracking_frames(obj: Object) -> None:
     key_blocks = obj.data.shape_keys.key_blocks
-    check_status, arr = check_tracking_frames(key_blocks)
-    if check_status:
+    shape_index_data = get_frame_shape_index(key_blocks)
+    direction, moves = shape_index_data.reorder_moves()
+    if len(moves) == 0:
         _log.output(f'reorder_tracking_frames [no need]')
         return
-    pairs = arr[arr[:, 1] >= 0]
-    res = pairs[pairs[:, 1].argsort()]
-    indices = res[:, 0]
-    for i, index in enumerate(indices):
-        m = indices[:i]
-        offset = (m < index).sum()
-        obj.active_shape_key_index = index - offset
-        bpy_shape_key_move_bottom(obj)
+    _log.output(f'reorder_tracking_frames {direction}: {len(moves)}')
+    _apply_reorder_moves(obj, shape_index_data, direction, moves)
 
 
 def check_nearest_frame_sequence(frames: List, key_blocks_count: int) -> bool:
@@ -152,16 +366,31 @@ def get_frame_shape_name(frame: int) -> str:
 
 
 def bubble_frame_shape(obj: Object, shape_index: int, frame: int) -> int:
+    ''' The new frame shape is at the bottom. Depending on what is cheaper
+        the shapes of later frames go to the bottom or the new shape
+        with all the shapes above it go right below the reference key. '''
     key_blocks = obj.data.shape_keys.key_blocks
-    current_index = shape_index
-    for i in range(shape_index - 1, 0, -1):
-        prev_index, prev_frame = get_prev_frame_shape(key_blocks, current_index)
-        if prev_index == -1 or prev_frame < frame:
-            break
-        for _ in range(prev_index, current_index):
-            bpy_shape_key_move_up(obj)
-        current_index = prev_index
-    return current_index
+    shape_index_data = get_frame_shape_index(key_blocks)
+    insertion = shape_index_data.insertion_moves(frame)
+    direction, moves = shape_index_data.reorder_moves() \
+        if insertion is None else insertion
+    _apply_reorder_moves(obj, shape_index_data, direction, moves)
+    return shape_index_data.frame_position(frame)
+
+
+def tracked_frame_vertices(geomobj: Object, gt: Any,
+                           frame: int) -> np.ndarray:
+    scale_inv = np.array(InvScaleFromMatrix(geomobj.matrix_world),
+                         dtype=np.float32)
+    verts = gt.applied_args_model_vertices_at(frame)
+    return verts @ xy_to_xz_rotation_matrix_3x3() @ scale_inv
+
+
+def put_frame_in_vertex_cache(geomobj: Object, cache: FrameVertexCache,
+                              frame: int, verts: np.ndarray) -> None:
+    if cache.neutral is None or cache.vertex_count() != len(verts):
+        cache.set_neutral(get_neutral_vertices(geomobj))
+    cache.put_frame(frame, verts)
 
 
 def create_relative_shape_keyframe(frame: int, *,
@@ -177,6 +406,13 @@ def create_relative_shape_keyframe(frame: int, *,
     if not geomobj:
         return
 
+    if uses_vertex_cache(geotracker):
+        put_frame_in_vertex_cache(
+            geomobj, facetracker_vertex_cache(geotracker), frame,
+            tracked_frame_vertices(geomobj, loader.kt_geotracker(), frame))
+        _log.output(f'create_shape_keyframe vertex cache end >>>')
+        return
+
     mesh = geomobj.data
     mesh.shape_keys.use_relative = True
 
@@ -185,17 +421,17 @@ def create_relative_shape_keyframe(frame: int, *,
     if basis_index != 0:
         geomobj.active_shape_key_index = basis_index
         bpy_shape_key_move_top(geomobj)
+        invalidate_frame_shape_index(geomobj)
 
     shape_name = get_frame_shape_name(frame)
     shape_index, shape, new_shape_created = get_blendshape(geomobj,
                                                            name=shape_name,
                                                            create=True)
-    scale_inv = np.array(InvScaleFromMatrix(geomobj.matrix_world),
-                         dtype=np.float32)
+    if new_shape_created:
+        append_frame_shape_to_index(geomobj, shape_name)
     gt = loader.kt_geotracker()
-    verts = gt.applied_args_model_vertices_at(frame)
-    shape.data.foreach_set('co', (verts @ xy_to_xz_rotation_matrix_3x3()
-                                  @ scale_inv).ravel())
+    shape.data.foreach_set('co',
+                           tracked_frame_vertices(geomobj, gt, frame).ravel())
 
     geomobj.active_shape_key_index = shape_index
     key_blocks = mesh.shape_keys.key_blocks
@@ -214,7 +450,7 @@ def create_relative_shape_keyframe(frame: int, *,
                                         len(key_blocks)):
         _log.red('check_nearest_frame_sequence is not passed!')
         reorder_tracking_frames(geomobj)
-        shape_index, _, _ = get_blendshape(geomobj, name=shape_name)
+        shape_index = get_frame_shape_index(key_blocks).frame_position(frame)
         prev_index1, prev_frame1 = get_prev_frame_shape(key_blocks, shape_index)
         next_index1, next_frame1 = get_next_frame_shape(key_blocks, shape_index)
         prev_index2, prev_frame2 = get_prev_frame_shape(key_blocks, prev_index1)
@@ -260,6 +496,11 @@ def remove_relative_shape_keyframe(frame: int) -> None:
     if not geomobj:
         return
 
+    if uses_vertex_cache(geotracker):
+        facetracker_vertex_cache(geotracker).remove_frame(frame)
+        _log.output(f'remove_relative_shape_keyframe vertex cache end >>>')
+        return
+
     mesh = geomobj.data
     mesh.shape_keys.use_relative = True
 
@@ -271,6 +512,7 @@ def remove_relative_shape_keyframe(frame: int) -> None:
     if basis_index != 0:
         geomobj.active_shape_key_index = basis_index
         bpy_shape_key_move_top(geomobj)
+        invalidate_frame_shape_index(geomobj)
 
     shape_name = get_frame_shape_name(frame)
     shape_index, shape, new_shape_created = get_blendshape(geomobj,
@@ -291,7 +533,7 @@ def remove_relative_shape_keyframe(frame: int) -> None:
                                         len(key_blocks)):
         _log.red('check_nearest_frame_sequence is not passed!')
         reorder_tracking_frames(geomobj)
-        shape_index, _, _ = get_blendshape(geomobj, name=shape_name)
+        shape_index = get_frame_shape_index(key_blocks).frame_position(frame)
         prev_index1, prev_frame1 = get_prev_frame_shape(key_blocks, shape_index)
         next_index1, next_frame1 = get_next_frame_shape(key_blocks, shape_index)
         prev_index2, prev_frame2 = get_prev_frame_shape(key_blocks, prev_index1)
@@ -328,4 +570,83 @@ def remove_relative_shape_keyframe(frame: int) -> None:
 
     action.fcurves.remove(main_fcurve)
     geomobj.shape_key_remove(shape)
+    invalidate_frame_shape_index(geomobj)
     _log.output(f'remove_relative_shape_keyframe end >>>')
+
+
+def remove_all_tracking_frame_shapes(geomobj: Object) -> None:
+    shape_keys = geomobj.data.shape_keys
+    if not shape_keys:
+        return
+    anim_data = shape_keys.animation_data
+    action = anim_data.action if anim_data else None
+    for shape in get_all_tracking_frame_shapes(shape_keys.key_blocks):
+        if action:
+            fcurve = get_action_fcurve(action,
+                                       f'key_blocks["{shape.name}"].value')
+            if fcurve:
+                action.fcurves.remove(fcurve)
+        geomobj.shape_key_remove(shape)
+    invalidate_frame_shape_index(geomobj)
+
+
+def convert_frame_shapes_to_vertex_cache(geomobj: Object,
+                                         cache: FrameVertexCache) -> int:
+    _log.yellow('convert_frame_shapes_to_vertex_cache start')
+    shape_keys = geomobj.data.shape_keys
+    if not shape_keys:
+        return 0
+    key_blocks = shape_keys.key_blocks
+    index = get_frame_shape_index(key_blocks)
+    verts = np.empty((len(geomobj.data.vertices), 3), dtype=np.float32)
+    cache.clear()
+    cache.set_neutral(get_neutral_vertices(geomobj))
+    for position, frame in zip(index.positions, index.frames):
+        key_blocks[position].data.foreach_get('co', verts.ravel())
+        put_frame_in_vertex_cache(geomobj, cache, frame, verts)
+    remove_all_tracking_frame_shapes(geomobj)
+    _log.output(f'convert_frame_shapes_to_vertex_cache: '
+                f'{len(index.frames)} end >>>')
+    return len(index.frames)
+
+
+def convert_vertex_cache_to_frame_shapes(
+        geomobj: Object, cache: FrameVertexCache, *,
+        keyframe_set: Optional[Set] = None,
+        action_name: str = FTConfig.ft_action_name) -> int:
+    _log.yellow('convert_vertex_cache_to_frame_shapes start')
+    remove_vertex_cache_shape(geomobj)
+    if cache.is_empty():
+        return 0
+    remove_all_tracking_frame_shapes(geomobj)
+    basis_index, _, _ = get_blendshape(geomobj, name='Basis',
+                                       create_basis=True)
+    if basis_index != 0:
+        geomobj.active_shape_key_index = basis_index
+        bpy_shape_key_move_top(geomobj)
+
+    frames = cache.frames[:]
+    for frame in frames:
+        _, shape, _ = get_blendshape(geomobj, name=get_frame_shape_name(frame),
+                                     create=True)
+        shape.data.foreach_set('co', cache.frame_vertices(frame).ravel())
+    invalidate_frame_shape_index(geomobj)
+    reorder_tracking_frames(geomobj)
+
+    shape_keys = geomobj.data.shape_keys
+    shape_keys.use_relative = True
+    anim_data = shape_keys.animation_data
+    if not anim_data:
+        anim_data = shape_keys.animation_data_create()
+    if not anim_data.action:
+        anim_data.action = bpy_new_action(action_name)
+    action = anim_data.action
+
+    padded = [-1] + frames + [-1]
+    for i, frame in enumerate(frames, start=1):
+        fcurve = get_safe_action_fcurve(
+            action, f'key_blocks["{get_frame_shape_name(frame)}"].value')
+        make_fcurve_pile_animation(fcurve, padded[i - 1:i + 2], keyframe_set)
+    _log.output(f'convert_vertex_cache_to_frame_shapes: '
+                f'{len(frames)} end >>>')
+    return len(frames)
@@ -0,0 +1,233 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+# KeenTools for blender is a blender addon for using KeenTools in Blender.
+# Copyright (C) 2024 KeenTools
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ##### END GPL LICENSE BLOCK #####
+
+import os
+import re
+import uuid
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from bpy.app.handlers import persistent
+from bpy.types import Object
+
+from ..utils.kt_logging import KTLogger
+from ..addon_config import ft_settings
+from ..facetracker_config import FTConfig
+from ..utils.bpy_common import bpy_abspath, bpy_blend_filepath
+from ..utils.blendshapes import get_blendshape
+
+
+_log = KTLogger(__name__)
+
+
+_frame_file_pattern: Any = re.compile(r'frame_(\d+)\.npy$', 0)
+_neutral_filename: str = 'neutral.npy'
+
+
+def _frame_filename(frame: int) -> str:
+    return f'frame_{str(frame).zfill(4)}.npy'
+
+
+class FrameVertexCache:
+    ''' Tracked FaceTracker geometry stored outside of the blend-file.
+        The directory keeps neutral.npy (float32) and one frame_XXXX.npy
+        file with float16 deltas against the neutral per tracked frame. '''
+    max_loaded_frames: int = 16
+
+    def __init__(self, dir_path: str):
+        self.dir_path: str = dir_path
+        self.neutral: Optional[np.ndarray] = None
+        self.frames: List[int] = []
+        self._loaded: OrderedDict = OrderedDict()
+        self.reload()
+
+    def reload(self) -> None:
+        self.neutral = None
+        self.frames = []
+        self._loaded.clear()
+        if not os.path.isdir(self.dir_path):
+            return
+        neutral_path = os.path.join(self.dir_path, _neutral_filename)
+        if os.path.exists(neutral_path):
+            self.neutral = np.load(neutral_path)
+        frames = []
+        for filename in os.listdir(self.dir_path):
+            res = _frame_file_pattern.match(filename)
+            if res:
+                frames.append(int(res[1]))
+        self.frames = sorted(frames)
+
+    def is_empty(self) -> bool:
+        return self.neutral is None or len(self.frames) == 0
+
+    def vertex_count(self) -> int:
+        return 0 if self.neutral is None else len(self.neutral)
+
+    def set_neutral(self, verts: np.ndarray) -> None:
+        os.makedirs(self.dir_path, exist_ok=True)
+        self.neutral = np.asarray(verts, dtype=np.float32).reshape((-1, 3))
+        np.save(os.path.join(self.dir_path, _neutral_filename), self.neutral)
+
+    def put_frame(self, frame: int, verts: np.ndarray) -> None:
+        assert self.neutral is not None, 'FrameVertexCache: no neutral'
+        delta = (np.asarray(verts, dtype=np.float32).reshape((-1, 3))
+                 - self.neutral).astype(np.float16)
+        np.save(os.path.join(self.dir_path, _frame_filename(frame)), delta)
+        self._loaded.pop(frame, None)
+        if frame not in self.frames:
+            insort(self.frames, frame)
+
+    def remove_frame(self, frame: int) -> None:
+        if frame not in self.frames:
+            return
+        self.frames.remove(frame)
+        self._loaded.pop(frame, None)
+        try:
+            os.remove(os.path.join(self.dir_path, _frame_filename(frame)))
+        except OSError as err:
+            _log.error(f'FrameVertexCache.remove_frame {frame}:\n{str(err)}')
+
+    def clear(self) -> None:
+        for frame in self.frames[:]:
+            self.remove_frame(frame)
+
+    def _delta(self, frame: int) -> np.ndarray:
+        delta = self._loaded.get(frame)
+        if delta is not None:
+            self._loaded.move_to_end(frame)
+            return delta
+        delta = np.load(os.path.join(self.dir_path, _frame_filename(frame)))
+        self._loaded[frame] = delta
+        if len(self._loaded) > self.max_loaded_frames:
+            self._loaded.popitem(last=False)
+        return delta
+
+    def frame_vertices(self, frame: int) -> np.ndarray:
+        return self.neutral + self._delta(frame)
+
+    def vertices_at(self, frame: float) -> Optional[np.ndarray]:
+        ''' Linear blend between the nearest tracked frames, the same way
+            as the pile animation of frame shape keys works. '''
+        if self.is_empty():
+            return None
+        i = bisect_left(self.frames, frame)
+        if i < len(self.frames) and self.frames[i] == frame:
+            return self.frame_vertices(self.frames[i])
+        if i == 0:
+            return self.frame_vertices(self.frames[0])
+        if i == len(self.frames):
+            return self.frame_vertices(self.frames[-1])
+        left, right = self.frames[i - 1], self.frames[i]
+        t = (frame - left) / (right - left)
+        delta = (1.0 - t) * self._delta(left).astype(np.float32) + \
+            t * self._delta(right).astype(np.float32)
+        return self.neutral + delta
+
+
+_vertex_caches: Dict[str, FrameVertexCache] = {}
+
+
+def get_vertex_cache(dir_path: str) -> FrameVertexCache:
+    cache = _vertex_caches.get(dir_path)
+    if cache is None:
+        cache = FrameVertexCache(dir_path)
+        _vertex_caches[dir_path] = cache
+    return cache
+
+
+def default_vertex_cache_path() -> str:
+    ''' Blend-relative directory with a unique name for a new vertex cache,
+        empty for a blend-file that has never been saved '''
+    blend_filepath = bpy_blend_filepath()
+    if blend_filepath == '':
+        return ''
+    blend_name = os.path.splitext(os.path.basename(blend_filepath))[0]
+    return f'//{blend_name}{FTConfig.ft_vertex_cache_folder_suffix}/' \
+           f'{uuid.uuid4().hex}'
+
+
+def vertex_cache_dir(geotracker: Any) -> str:
+    if geotracker.vertex_cache_path == '':
+        return ''
+    return bpy_abspath(geotracker.vertex_cache_path)
+
+
+def facetracker_vertex_cache(geotracker: Any) -> FrameVertexCache:
+    return get_vertex_cache(vertex_cache_dir(geotracker))
+
+
+def uses_vertex_cache(geotracker: Any) -> bool:
+    return geotracker.vertex_storage == 'VERTEX_CACHE'
+
+
+def get_neutral_vertices(obj: Object) -> np.ndarray:
+    mesh = obj.data
+    verts = np.empty((len(mesh.vertices), 3), dtype=np.float32)
+    if mesh.shape_keys:
+        mesh.shape_keys.reference_key.data.foreach_get('co', verts.ravel())
+    else:
+        mesh.vertices.foreach_get('co', verts.ravel())
+    return verts
+
+
+def apply_vertex_cache(obj: Object, cache: FrameVertexCache,
+                       frame: float) -> bool:
+    verts = cache.vertices_at(frame)
+    if verts is None:
+        return False
+    if len(verts) != len(obj.data.vertices):
+        _log.error(f'apply_vertex_cache: vertex count mismatch '
+                   f'{len(verts)} != {len(obj.data.vertices)}')
+        return False
+    _, shape, _ = get_blendshape(obj, name=FTConfig.ft_vertex_cache_shape_name,
+                                 create_basis=True, create=True)
+    shape.value = 1.0
+    shape.data.foreach_set('co', verts.ravel())
+    obj.data.update()
+    return True
+
+
+def remove_vertex_cache_shape(obj: Object) -> None:
+    _, shape, _ = get_blendshape(obj, name=FTConfig.ft_vertex_cache_shape_name)
+    if shape is not None:
+        obj.shape_key_remove(shape)
+
+
+@persistent
+def vertex_cache_load_pre_handler(*args) -> None:
+    ''' Caches are keyed by directory, another file may use the same one '''
+    _vertex_caches.clear()
+
+
+@persistent
+def vertex_cache_frame_change_handler(scene: Any) -> None:
+    settings = ft_settings()
+    if settings is None:
+        return
+    for geotracker in settings.facetrackers:
+        if not uses_vertex_cache(geotracker) or not geotracker.geomobj:
+            continue
+        try:
+            apply_vertex_cache(geotracker.geomobj,
+                               facetracker_vertex_cache(geotracker),
+                               scene.frame_current)
+        except Exception as err:
+            _log.error(f'vertex_cache_frame_change_handler '
+                       f'Exception:\n{str(err)}')
@@ -17,8 +17,9 @@
 # ##### END GPL LICENSE BLOCK #####
 import numpy as np
 import math
+import itertools
 from math import radians
-from typing import Any, Tuple, List, Optional, Set, Callable
+from typing import Any, Dict, Tuple, List, Optional, Set, Callable
 
 from bpy.types import Area, Object
 from mathutils import Matrix, Quaternion, Vector
@@ -29,7 +30,6 @@ from .fake_context import get_fake_context
 from .bpy_common import (bpy_current_frame,
                          bpy_render_frame,
                          bpy_render_aspect,
-                         evaluated_mesh,
                          bpy_background_mode)
 from .animation import get_safe_evaluated_fcurve
 
@@ -205,6 +205,72 @@ def image_space_to_region(x: float, y: float, x1: float, y1: float,
            (y1 + y2) * 0.5 + y * sc + 2 * shift_y * h
 
 
+def frame_to_image_space_array(points: Any, frame_w: float, frame_h: float,
+                               shift_x: float = 0.0,
+                               shift_y: float = 0.0) -> Any:
+    ''' frame_to_image_space for (n, 2) array '''
+    asp = 1.0 if frame_w >= frame_h else frame_h / frame_w
+    res = np.empty((len(points), 2), dtype=np.float32)
+    if len(points) == 0:
+        return res
+    points = np.asarray(points, dtype=np.float32)
+    res[:, 0] = points[:, 0] / frame_w - 0.5 - shift_x * asp
+    res[:, 1] = (points[:, 1] - 0.5 * frame_h) / frame_w - shift_y * asp
+    return res
+
+
+def image_space_to_frame_array(points: Any, shift_x: float = 0.0,
+                               shift_y: float = 0.0) -> Any:
+    ''' image_space_to_frame for (n, 2) array '''
+    w, h = bpy_render_frame()
+    asp = 1.0 if w >= h else h / w
+    res = np.empty((len(points), 2), dtype=np.float32)
+    if len(points) == 0:
+        return res
+    points = np.asarray(points, dtype=np.float32)
+    res[:, 0] = (points[:, 0] + shift_x * asp + 0.5) * w
+    res[:, 1] = (points[:, 1] + shift_y * asp) * w + 0.5 * h
+    return res
+
+
+def image_space_to_region_array(points: Any, x1: float, y1: float,
+                                x2: float, y2: float, shift_x: float = 0.0,
+                                shift_y: float = 0.0) -> Any:
+    ''' image_space_to_region for (n, 2) array '''
+    sc = x2 - x1
+    res = np.empty((len(points), 2), dtype=np.float32)
+    if len(points) == 0:
+        return res
+    points = np.asarray(points, dtype=np.float32)
+    res[:, 0] = x1 + (points[:, 0] + 0.5 + 2 * shift_x) * sc
+    res[:, 1] = (y1 + y2) * 0.5 + points[:, 1] * sc + 2 * shift_y * (y2 - y1)
+    return res
+
+
+def region_to_image_space_array(points: Any, x1: float, y1: float,
+                                x2: float, y2: float, shift_x: float = 0.0,
+                                shift_y: float = 0.0) -> Any:
+    ''' region_to_image_space for (n, 2) array '''
+    w = (x2 - x1) if x2 != x1 else 1.0
+    h = (y2 - y1) if y2 != y1 else 1.0
+    asp = h / w
+    res = np.empty((len(points), 2), dtype=np.float32)
+    if len(points) == 0:
+        return res
+    points = np.asarray(points, dtype=np.float32)
+    res[:, 0] = (points[:, 0] - (x1 + x2) * 0.5) / w - 2 * shift_x
+    res[:, 1] = (points[:, 1] - (y1 + y2) * 0.5) / w - 2 * asp * shift_y
+    return res
+
+
+def frame_to_region_array(points: Any, frame_w: float, frame_h: float,
+                          x1: float, y1: float, x2: float, y2: float,
+                          shift_x: float = 0.0, shift_y: float = 0.0) -> Any:
+    return image_space_to_region_array(
+        frame_to_image_space_array(points, frame_w, frame_h, shift_x, shift_y),
+        x1, y1, x2, y2, shift_x, shift_y)
+
+
 def get_image_space_coord(px: float, py: float, area: Area,
                           shift_x: float = 0.0,
                           shift_y: float = 0.0) -> Tuple[float, float]:
@@ -260,6 +326,173 @@ def pin_to_normal_from_geo_mesh(pin: Any, geo_mesh: Any) -> Vector:
     return Vector(np.cross(v2 - v1, v3 - v2)).normalized()
 
 
+def pins_surface_data(pins: List[Any]) -> Tuple[Any, Any]:
+    ''' Triangle point indices (n, 3) and barycentric weights (n, 3)
+        of pin surface points. Missing pins get -1 indices '''
+    indices = np.full((len(pins), 3), -1, dtype=np.int32)
+    weights = np.zeros((len(pins), 3), dtype=np.float32)
+    for i, pin in enumerate(pins):
+        if pin is None:
+            continue
+        sp = pin.surface_point
+        gp = sp.geo_point_idxs
+        if len(gp) < 3:
+            continue
+        indices[i] = gp[:3]
+        weights[i] = sp.barycentric_coordinates[:3]
+    return indices, weights
+
+
+def barycentric_points(verts: Any, indices: Any, weights: Any) -> Any:
+    ''' Points for invalid indices stay zero '''
+    points = np.zeros((len(indices), 3), dtype=np.float32)
+    if len(indices) == 0:
+        return points
+    valid = np.all((indices >= 0) & (indices < len(verts)), axis=1)
+    points[valid] = np.einsum('ij,ijk->ik', weights[valid],
+                              verts[indices[valid]])
+    return points
+
+
+def _geo_mesh_triangles(indices: Any, geo_mesh: Any) -> Any:
+    ''' Triangle vertices (n, 3, 3), each used geo point read once '''
+    valid = np.all(indices >= 0, axis=1)
+    used, inverse = np.unique(indices[valid], return_inverse=True)
+    points = np.array([geo_mesh.point(int(x)) for x in used],
+                      dtype=np.float32).reshape((-1, 3))
+    triangles = np.zeros((len(indices), 3, 3), dtype=np.float32)
+    triangles[valid] = points[inverse.reshape((-1, 3))]
+    return triangles
+
+
+def pins_to_xyz_from_mesh(pins: List[Any], obj: Object) -> Any:
+    ''' pin_to_xyz_from_mesh for all pins. Invalid pins give zeros '''
+    indices, weights = pins_surface_data(pins)
+    return barycentric_points(get_mesh_verts(obj.data), indices, weights)
+
+
+def pins_to_xyz_from_geo_mesh(pins: List[Any], geo_mesh: Any) -> Any:
+    indices, weights = pins_surface_data(pins)
+    triangles = _geo_mesh_triangles(indices, geo_mesh)
+    return np.einsum('ij,ijk->ik', weights, triangles)
+
+
+def pins_to_normals_from_geo_mesh(pins: List[Any], geo_mesh: Any) -> Any:
+    indices, _ = pins_surface_data(pins)
+    triangles = _geo_mesh_triangles(indices, geo_mesh)
+    normals = np.cross(triangles[:, 1] - triangles[:, 0],
+                       triangles[:, 2] - triangles[:, 1])
+    lengths = np.linalg.norm(normals, axis=1)
+    lengths[lengths == 0] = 1.0
+    return normals / lengths[:, np.newaxis]
+
+
+class PinsGeometryValidator:
+    ''' Finds pins which surface triangles are not on the mesh.
+        With deep_analyze every vertex triple of every polygon is packed
+        into one sorted int64 signature array, so all pins are checked
+        with a single searchsorted instead of polygon set scans.
+        Polygons with more than max_signature_polygon_size vertices
+        are checked as sets only for pins not found in signatures. '''
+    max_signature_polygon_size: int = 8
+
+    def __init__(self, mesh: Any, deep_analyze: bool = False):
+        self.verts_count: int = len(mesh.vertices)
+        self.deep_analyze: bool = deep_analyze
+        self._signatures: Any = np.empty((0,), dtype=np.int64)
+        self._large_polygons: List[Set[int]] = []
+        self._polygon_sets: Optional[List[Set[int]]] = None
+        self._mesh: Any = mesh
+        if deep_analyze:
+            self._build_signatures()
+
+    def _packable(self) -> bool:
+        return self.verts_count ** 3 < 2 ** 63
+
+    def _pack(self, triples: Any) -> Any:
+        triples = triples.astype(np.int64)
+        return (triples[:, 0] * self.verts_count +
+                triples[:, 1]) * self.verts_count + triples[:, 2]
+
+    def _build_signatures(self) -> None:
+        loop_start, loop_total, loop_vertices = \
+            get_mesh_faces(self._mesh)
+        max_size = self.max_signature_polygon_size if self._packable() else 2
+        signatures = []
+        for size in np.unique(loop_total):
+            selected = loop_total == size
+            polygons = loop_vertices[loop_start[selected][:, np.newaxis] +
+                                     np.arange(size)]
+            if size > max_size:
+                self._large_polygons.extend(set(x) for x in polygons.tolist())
+                continue
+            polygons = np.sort(polygons, axis=1)
+            combinations = np.array(
+                list(itertools.combinations(range(size), 3)), dtype=np.int32)
+            signatures.append(
+                self._pack(polygons[:, combinations].reshape((-1, 3))))
+        if len(signatures) > 0:
+            self._signatures = np.unique(np.concatenate(signatures))
+
+    def _on_polygon_sets(self, triple: List[int],
+                         polygon_sets: List[Set[int]]) -> bool:
+        vert_set = set(triple)
+        for poly_set in polygon_sets:
+            if poly_set.issuperset(vert_set):
+                return True
+        return False
+
+    def _all_polygon_sets(self) -> List[Set[int]]:
+        if self._polygon_sets is None:
+            self._polygon_sets = [set(p.vertices[:])
+                                  for p in self._mesh.polygons]
+        return self._polygon_sets
+
+    def invalid_pins(self, indices: Any) -> Any:
+        ''' indices are (n, 3) pin triangles as in pins_surface_data.
+            Returns sorted indices of invalid pins '''
+        indices = np.asarray(indices, dtype=np.int64).reshape((-1, 3))
+        invalid = np.any((indices < 0) | (indices >= self.verts_count),
+                         axis=1)
+        if not self.deep_analyze or len(indices) == 0:
+            return np.flatnonzero(invalid)
+
+        triples = np.sort(indices, axis=1)
+        degenerate = (triples[:, 0] == triples[:, 1]) | \
+                     (triples[:, 1] == triples[:, 2])
+        check = ~invalid & ~degenerate
+        found = np.zeros((len(indices),), dtype=bool)
+        if len(self._signatures) > 0 and self._packable():
+            keys = self._pack(triples[check])
+            positions = np.minimum(np.searchsorted(self._signatures, keys),
+                                   len(self._signatures) - 1)
+            found[check] = self._signatures[positions] == keys
+
+        for i in np.flatnonzero(check & ~found):
+            found[i] = self._on_polygon_sets(triples[i].tolist(),
+                                             self._large_polygons)
+        for i in np.flatnonzero(~invalid & degenerate):
+            found[i] = self._on_polygon_sets(triples[i].tolist(),
+                                             self._all_polygon_sets())
+        return np.flatnonzero(invalid | ~found)
+
+    def keyframe_reports(self, gt: Any,
+                         keyframes: List[int]) -> Dict[int, List[int]]:
+        ''' Invalid pins for every keyframe, checked in one pass '''
+        pins_count = gt.pins_count()
+        if pins_count == 0 or len(keyframes) == 0:
+            return {keyframe: [] for keyframe in keyframes}
+        indices = np.concatenate([
+            pins_surface_data([gt.pin(keyframe, i)
+                               for i in range(pins_count)])[0]
+            for keyframe in keyframes])
+        wrong = self.invalid_pins(indices)
+        frame_numbers = wrong // pins_count
+        pin_numbers = wrong % pins_count
+        return {keyframe: pin_numbers[frame_numbers == num].tolist()
+                for num, keyframe in enumerate(keyframes)}
+
+
 def calc_model_mat(model_mat: Any, head_mat: Any) -> Optional[Any]:
     """ Convert model matrix to camera matrix """
     rot_mat = xy_to_xz_rotation_matrix_4x4()
@@ -551,6 +784,18 @@ def camera_projection(camobj: Object, frame: Optional[int]=None,
     return proj_mat
 
 
+def get_mesh_faces(mesh: Any) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    ''' :return: loop_start, loop_total, vertex index of every loop '''
+    polygon_count = len(mesh.polygons)
+    loop_start = np.empty(polygon_count, dtype=np.int32)
+    loop_total = np.empty(polygon_count, dtype=np.int32)
+    mesh.polygons.foreach_get('loop_start', loop_start)
+    mesh.polygons.foreach_get('loop_total', loop_total)
+    loop_vertices = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get('vertex_index', loop_vertices)
+    return loop_start, loop_total, loop_vertices
+
+
 def get_triangulation_indices(mesh: Any, calculate: bool = True) -> Any:
     if calculate:
         mesh.calc_loop_triangles()
@@ -560,49 +805,6 @@ def get_triangulation_indices(mesh: Any, calculate: bool = True) -> Any:
     return indices
 
 
-def get_polygons_in_vertex_group(obj: Object,
-                                 vertex_group_name: str,
-                                 inverted=False) -> Set[int]:
-    vertex_group_index = obj.vertex_groups.find(vertex_group_name)
-    if vertex_group_index < 0:
-        return set()
-
-    mesh = evaluated_mesh(obj)
-    verts_in_group = set([v.index for v in mesh.vertices
-                          if vertex_group_index in
-                          [g.group for g in v.groups]])
-
-    polys_in_group = set()
-
-    if not inverted:
-        for polygon in mesh.polygons:
-            if verts_in_group.issuperset(polygon.vertices[:]):
-                polys_in_group.add(polygon.index)
-    else:
-        for polygon in mesh.polygons:
-            if not verts_in_group.issuperset(polygon.vertices[:]):
-                polys_in_group.add(polygon.index)
-
-    return polys_in_group
-
-
-def get_triangles_in_vertex_group(obj: Object,
-                                  vertex_group_name: str,
-                                  inverted=False) -> List:
-    if vertex_group_name == '':
-        return []
-
-    polys_in_group = get_polygons_in_vertex_group(obj, vertex_group_name,
-                                                  inverted)
-    if len(polys_in_group) == 0:
-        return []
-
-    mesh = evaluated_mesh(obj)
-    mesh.calc_loop_triangles()
-    return [tris.vertices[:] for tris in mesh.loop_triangles
-            if tris.polygon_index in polys_in_group]
-
-
 def distance_between_objects(obj1: Object, obj2: Object) -> float:
     ar1 = np.asarray(obj1.matrix_world)
     ar2 = np.asarray(obj2.matrix_world)
@@ -16,6 +16,7 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 # ##### END GPL LICENSE BLOCK #####
 
+from collections import OrderedDict
 from typing import Any, Optional, List, Tuple, Set
 
 from ..utils.kt_logging import KTLogger
@@ -26,6 +27,8 @@ _log = KTLogger(__name__)
 
 
 _DETECTED_FACES: List = []
+_DETECTED_FACES_CACHE: OrderedDict = OrderedDict()
+_detected_faces_cache_size: int = 256
 
 
 def reset_detected_faces() -> None:
@@ -44,6 +47,38 @@ def set_detected_faces(faces_info: List[Any]) -> None:
     _log.yellow(f'set_detected_faces: {len(_DETECTED_FACES)}')
 
 
+def get_cached_detected_faces(key: Tuple) -> Optional[List[Any]]:
+    faces = _DETECTED_FACES_CACHE.get(key)
+    if faces is not None:
+        _DETECTED_FACES_CACHE.move_to_end(key)
+    return faces
+
+
+def cache_detected_faces(key: Tuple, faces_info: List[Any]) -> None:
+    ''' Detection results per image, the least recently used are dropped '''
+    _DETECTED_FACES_CACHE[key] = faces_info
+    _DETECTED_FACES_CACHE.move_to_end(key)
+    while len(_DETECTED_FACES_CACHE) > _detected_faces_cache_size:
+        _DETECTED_FACES_CACHE.popitem(last=False)
+
+
+def reset_detected_faces_cache() -> None:
+    _DETECTED_FACES_CACHE.clear()
+
+
+def _face_area(face: Any) -> float:
+    x1, y1 = face.xy_min
+    x2, y2 = face.xy_max
+    return abs(x2 - x1) * abs(y2 - y1)
+
+
+def largest_face_index(faces_info: List[Any]) -> int:
+    if len(faces_info) == 0:
+        return -1
+    areas = [_face_area(face) for face in faces_info]
+    return areas.index(max(areas))
+
+
 def get_detected_faces_rectangles() -> List[Tuple]:
     faces = get_detected_faces()
     _log.yellow(f'get_detected_faces_rectangles:\n{faces}')
@@ -33,11 +33,11 @@ from .gpu_shaders import (line_3d_local_shader,
                           simple_uniform_color_2d_shader)
 from .coords import (get_mesh_verts,
                      get_triangulation_indices,
-                     get_triangles_in_vertex_group,
                      make_indices_for_wide_edges,
                      frame_to_image_space,
                      get_camera_border,
                      image_space_to_region)
+from .mesh_builder import get_triangles_in_vertex_group
 from .bpy_common import evaluated_mesh, bpy_context
 from .base_shaders import KTShaderBase
 from .gpu_control import (set_blend_alpha,
@@ -199,6 +199,34 @@ class KTEdgeShader2D(KTEdgeShaderBase):
         _log.output('call super().register_handler')
         super().register_handler(post_type, area=area)
 
+    def set_residual_lines(self, start_points: Any, end_points: Any,
+                           color: Tuple, dash_length: float,
+                           hidden_lines: Optional[Any] = None) -> None:
+        ''' Dashed lines from start_points[i] to end_points[i] (region
+            space). Lines from hidden_lines get transparent colour. '''
+        count = min(len(start_points), len(end_points))
+        verts = np.empty((count * 2, 2), dtype=np.float32)
+        verts[0::2] = np.asarray(start_points, dtype=np.float32)[:count, :2]
+        verts[1::2] = np.asarray(end_points, dtype=np.float32)[:count, :2]
+
+        colors = np.empty((count * 2, 4), dtype=np.float32)
+        colors[:] = color
+        if hidden_lines is not None and len(hidden_lines) > 0:
+            hidden_lines = np.asarray(hidden_lines, dtype=np.int32)
+            hidden_lines = hidden_lines[hidden_lines < count]
+            hidden_color = (*color[:3], 0.0)
+            colors[hidden_lines * 2] = hidden_color
+            colors[hidden_lines * 2 + 1] = hidden_color
+
+        # For pin dashes drawing template like this: O- - - -o
+        edge_lengths = np.empty((count * 2,), dtype=np.float32)
+        edge_lengths[0::2] = 0.0
+        edge_lengths[1::2] = dash_length
+
+        self.vertices = verts
+        self.vertex_colors = colors
+        self.edge_lengths = edge_lengths
+
     def clear_all(self) -> None:
         super().clear_all()
         self.edge_lengths = np.empty((0,), dtype=np.float32)
@@ -0,0 +1,52 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+# KeenTools for blender is a blender addon for using KeenTools in Blender.
+# Copyright (C) 2024 KeenTools
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ##### END GPL LICENSE BLOCK #####
+
+from math import pi
+
+import numpy as np
+
+
+def wrap_angles(angles: np.ndarray) -> np.ndarray:
+    return (angles + pi) % (2 * pi) - pi
+
+
+def flip_euler_xyz(euler: np.ndarray) -> np.ndarray:
+    return np.column_stack((euler[:, 0] + pi,
+                            pi - euler[:, 1],
+                            euler[:, 2] + pi))
+
+
+def unbreak_euler_array(euler: np.ndarray) -> np.ndarray:
+    ''' euler is (N, 3) XYZ rotation sequence, the first row is kept.
+        Each next row becomes the equivalent rotation (2*pi shifts
+        or Euler flip) closest to the previous one. '''
+    count = len(euler)
+    if count < 2:
+        return euler.copy()
+    candidates = np.stack((euler, flip_euler_xyz(euler)))
+    diff = candidates[None, :, 1:] - candidates[:, None, :-1]
+    cost = np.sum(wrap_angles(diff) ** 2, axis=-1)
+    transitions = np.argmin(cost, axis=1).T.tolist()
+
+    choice = np.zeros(count, dtype=np.int32)
+    state = 0
+    for i, row in enumerate(transitions, start=1):
+        state = row[state]
+        choice[i] = state
+    chosen = candidates[choice, np.arange(count)]
+    return np.unwrap(chosen, axis=0)
@@ -18,6 +18,7 @@
 
 from typing import Optional, List
 
+import numpy as np
 from bpy.types import Action, FCurve
 from mathutils import Vector, Matrix
 
@@ -41,6 +42,36 @@ def get_fcurve_data(fcurve: Optional[FCurve]) -> List[Vector]:
     return [p.co for p in fcurve.keyframe_points]
 
 
+def get_fcurve_points_array(fcurve: Optional[FCurve],
+                            prop: str = 'co') -> np.ndarray:
+    if not fcurve:
+        return np.empty((0, 2), dtype=np.float32)
+    points = np.empty((len(fcurve.keyframe_points), 2), dtype=np.float32)
+    fcurve.keyframe_points.foreach_get(prop, points.ravel())
+    return points
+
+
+def set_fcurve_points_array(fcurve: FCurve, points: np.ndarray,
+                            prop: str = 'co') -> None:
+    fcurve.keyframe_points.foreach_set(
+        prop, np.ascontiguousarray(points, dtype=np.float32).ravel())
+
+
+def set_fcurve_point_values(fcurve: FCurve, indices: np.ndarray,
+                            values: np.ndarray) -> None:
+    ''' Bulk analogue of keyframe_points.insert on existing keys:
+        handles are shifted together with their key values '''
+    points = get_fcurve_points_array(fcurve)
+    delta = values - points[indices, 1]
+    points[indices, 1] = values
+    set_fcurve_points_array(fcurve, points)
+    for prop in ('handle_left', 'handle_right'):
+        handles = get_fcurve_points_array(fcurve, prop)
+        handles[indices, 1] += delta
+        set_fcurve_points_array(fcurve, handles, prop)
+    fcurve.update()
+
+
 def clear_fcurve_new(fcurve: FCurve) -> None:
     fcurve.keyframe_points.clear()
 
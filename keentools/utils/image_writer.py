@@ -0,0 +1,120 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+# KeenTools for blender is a blender addon for using KeenTools in Blender.
+# Copyright (C) 2024 KeenTools
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ##### END GPL LICENSE BLOCK #####
+
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, List, Tuple
+
+import numpy as np
+
+from .kt_logging import KTLogger
+
+
+_log = KTLogger(__name__)
+
+
+def _png_chunk(tag: bytes, body: bytes) -> bytes:
+    return struct.pack('>I', len(body)) + tag + body + \
+        struct.pack('>I', zlib.crc32(tag + body) & 0xffffffff)
+
+
+def encode_png(pixels: Any, compression: int = 1) -> bytes:
+    ''' 8-bit PNG from float pixels in Blender order (bottom row first),
+        values are converted to bytes the same way as in byte bpy images '''
+    height, width, channels = pixels.shape
+    assert channels in (3, 4), 'encode_png: RGB or RGBA pixels expected'
+    data = np.clip(np.asarray(pixels, dtype=np.float32)[::-1] * 255.0 + 0.5,
+                   0, 255).astype(np.uint8)
+    raw = np.zeros((height, 1 + width * channels), dtype=np.uint8)
+    raw[:, 1:] = data.reshape((height, width * channels))
+    header = struct.pack('>IIBBBBB', width, height, 8,
+                         6 if channels == 4 else 2, 0, 0, 0)
+    return b'\x89PNG\r\n\x1a\n' + _png_chunk(b'IHDR', header) + \
+        _png_chunk(b'IDAT', zlib.compress(raw.tobytes(), compression)) + \
+        _png_chunk(b'IEND', b'')
+
+
+def _write_png(filepath: str, pixels: Any, compression: int) -> str:
+    data = encode_png(pixels, compression)
+    with open(filepath, 'wb') as f:
+        f.write(data)
+    _log.info(f'TEXTURE SAVED: {filepath}')
+    return filepath
+
+
+class AsyncImageWriter:
+    ''' Encodes and writes images in background threads.
+        At most max_pending images are queued: is_full() lets the caller
+        wait before baking the next one. Write errors are collected
+        and returned by take_errors() or flush(). '''
+    supported_formats: Tuple[str, ...] = ('PNG',)
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 3,
+                 png_compression: int = 1):
+        self.max_pending: int = max_pending
+        self.png_compression: int = png_compression
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='kt_image_writer')
+        self._pending: Deque[Future] = deque()
+        self._errors: List[str] = []
+
+    @classmethod
+    def supports(cls, file_format: str) -> bool:
+        return file_format in cls.supported_formats
+
+    def _collect_done(self) -> None:
+        while len(self._pending) > 0 and self._pending[0].done():
+            self._check_future(self._pending.popleft())
+
+    def _check_future(self, future: Future) -> None:
+        err = future.exception()
+        if err is not None:
+            _log.error(f'AsyncImageWriter Exception:\n{str(err)}')
+            self._errors.append(str(err))
+
+    def pending_count(self) -> int:
+        self._collect_done()
+        return len(self._pending)
+
+    def is_full(self) -> bool:
+        return self.pending_count() >= self.max_pending
+
+    def submit(self, filepath: str, pixels: Any) -> None:
+        self._pending.append(self._executor.submit(
+            _write_png, filepath, pixels, self.png_compression))
+
+    def take_errors(self) -> List[str]:
+        self._collect_done()
+        errors = self._errors
+        self._errors = []
+        return errors
+
+    def flush(self) -> List[str]:
+        ''' Barrier: waits for all queued images '''
+        while len(self._pending) > 0:
+            future = self._pending.popleft()
+            future.exception()
+            self._check_future(future)
+        return self.take_errors()
+
+    def shutdown(self) -> List[str]:
+        errors = self.flush()
+        self._executor.shutdown(wait=True)
+        return errors
@@ -17,9 +17,10 @@
 # ##### END GPL LICENSE BLOCK #####
 
 import numpy as np
-from typing import Any, Callable, Optional, Tuple, List
+from typing import Any, Callable, Optional, Tuple, List, Dict
 import re
 import os
+import struct
 
 from bpy.types import Image, Camera, Object, MovieClip
 
@@ -95,6 +96,108 @@ def load_rgba(camera: Optional[Camera]) -> Optional[Any]:
     return np.rot90(img, camera.orientation)
 
 
+_jpeg_sof_markers: Tuple[int, ...] = tuple(
+    x for x in range(0xC0, 0xD0) if x not in (0xC4, 0xC8, 0xCC))
+
+
+def _jpeg_file_size(f: Any) -> Tuple[int, int]:
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return 0, 0
+        code = marker[1]
+        if code == 0xFF:
+            f.seek(-1, 1)
+            continue
+        if code == 0x01 or 0xD0 <= code <= 0xD8:
+            continue
+        length = struct.unpack('>H', f.read(2))[0]
+        if code in _jpeg_sof_markers:
+            h, w = struct.unpack('>HH', f.read(5)[1:5])
+            return w, h
+        f.seek(length - 2, 1)
+
+
+def image_file_size(filepath: str) -> Tuple[int, int]:
+    ''' Width and height from PNG or JPEG file header, (0, 0) otherwise '''
+    try:
+        with open(filepath, 'rb') as f:
+            head = f.read(24)
+            if head[:8] == b'\x89PNG\r\n\x1a\n' and head[12:16] == b'IHDR':
+                return struct.unpack('>II', head[16:24])
+            if head[:2] == b'\xff\xd8':
+                return _jpeg_file_size(f)
+    except (OSError, struct.error) as err:
+        _log.error(f'image_file_size {filepath}:\n{str(err)}')
+    return 0, 0
+
+
+def lazy_image_size(img: Image) -> Tuple[int, int]:
+    ''' Same as img.size, but does not decode not yet loaded file images
+        when the size can be read from the file header '''
+    if not img.has_data and img.source == 'FILE' and not img.packed_file \
+            and img.filepath:
+        w, h = image_file_size(bpy_abspath(img.filepath))
+        if w > 0 and h > 0:
+            return w, h
+    w, h = img.size[:2]
+    return w, h
+
+
+class CameraImageFeed:
+    ''' Oriented RGBA camera images kept between texture bakes.
+        Items are keyed by image file state and orientation. Bakes read
+        the cameras in the same order, so evicting would make every item
+        miss once the images exceed the memory budget. Instead the items
+        that fit are kept and the rest is loaded on each bake. '''
+    def __init__(self, budget_mb: float):
+        self.budget: int = int(budget_mb * 1024 * 1024)
+        self._items: Dict[Tuple, Any] = {}
+        self._size: int = 0
+
+    @staticmethod
+    def image_key(camera: Camera) -> Optional[Tuple]:
+        img = camera.cam_image
+        if img is None:
+            return None
+        filepath = bpy_abspath(img.filepath) if img.filepath else ''
+        mtime = os.path.getmtime(filepath) \
+            if filepath != '' and os.path.exists(filepath) else None
+        packed_size = img.packed_file.size if img.packed_file else 0
+        return (img.name, filepath, mtime, packed_size, tuple(img.size),
+                img.colorspace_settings.name, camera.orientation)
+
+    def get(self, camera: Camera) -> Optional[Any]:
+        key = self.image_key(camera)
+        if key is None:
+            return None
+        img = self._items.get(key)
+        if img is not None:
+            return img
+
+        camera.reset_tone_mapping()
+        img = load_rgba(camera)
+        if img is None:
+            return None
+        self._drop_image_items(key[0])
+        if self._size + img.nbytes <= self.budget:
+            self._items[key] = img
+            self._size += img.nbytes
+        return img
+
+    def _drop_image_items(self, image_name: str) -> None:
+        for key in [x for x in self._items.keys() if x[0] == image_name]:
+            self._size -= self._items.pop(key).nbytes
+
+    def invalidate(self, image: Optional[Image] = None) -> None:
+        if image is None:
+            self._items.clear()
+            self._size = 0
+            return
+        self._drop_image_items(image.name)
+
+
 def gamma_np_image(np_img: Any, gamma: float=1.0) -> Any:
     res_img = np_img.copy()
     res_img[:, :, :3] = np.power(np_img[:, :, :3], gamma)
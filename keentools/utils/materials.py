@@ -16,10 +16,11 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 # ##### END GPL LICENSE BLOCK #####
 
-from typing import Any, Tuple, List
+from typing import Any, Tuple, List, Optional
 import numpy as np
 
 import bpy
+from bpy.app.handlers import persistent
 from bpy.types import Object, Material
 
 from .kt_logging import KTLogger
@@ -27,7 +28,9 @@ from .version import BVersion
 from ..addon_config import fb_settings, ActionStatus
 from ..facebuilder_config import FBConfig
 from ..facebuilder.fbloader import FBLoader
-from ..utils.images import load_rgba, find_bpy_image_by_name, assign_pixels_data
+from ..utils.images import (CameraImageFeed,
+                            find_bpy_image_by_name,
+                            assign_pixels_data)
 from ..blender_independent_packages.pykeentools_loader import module as pkt_module
 from .bpy_common import bpy_progress_begin, bpy_progress_end, bpy_progress_update
 
@@ -180,12 +183,34 @@ def _sRGB_to_linear(img: Any) -> Any:
     return img
 
 
+_bake_image_feed: CameraImageFeed = CameraImageFeed(
+    FBConfig.bake_image_feed_budget_mb)
+
+
+def invalidate_bake_image_feed(image: Optional[Any] = None) -> None:
+    _bake_image_feed.invalidate(image)
+
+
+@persistent
+def bake_image_feed_load_pre_handler(*args) -> None:
+    invalidate_bake_image_feed()
+
+
+def register_bake_image_feed_handler() -> None:
+    if bake_image_feed_load_pre_handler not in bpy.app.handlers.load_pre:
+        bpy.app.handlers.load_pre.append(bake_image_feed_load_pre_handler)
+
+
+def unregister_bake_image_feed_handler() -> None:
+    if bake_image_feed_load_pre_handler in bpy.app.handlers.load_pre:
+        bpy.app.handlers.load_pre.remove(bake_image_feed_load_pre_handler)
+    invalidate_bake_image_feed()
+
+
 def _create_frame_data_loader(head: Any, camnums: List, fb: Any) -> Any:
     def frame_data_loader(kf_idx):
         cam = head.cameras[camnums[kf_idx]]
-        cam.reset_tone_mapping()
-
-        img = load_rgba(cam)
+        img = _bake_image_feed.get(cam)
 
         frame_data = pkt_module().texture_builder.FrameData()
         frame_data.geo = fb.applied_args_model_at(cam.get_keyframe())
@@ -16,8 +16,9 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 # ##### END GPL LICENSE BLOCK #####
 
+import hashlib
 import numpy as np
-from typing import Any, Tuple, Optional
+from typing import Any, Dict, List, Tuple, Optional, Set
 
 from bpy.types import Object
 
@@ -25,6 +26,8 @@ from .kt_logging import KTLogger
 from ..blender_independent_packages.pykeentools_loader import module as pkt_module
 from .coords import (get_scale_matrix_3x3_from_matrix_world,
                      get_mesh_verts,
+                     get_mesh_faces,
+                     get_triangulation_indices,
                      xz_to_xy_rotation_matrix_3x3)
 from .bpy_common import evaluated_mesh
 from .blendshapes import get_blendshape
@@ -33,6 +36,43 @@ from .blendshapes import get_blendshape
 _log = KTLogger(__name__)
 
 
+def get_mesh_loop_uvs(mesh: Any) -> Optional[np.ndarray]:
+    if not mesh.uv_layers.active:
+        return None
+    uvs = np.empty((len(mesh.loops), 2), dtype=np.float32)
+    mesh.uv_layers.active.data.foreach_get('uv', uvs.ravel())
+    return uvs
+
+
+def _mesh_face_lists(loop_start: np.ndarray, loop_total: np.ndarray,
+                     loop_vertices: np.ndarray) -> List[List[int]]:
+    if len(loop_start) == 0:
+        return []
+    # Only plain python ints reach the core, no RNA access per polygon
+    if np.all(loop_total == loop_total[0]):
+        return loop_vertices.reshape((-1, int(loop_total[0]))).tolist()
+    loop_vertices = loop_vertices.tolist()
+    return [loop_vertices[start:start + total] for start, total
+            in zip(loop_start.tolist(), loop_total.tolist())]
+
+
+def _fill_mesh_builder_from_data(mb: Any, verts: np.ndarray,
+                                 faces: List[List[int]],
+                                 uvs: Optional[np.ndarray]) -> None:
+    mb.add_points(verts @ xz_to_xy_rotation_matrix_3x3())
+    for face in faces:
+        mb.add_face(face)
+    if uvs is not None:
+        mb.set_uvs_attribute('VERTEX_BASED', uvs.astype(np.float64))
+
+
+def _fill_mesh_builder(mb: Any, mesh: Any, verts: np.ndarray,
+                       get_uv: bool) -> None:
+    _fill_mesh_builder_from_data(mb, verts,
+                                 _mesh_face_lists(*get_mesh_faces(mesh)),
+                                 get_mesh_loop_uvs(mesh) if get_uv else None)
+
+
 def build_geo(obj: Object, get_uv=False) -> Any:
     _log.magenta('build_geo start')
     mb = pkt_module().MeshBuilder()
@@ -41,17 +81,7 @@ def build_geo(obj: Object, get_uv=False) -> Any:
     if obj:
         mesh = evaluated_mesh(obj)
         scale = get_scale_matrix_3x3_from_matrix_world(obj.matrix_world)
-        verts = get_mesh_verts(mesh) @ scale
-
-        mb.add_points(verts @ xz_to_xy_rotation_matrix_3x3())
-
-        for polygon in mesh.polygons:
-            mb.add_face(polygon.vertices[:])
-
-        if get_uv and mesh.uv_layers.active:
-            uvmap = mesh.uv_layers.active.data
-            uvs = [np.array(v.uv) for v in uvmap]
-            mb.set_uvs_attribute('VERTEX_BASED', uvs)
+        _fill_mesh_builder(mb, mesh, get_mesh_verts(mesh) @ scale, get_uv)
 
     _geo.add_mesh(mb.mesh())
     _log.output('build_geo end >>>')
@@ -71,17 +101,238 @@ def build_geo_from_basis(obj: Object, get_uv=False) -> Any:
         scale = get_scale_matrix_3x3_from_matrix_world(obj.matrix_world)
         verts = np.empty((len(mesh.vertices), 3), dtype=np.float32)
         basis_shape.data.foreach_get('co', verts.ravel())
-
-        mb.add_points(verts @ scale @ xz_to_xy_rotation_matrix_3x3())
-
-        for polygon in mesh.polygons:
-            mb.add_face(polygon.vertices[:])
-
-        if get_uv and mesh.uv_layers.active:
-            uvmap = mesh.uv_layers.active.data
-            uvs = [np.array(v.uv) for v in uvmap]
-            mb.set_uvs_attribute('VERTEX_BASED', uvs)
+        _fill_mesh_builder(mb, mesh, verts @ scale, get_uv)
 
     _geo.add_mesh(mb.mesh())
     _log.output('build_geo_from_basis end >>>')
     return _geo
+
+
+def array_digest(*arrays: np.ndarray) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for arr in arrays:
+        h.update(np.ascontiguousarray(arr).data)
+    return h.hexdigest()
+
+
+def modifiers_state(obj: Object) -> Tuple:
+    return (obj.mode,) + tuple((mod.name, mod.type, mod.show_viewport)
+                               for mod in obj.modifiers)
+
+
+def _geo_vertices(obj: Object, mesh: Any, from_basis: bool) -> np.ndarray:
+    scale = get_scale_matrix_3x3_from_matrix_world(obj.matrix_world)
+    if not from_basis:
+        return get_mesh_verts(mesh) @ scale
+    _, basis_shape, _ = get_blendshape(obj, 'Basis', create_basis=True)
+    verts = np.empty((len(mesh.vertices), 3), dtype=np.float32)
+    basis_shape.data.foreach_get('co', verts.ravel())
+    return verts @ scale
+
+
+_mesh_fingerprints: Dict[Tuple[int, int, bool], Tuple[Tuple, int]] = {}
+
+
+def invalidate_mesh_fingerprint(obj: Optional[Object] = None) -> None:
+    invalidate_vertex_group_selections(obj)
+    if obj is None:
+        _mesh_fingerprints.clear()
+        return
+    obj_id = obj.as_pointer()
+    for key in [x for x in _mesh_fingerprints.keys() if x[0] == obj_id]:
+        del _mesh_fingerprints[key]
+
+
+def mesh_fingerprint(obj: Optional[Object], from_basis: bool = False) -> int:
+    ''' Digest of the geometry that build_geo (or build_geo_from_basis)
+        gets from the object: scaled vertices, faces and modifiers.
+        Kept until invalidate_mesh_fingerprint is called for the object
+        (depsgraph geometry update) or element counts, scale or
+        modifiers change. '''
+    if not obj:
+        return 0
+    mesh = evaluated_mesh(obj)
+    key = (obj.as_pointer(), obj.data.as_pointer(), from_basis)
+    quick_key = (len(mesh.vertices), len(mesh.polygons), len(mesh.loops),
+                 tuple(obj.matrix_world.to_scale()), modifiers_state(obj))
+    cached = _mesh_fingerprints.get(key)
+    if cached is not None and cached[0] == quick_key:
+        return cached[1]
+
+    digest = array_digest(_geo_vertices(obj, mesh, from_basis),
+                          *get_mesh_faces(mesh))
+    # 63 bits to stay within the core Hash argument range
+    value = int(digest[:16], 16) >> 1
+    _mesh_fingerprints[key] = (quick_key, value)
+    return value
+
+
+class _CachedGeo:
+    def __init__(self, topology_key: Tuple, faces: List[List[int]],
+                 uvs: Optional[np.ndarray]):
+        self.topology_key: Tuple = topology_key
+        self.faces: List[List[int]] = faces
+        self.uvs: Optional[np.ndarray] = uvs
+        self.verts_digest: str = ''
+        self.verts_count: int = 0
+        self.geo: Any = None
+
+
+_geo_cache: Dict[Tuple[int, bool, bool], _CachedGeo] = {}
+
+
+def invalidate_geo_cache(obj: Optional[Object] = None) -> None:
+    if obj is None:
+        _geo_cache.clear()
+        return
+    obj_id = obj.as_pointer()
+    for key in [x for x in _geo_cache.keys() if x[0] == obj_id]:
+        del _geo_cache[key]
+
+
+def get_cached_geo(obj: Object, get_uv: bool = False,
+                   from_basis: bool = False,
+                   check_topology: bool = True) -> Any:
+    ''' Same result as build_geo / build_geo_from_basis. The built geo
+        is kept while topology, UVs, modifiers and vertices stay the same.
+        When only vertices change, cached faces and UVs are reused.
+        check_topology=False skips reading faces and UVs when the cache
+        has them, for callers which know the topology is unchanged. '''
+    if not obj:
+        return build_geo(obj, get_uv=get_uv)
+
+    mesh = evaluated_mesh(obj)
+    verts = _geo_vertices(obj, mesh, from_basis)
+
+    key = (obj.as_pointer(), get_uv, from_basis)
+    item = _geo_cache.get(key)
+    if item is not None and not check_topology \
+            and len(verts) == item.verts_count:
+        return _cached_geo_with_verts(item, verts)
+
+    face_arrays = get_mesh_faces(mesh)
+    uvs = get_mesh_loop_uvs(mesh) if get_uv else None
+    topology_key = (array_digest(*face_arrays),
+                    '' if uvs is None else array_digest(uvs),
+                    modifiers_state(obj))
+
+    if item is None or item.topology_key != topology_key:
+        _log.output('get_cached_geo: new topology')
+        item = _CachedGeo(topology_key, _mesh_face_lists(*face_arrays), uvs)
+        item.verts_count = len(verts)
+        _geo_cache[key] = item
+    return _cached_geo_with_verts(item, verts)
+
+
+def _cached_geo_with_verts(item: _CachedGeo, verts: np.ndarray) -> Any:
+    verts_digest = array_digest(verts)
+    if item.geo is not None and item.verts_digest == verts_digest:
+        return item.geo
+
+    mb = pkt_module().MeshBuilder()
+    _fill_mesh_builder_from_data(mb, verts, item.faces, item.uvs)
+    geo = pkt_module().Geo()
+    geo.add_mesh(mb.mesh())
+    item.geo = geo
+    item.verts_digest = verts_digest
+    return geo
+
+
+def _vertex_group_membership(mesh: Any, vertex_group_index: int) -> Any:
+    return np.fromiter((any(g.group == vertex_group_index for g in v.groups)
+                        for v in mesh.vertices),
+                       dtype=bool, count=len(mesh.vertices))
+
+
+def _polygons_in_membership(mesh: Any, membership: Any,
+                            inverted: bool) -> Any:
+    polys_count = len(mesh.polygons)
+    loop_start, loop_total, loop_vertices = get_mesh_faces(mesh)
+    offsets = np.cumsum(loop_total) - loop_total
+    loop_indices = np.arange(np.sum(loop_total)) + \
+        np.repeat(loop_start - offsets, loop_total)
+    loop_polygons = np.repeat(np.arange(polys_count), loop_total)
+    outside = np.zeros((polys_count,), dtype=bool)
+    outside[loop_polygons[~membership[loop_vertices[loop_indices]]]] = True
+    return np.flatnonzero(outside if inverted else ~outside).astype(np.int32)
+
+
+def _triangles_in_polygons(mesh: Any, polygons: Any) -> Any:
+    mesh.calc_loop_triangles()
+    tris_count = len(mesh.loop_triangles)
+    polygon_indices = np.empty((tris_count,), dtype=np.int32)
+    mesh.loop_triangles.foreach_get('polygon_index', polygon_indices)
+    tris = get_triangulation_indices(mesh, calculate=False)
+    selected = np.zeros((len(mesh.polygons),), dtype=bool)
+    selected[polygons] = True
+    return tris[selected[polygon_indices]]
+
+
+class _VertexGroupSelection:
+    def __init__(self, fingerprint: Tuple[int, int], polygons: Any):
+        self.fingerprint: Tuple[int, int] = fingerprint
+        self.polygons: Any = polygons
+        self.triangles: Optional[Any] = None
+
+
+_vertex_group_selections: Dict[Tuple[int, str, bool],
+                               _VertexGroupSelection] = {}
+
+
+def invalidate_vertex_group_selections(obj: Optional[Object] = None) -> None:
+    if obj is None:
+        _vertex_group_selections.clear()
+        return
+    obj_id = obj.as_pointer()
+    for key in [x for x in _vertex_group_selections.keys()
+                if x[0] == obj_id]:
+        del _vertex_group_selections[key]
+
+
+def _vertex_group_selection(obj: Object, vertex_group_name: str,
+                            inverted: bool) -> Optional[_VertexGroupSelection]:
+    ''' Polygons (and lazily triangles) of the evaluated mesh selected by
+        the vertex group. Kept while the mesh fingerprint is the same,
+        group membership edits are dropped together with the fingerprint
+        (depsgraph geometry update) or by an explicit mask reload '''
+    vertex_group_index = obj.vertex_groups.find(vertex_group_name)
+    if vertex_group_index < 0:
+        return None
+
+    key = (obj.as_pointer(), vertex_group_name, inverted)
+    fingerprint = (mesh_fingerprint(obj), vertex_group_index)
+    cached = _vertex_group_selections.get(key)
+    if cached is not None and cached.fingerprint == fingerprint:
+        return cached
+
+    mesh = evaluated_mesh(obj)
+    membership = _vertex_group_membership(mesh, vertex_group_index)
+    selection = _VertexGroupSelection(
+        fingerprint, _polygons_in_membership(mesh, membership, inverted))
+    _vertex_group_selections[key] = selection
+    return selection
+
+
+def get_polygons_in_vertex_group(obj: Object,
+                                 vertex_group_name: str,
+                                 inverted=False) -> Set[int]:
+    selection = _vertex_group_selection(obj, vertex_group_name, inverted)
+    if selection is None:
+        return set()
+    return set(selection.polygons.tolist())
+
+
+def get_triangles_in_vertex_group(obj: Object,
+                                  vertex_group_name: str,
+                                  inverted=False) -> Any:
+    if vertex_group_name == '':
+        return []
+
+    selection = _vertex_group_selection(obj, vertex_group_name, inverted)
+    if selection is None or len(selection.polygons) == 0:
+        return []
+
+    if selection.triangles is None:
+        selection.triangles = _triangles_in_polygons(evaluated_mesh(obj),
+                                                     selection.polygons)
+    return selection.triangles
@@ -20,6 +20,7 @@ from typing import List, Optional, Tuple, Any
 
 import numpy as np
 from bpy.types import SpaceView3D
+from mathutils.kdtree import KDTree
 from gpu_extras.batch import batch_for_shader
 
 from .kt_logging import KTLogger
@@ -34,23 +35,115 @@ from ..utils.bpy_common import bpy_context
 _log = KTLogger(__name__)
 
 
+class KTPinsIndex:
+    ''' KDTree over image space pin positions for hit-testing.
+        Built on the first query after pins change. '''
+    def __init__(self):
+        self._tree: Optional[KDTree] = None
+
+    def invalidate(self) -> None:
+        self._tree = None
+
+    def _get_tree(self, pins: Any) -> KDTree:
+        if self._tree is None:
+            tree = KDTree(len(pins))
+            for i, p in enumerate(pins):
+                tree.insert((p[0], p[1], 0.0), i)
+            tree.balance()
+            self._tree = tree
+        return self._tree
+
+    def nearest(self, pins: Any, x: float, y: float) -> Tuple[int, float]:
+        ''' :return: pin index (-1 if none), squared distance '''
+        if len(pins) == 0:
+            return -1, float('inf')
+        _, index, dist = self._get_tree(pins).find((x, y, 0.0))
+        if index is None:
+            return -1, float('inf')
+        return index, dist * dist
+
+    def inside_rectangle(self, pins: Any, x1: float, y1: float,
+                         x2: float, y2: float) -> Any:
+        if len(pins) == 0:
+            return np.empty((0,), dtype=np.int32)
+        center = ((x1 + x2) * 0.5, (y1 + y2) * 0.5, 0.0)
+        # Slightly bigger radius to keep points exactly in the corners
+        radius = 0.5 * ((x2 - x1) ** 2 + (y2 - y1) ** 2) ** 0.5 * 1.001 + 1e-6
+        found = self._get_tree(pins).find_range(center, radius)
+        return np.array(sorted(index for _, index, _ in found
+                               if x1 <= pins[index][0] <= x2
+                               and y1 <= pins[index][1] <= y2),
+                        dtype=np.int32)
+
+
 class KTScreenPins:
-    ''' Pins are stored in image space coordinates '''
+    ''' Pins are stored in image space coordinates.
+        Pin positions live in a buffer that doubles its capacity when full,
+        arr() is a view of its used part. Selected and disabled pins are
+        boolean masks of the same capacity. '''
+    initial_capacity: int = 64
+
     def __init__(self):
-        self._pins: Any = np.empty((0, 2), dtype=np.float32)
+        self._buffer: Any = np.empty((self.initial_capacity, 2),
+                                     dtype=np.float32)
+        self._count: int = 0
+        self._selected_mask: Any = np.zeros((self.initial_capacity,),
+                                            dtype=bool)
+        self._disabled_mask: Any = np.zeros((self.initial_capacity,),
+                                            dtype=bool)
+        self._index: KTPinsIndex = KTPinsIndex()
         self._current_pin_num: int = -1
-        self._disabled_pins: Any = np.empty((0,), dtype=np.int32)
-        self._selected_pins: Any = np.empty((0,), dtype=np.int32)
         self._add_selection_mode: bool = False
         self._move_pin_mode: bool = False
 
+    def _capacity(self) -> int:
+        return len(self._buffer)
+
+    def _ensure_capacity(self, size: int) -> None:
+        capacity = self._capacity()
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        buffer = np.empty((capacity, 2), dtype=np.float32)
+        buffer[:self._count] = self._buffer[:self._count]
+        self._buffer = buffer
+        for name in ('_selected_mask', '_disabled_mask'):
+            old_mask = getattr(self, name)
+            mask = np.zeros((capacity,), dtype=bool)
+            mask[:len(old_mask)] = old_mask
+            setattr(self, name, mask)
+
+    def _indices(self, indices: Any) -> Any:
+        indices = np.asarray(indices, dtype=np.int32).ravel()
+        if len(indices) > 0:
+            self._ensure_capacity(int(indices.max()) + 1)
+        return indices
+
     def arr(self) -> Any:
-        return self._pins
+        return self._buffer[:self._count]
 
     def set_pins(self, arr: Any) -> None:
         _log.output(f'set_pins: {len(arr)}')
-        self._pins = arr
-        assert len(self._pins.shape) == 2
+        arr = np.asarray(arr, dtype=np.float32)
+        assert len(arr.shape) == 2
+        self._ensure_capacity(len(arr))
+        self._buffer[:len(arr)] = arr
+        self._count = len(arr)
+        self._index.invalidate()
+
+    def set_pin_position(self, pin_index: int,
+                         pos: Tuple[float, float]) -> None:
+        self._buffer[:self._count][pin_index] = pos
+        self._index.invalidate()
+
+    def nearest_pin(self, x: float, y: float,
+                    dist2: float = 4000000.0) -> Tuple[int, float]:
+        ''' Same result as coords.nearest_point for the pins array '''
+        nearest, nearest_dist2 = self._index.nearest(self.arr(), x, y)
+        if nearest_dist2 >= dist2:
+            return -1, dist2
+        return nearest, nearest_dist2
 
     def clear_pins(self) -> None:
         _log.output('clear_pins')
@@ -61,8 +154,14 @@ class KTScreenPins:
 
     def add_pin(self, vec2d: Tuple[float, float]) -> None:
         _log.output(f'add_pin: {vec2d}')
-        row = np.array([vec2d], dtype=np.float32)
-        self.set_pins(np.append(self._pins, row, axis=0))
+        self.add_pins([vec2d])
+
+    def add_pins(self, points: Any) -> None:
+        points = np.asarray(points, dtype=np.float32).reshape((-1, 2))
+        self._ensure_capacity(self._count + len(points))
+        self._buffer[self._count:self._count + len(points)] = points
+        self._count += len(points)
+        self._index.invalidate()
 
     def current_pin_num(self) -> Optional[int]:
         return self._current_pin_num
@@ -84,8 +183,8 @@ class KTScreenPins:
 
     def get_selected_pins(self, pins_count: Optional[int] = None) -> Any:
         if pins_count is not None:
-            self._selected_pins = self._selected_pins[self._selected_pins < pins_count]
-        return self._selected_pins
+            self._selected_mask[pins_count:] = False
+        return np.flatnonzero(self._selected_mask).astype(np.int32)
 
     def average_point_of_selected_pins(self) -> Optional[Tuple[float, float]]:
         ''' Return average point in image space '''
@@ -97,41 +196,54 @@ class KTScreenPins:
 
     def set_selected_pins(self, selected_pins: Any) -> None:
         _log.output('set_selected_pins')
-        self._selected_pins = np.array(selected_pins, dtype=np.int32)
+        indices = self._indices(selected_pins)
+        self._selected_mask[:] = False
+        self._selected_mask[indices] = True
 
     def add_selected_pins(self, selected_pins: Any) -> None:
         _log.output('add_selected_pins')
-        self.set_selected_pins(np.unique(
-            np.concatenate((self._selected_pins,
-                            np.array(selected_pins, dtype=np.int32)))))
+        self._selected_mask[self._indices(selected_pins)] = True
 
     def toggle_selected_pins(self, selected_pins: Any) -> None:
         _log.output('toggle_selected_pins')
-        old_selected_set = set(self._selected_pins)
-        new_selected_set = set(selected_pins)
-        self._selected_pins = np.array(
-            list(old_selected_set.symmetric_difference(new_selected_set)),
-            dtype=np.int32)
+        indices = np.unique(self._indices(selected_pins))
+        self._selected_mask[indices] = ~self._selected_mask[indices]
 
     def exclude_selected_pin(self, pin_number: int) -> None:
         _log.output('exclude_selected_pin')
-        self._selected_pins = self._selected_pins[self._selected_pins != pin_number]
+        if 0 <= pin_number < self._capacity():
+            self._selected_mask[pin_number] = False
         self.reset_current_pin()
 
     def clear_selected_pins(self) -> None:
         _log.output('clear_selected_pins')
-        self._selected_pins = np.empty((0,), dtype=np.int32)
+        self._selected_mask[:] = False
 
     def get_disabled_pins(self) -> Any:
-        return self._disabled_pins
+        return np.flatnonzero(self._disabled_mask).astype(np.int32)
+
+    def vertex_colors(self, points_count: int, pin_color: Tuple,
+                      disabled_pin_color: Tuple, selected_pin_color: Tuple,
+                      current_pin_color: Tuple) -> Any:
+        colors = np.full((points_count, 4), pin_color, dtype=np.float32)
+        self._ensure_capacity(points_count)
+        colors[self._disabled_mask[:points_count]] = \
+            (*disabled_pin_color[:3], 0.0) if self.move_pin_mode() \
+            else disabled_pin_color
+        colors[self._selected_mask[:points_count]] = selected_pin_color
+        if self.current_pin() and self._current_pin_num < points_count:
+            colors[self._current_pin_num] = current_pin_color
+        return colors
 
     def set_disabled_pins(self, disabled_pins: List[int]) -> None:
         _log.output('set_disabled_pins')
-        self._disabled_pins = np.array(disabled_pins, dtype=np.int32)
+        indices = self._indices(disabled_pins)
+        self._disabled_mask[:] = False
+        self._disabled_mask[indices] = True
 
     def clear_disabled_pins(self) -> None:
         _log.output('clear_disabled_pins')
-        self._disabled_pins = np.empty((0,), dtype=np.int32)
+        self._disabled_mask[:] = False
 
     def pins_inside_rectangle(self, x1: float, y1: float,
                               x2: float, y2: float) -> Any:
@@ -139,9 +251,7 @@ class KTScreenPins:
             x1, x2 = x2, x1
         if y1 > y2:
             y1, y2 = y2, y1
-        return np.array([i for i, p in enumerate(self._pins)
-                         if x1 <= p[0] <= x2 and y1 <= p[1] <= y2],
-                        dtype=np.int32)
+        return self._index.inside_rectangle(self.arr(), x1, y1, x2, y2)
 
     def set_add_selection_mode(self, value: bool) -> None:
         _log.green(f'set_add_selection_mode: {value}')
@@ -166,16 +276,25 @@ class KTScreenPins:
 
     def remove_pin(self, index: int) -> None:
         _log.output(f'remove_pin: {index}')
-        pins = self.arr()
-        if index >= len(pins):
+        self.remove_pins([index])
+
+    def remove_pins(self, indices: Any) -> None:
+        ''' Selection and disabled state of the rest pins moves with them '''
+        indices = np.asarray(indices, dtype=np.int32).ravel()
+        indices = indices[(indices >= 0) & (indices < self._count)]
+        if len(indices) == 0:
             return
-        self._selected_pins = np.array([x if x < index else x - 1
-                                        for x in self._selected_pins
-                                        if x != index], dtype=np.int32)
-        self._disabled_pins = np.array([x if x < index else x - 1
-                                        for x in self._disabled_pins
-                                        if x != index], dtype=np.int32)
-        self.set_pins(np.delete(pins, index, axis=0))
+        keep = np.ones((self._capacity(),), dtype=bool)
+        keep[indices] = False
+        new_count = int(keep[:self._count].sum())
+        self._buffer[:new_count] = self._buffer[:self._count][keep[:self._count]]
+        self._count = new_count
+        for name in ('_selected_mask', '_disabled_mask'):
+            mask = getattr(self, name)
+            kept = mask[keep]
+            mask[:] = False
+            mask[:len(kept)] = kept
+        self._index.invalidate()
 
     def move_pin_mode(self) -> bool:
         return self._move_pin_mode
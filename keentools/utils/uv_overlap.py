@@ -0,0 +1,138 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+# KeenTools for blender is a blender addon for using KeenTools in Blender.
+# Copyright (C) 2024 KeenTools
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ##### END GPL LICENSE BLOCK #####
+
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from bpy.types import Object
+
+from .kt_logging import KTLogger
+from .mesh_builder import array_digest, get_mesh_loop_uvs
+
+
+_log = KTLogger(__name__)
+
+
+_overlap_epsilon: float = 1e-6
+_max_pairs_per_chunk: int = 1000000
+
+
+def _loop_triangles(mesh: Any) -> Tuple[Any, Any]:
+    ''' :return: loop indices (n, 3) and polygon index of every triangle '''
+    mesh.calc_loop_triangles()
+    tris_count = len(mesh.loop_triangles)
+    loops = np.empty((tris_count, 3), dtype=np.int32)
+    mesh.loop_triangles.foreach_get('loops', loops.ravel())
+    polygons = np.empty((tris_count,), dtype=np.int32)
+    mesh.loop_triangles.foreach_get('polygon_index', polygons)
+    return loops, polygons
+
+
+def _candidate_pairs(mins: Any, maxs: Any) -> Any:
+    ''' Sweep over x-sorted bounding boxes.
+        :return: (m, 2) triangle pairs which boxes overlap '''
+    order = np.argsort(mins[:, 0], kind='stable')
+    sorted_xmin = mins[order, 0]
+    start = np.arange(1, len(order) + 1)
+    stop = np.searchsorted(sorted_xmin, maxs[order, 0], side='left')
+    counts = np.maximum(stop - start, 0)
+
+    pairs = []
+    first = 0
+    while first < len(order):
+        cumulative = np.cumsum(counts[first:])
+        last = first + max(1, int(np.searchsorted(cumulative,
+                                                  _max_pairs_per_chunk)))
+        chunk_counts = counts[first:last]
+        total = int(chunk_counts.sum())
+        if total > 0:
+            rows = np.repeat(np.arange(first, last), chunk_counts)
+            cols = np.arange(total) - \
+                np.repeat(np.cumsum(chunk_counts) - chunk_counts,
+                          chunk_counts) + \
+                np.repeat(start[first:last], chunk_counts)
+            a = order[rows]
+            b = order[cols]
+            keep = (mins[a, 1] < maxs[b, 1]) & (mins[b, 1] < maxs[a, 1])
+            pairs.append(np.stack((a[keep], b[keep]), axis=1))
+        first = last
+
+    if len(pairs) == 0:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.concatenate(pairs)
+
+
+def _edge_axes(tris: Any) -> Any:
+    edges = tris[:, [1, 2, 0]] - tris
+    axes = np.stack((-edges[:, :, 1], edges[:, :, 0]), axis=2)
+    lengths = np.linalg.norm(axes, axis=2)
+    lengths[lengths == 0] = 1.0
+    return axes / lengths[:, :, np.newaxis]
+
+
+def _triangles_overlap(tris_a: Any, tris_b: Any) -> Any:
+    ''' Separating axis test, touching triangles do not overlap '''
+    axes = np.concatenate((_edge_axes(tris_a), _edge_axes(tris_b)), axis=1)
+    proj_a = np.einsum('mkd,mvd->mkv', axes, tris_a)
+    proj_b = np.einsum('mkd,mvd->mkv', axes, tris_b)
+    overlap = np.minimum(proj_a.max(axis=2), proj_b.max(axis=2)) - \
+        np.maximum(proj_a.min(axis=2), proj_b.min(axis=2))
+    return np.all(overlap > _overlap_epsilon, axis=1)
+
+
+def find_overlapping_uv_polygons(uvs: Any, loops: Any,
+                                 polygons: Any) -> Any:
+    ''' :param uvs: (n, 2) UV of every loop
+        :param loops: (t, 3) loop indices of triangles
+        :param polygons: (t,) polygon index of every triangle
+        :return: sorted indices of polygons which UVs overlap others '''
+    if len(loops) < 2:
+        return np.empty((0,), dtype=np.int32)
+    tris = uvs[loops].astype(np.float64)
+    pairs = _candidate_pairs(tris.min(axis=1), tris.max(axis=1))
+    pairs = pairs[polygons[pairs[:, 0]] != polygons[pairs[:, 1]]]
+    if len(pairs) == 0:
+        return np.empty((0,), dtype=np.int32)
+    overlapped = _triangles_overlap(tris[pairs[:, 0]], tris[pairs[:, 1]])
+    return np.unique(polygons[pairs[overlapped]]).astype(np.int32)
+
+
+_overlap_cache: Dict[int, Tuple[str, Any]] = {}
+
+
+def get_overlapping_uv_polygons(obj: Object) -> Optional[Any]:
+    ''' Overlapping polygons of the active UV map, None without UV map.
+        The result is kept until UVs or triangulation change '''
+    if obj.mode == 'EDIT':
+        obj.update_from_editmode()
+    mesh = obj.data
+    uvs = get_mesh_loop_uvs(mesh)
+    if uvs is None:
+        return None
+    loops, polygons = _loop_triangles(mesh)
+
+    key = obj.as_pointer()
+    digest = array_digest(uvs, loops, polygons)
+    cached = _overlap_cache.get(key)
+    if cached is not None and cached[0] == digest:
+        return cached[1]
+
+    result = find_overlapping_uv_polygons(uvs, loops, polygons)
+    _log.output(f'get_overlapping_uv_polygons: {len(result)}')
+    _overlap_cache[key] = (digest, result)
+    return result
@@ -0,0 +1,454 @@
+# -------
+# KeenTools for Blender performance benchmarks
+# start it from commandline:
+# blender -b -P /full_path_to/benchmark_test.py
+# -------
+from typing import Any, Callable, List
+import unittest
+import sys
+import os
+import time
+import math
+from types import SimpleNamespace
+
+import numpy as np
+import bpy
+from bpy.types import SpaceView3D
+
+# Import test functions used in unit-tests started from any location
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import test_utils
+
+from keentools.utils.kt_logging import KTLogger
+from keentools.blender_independent_packages.pykeentools_loader import (
+    module as pkt_module)
+from keentools.addon_config import Config
+from keentools.geotracker_config import GTConfig
+from keentools.facebuilder_config import FBConfig
+from keentools.utils.coords import (get_scale_matrix_3x3_from_matrix_world,
+                                    get_mesh_verts,
+                                    xz_to_xy_rotation_matrix_3x3,
+                                    frame_to_image_space,
+                                    image_space_to_region,
+                                    frame_to_region_array)
+from keentools.utils.edges import KTEdgeShader2D
+from keentools.utils.mesh_builder import build_geo
+from keentools.utils.bpy_common import (bpy_shape_key_move_bottom,
+                                        bpy_shape_key_move_up)
+from keentools.utils.images import np_array_from_bpy_image
+from keentools.utils.detect_faces import (get_cached_detected_faces,
+                                          cache_detected_faces,
+                                          reset_detected_faces_cache)
+from keentools.facebuilder.fbloader import FBLoader
+from keentools.tracker.tracking_blendshapes import (
+    get_frame_shape_name,
+    get_all_tracking_frame_shapes,
+    get_frame_shape_index,
+    invalidate_frame_shape_index,
+    append_frame_shape_to_index,
+    reorder_tracking_frames,
+    bubble_frame_shape)
+
+
+_log = KTLogger(__name__)
+
+
+class BenchmarkConfig:
+    frame_shapes_count = 2000
+    build_geo_face_counts = [10_000, 100_000, 500_000]
+    residual_pins_count = 1000
+    residual_repeats = 100
+    render_size = (1920, 1080)
+    camera_border = (100.0, 50.0, 1100.0, 612.5)
+    detection_photo_pixels = 24_000_000
+    faces_on_test_render = 3
+    detection_max_pixels = 2_000_000
+
+
+def timeit(func: Callable, *args, **kwargs) -> float:
+    start_time = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start_time
+
+
+def new_scene() -> None:
+    bpy.ops.wm.read_homefile(app_template='')
+
+
+def create_frame_shapes_object(frames: List[int]) -> Any:
+    bpy.ops.mesh.primitive_cube_add()
+    obj = bpy.context.object
+    obj.shape_key_add(name='Basis', from_mix=False)
+    for frame in frames:
+        obj.shape_key_add(name=get_frame_shape_name(frame), from_mix=False)
+    invalidate_frame_shape_index(obj)
+    return obj
+
+
+def frame_shape_order(obj: Any) -> List[int]:
+    key_blocks = obj.data.shape_keys.key_blocks
+    return [int(kb.name[6:]) for kb in get_all_tracking_frame_shapes(key_blocks)]
+
+
+def legacy_reorder_tracking_frames(obj: Any) -> None:
+    key_blocks = obj.data.shape_keys.key_blocks
+    pairs = sorted([(int(kb.name[6:]), i) for i, kb in enumerate(key_blocks)
+                    if kb.name.startswith('frame_')])
+    indices = [x[1] for x in pairs]
+    for i, index in enumerate(indices):
+        offset = sum(1 for x in indices[:i] if x < index)
+        obj.active_shape_key_index = index - offset
+        bpy_shape_key_move_bottom(obj)
+
+
+def legacy_bubble_frame_shape(obj: Any, shape_index: int, frame: int) -> None:
+    key_blocks = obj.data.shape_keys.key_blocks
+    obj.active_shape_key_index = shape_index
+    current_index = shape_index
+    while current_index > 1 and \
+            int(key_blocks[current_index - 1].name[6:]) > frame:
+        bpy_shape_key_move_up(obj)
+        current_index -= 1
+
+
+def create_grid_object(face_count: int) -> Any:
+    side = int(math.sqrt(face_count))
+    bpy.ops.mesh.primitive_grid_add(x_subdivisions=side, y_subdivisions=side)
+    obj = bpy.context.object
+    obj.data.uv_layers.new()
+    return obj
+
+
+def legacy_build_geo(obj: Any, get_uv: bool = False) -> Any:
+    mb = pkt_module().MeshBuilder()
+    geo = pkt_module().Geo()
+    mesh = obj.data
+    scale = get_scale_matrix_3x3_from_matrix_world(obj.matrix_world)
+    verts = get_mesh_verts(mesh) @ scale
+    mb.add_points(verts @ xz_to_xy_rotation_matrix_3x3())
+    for polygon in mesh.polygons:
+        mb.add_face(polygon.vertices[:])
+    if get_uv and mesh.uv_layers.active:
+        uvs = [np.array(v.uv) for v in mesh.uv_layers.active.data]
+        mb.set_uvs_attribute('VERTEX_BASED', uvs)
+    geo.add_mesh(mb.mesh())
+    return geo
+
+
+class BuildGeoBenchmark(unittest.TestCase):
+    def test_build_geo(self) -> None:
+        new_scene()
+        for face_count in BenchmarkConfig.build_geo_face_counts:
+            obj = create_grid_object(face_count)
+            legacy_time = timeit(legacy_build_geo, obj, get_uv=True)
+            new_time = timeit(build_geo, obj, get_uv=True)
+            _log.info(f'build_geo {len(obj.data.polygons)} faces: '
+                      f'legacy {legacy_time:.3f}s -> {new_time:.3f}s')
+            geo = build_geo(obj, get_uv=True)
+            self.assertEqual(geo.mesh(0).points_count(),
+                             len(obj.data.vertices))
+            self.assertEqual(geo.mesh(0).faces_count(),
+                             len(obj.data.polygons))
+            bpy.data.objects.remove(obj)
+
+
+def legacy_gt_residuals(wire: Any, vv: Any, p2d: Any,
+                        disabled_pins: Any) -> None:
+    rx, ry = BenchmarkConfig.render_size
+    x1, y1, x2, y2 = BenchmarkConfig.camera_border
+    residual_count = len(vv)
+    verts = np.empty((residual_count * 2, 2), dtype=np.float32)
+    for i, v in enumerate(vv):
+        x, y = frame_to_image_space(v[0], v[1], rx, ry)
+        verts[i * 2] = image_space_to_region(x, y, x1, y1, x2, y2)
+        verts[i * 2 + 1] = p2d[i][:2]
+    wire.edge_lengths = np.full((residual_count, 2),
+                                (0.0, Config.residual_dashed_line_length),
+                                dtype=np.float32).ravel()
+    wire.vertices = verts
+    wire.vertex_colors = np.full((residual_count * 2, 4),
+                                 GTConfig.residual_color, dtype=np.float32)
+    points_count = len(wire.vertex_colors)
+    hidden_color = (*GTConfig.residual_color[:3], 0.0)
+    for i in [x for x in disabled_pins if 2 * x < points_count]:
+        wire.vertex_colors[i * 2] = hidden_color
+        wire.vertex_colors[i * 2 + 1] = hidden_color
+
+
+def gt_residuals(wire: Any, vv: Any, p2d: Any, disabled_pins: Any) -> None:
+    wire.set_residual_lines(
+        frame_to_region_array(vv[:, :2], *BenchmarkConfig.render_size,
+                              *BenchmarkConfig.camera_border),
+        p2d, GTConfig.residual_color, Config.residual_dashed_line_length,
+        disabled_pins)
+
+
+def legacy_fb_residuals(wire: Any, kt_pins: List) -> None:
+    rx, ry = BenchmarkConfig.render_size
+    x1, y1, x2, y2 = BenchmarkConfig.camera_border
+    verts_count = len(kt_pins)
+    verts = np.empty((verts_count * 2, 2), dtype=np.float32)
+    for i, pin in enumerate(kt_pins):
+        x, y = frame_to_image_space(*pin.img_pos, rx, ry)
+        verts[i * 2] = image_space_to_region(x, y, x1, y1, x2, y2)
+        x, y = frame_to_image_space(*pin.surface_point, rx, ry)
+        verts[i * 2 + 1] = image_space_to_region(x, y, x1, y1, x2, y2)
+    wire.vertices = verts
+    wire.vertex_colors = np.full((verts_count * 2, 4),
+                                 FBConfig.residual_color, dtype=np.float32)
+    wire.edge_lengths = np.full((verts_count, 2), (0.0, 22.0),
+                                dtype=np.float32).ravel()
+
+
+def fb_residuals(wire: Any, kt_pins: List) -> None:
+    args = (*BenchmarkConfig.render_size, *BenchmarkConfig.camera_border)
+    wire.set_residual_lines(
+        frame_to_region_array([pin.img_pos for pin in kt_pins], *args),
+        frame_to_region_array([pin.surface_point for pin in kt_pins], *args),
+        FBConfig.residual_color, Config.residual_dashed_line_length)
+
+
+def repeat(func: Callable, *args) -> None:
+    for _ in range(BenchmarkConfig.residual_repeats):
+        func(*args)
+
+
+class ResidualsBenchmark(unittest.TestCase):
+    def _compare_wires(self, legacy_wire: Any, wire: Any) -> None:
+        np.testing.assert_allclose(legacy_wire.vertices, wire.vertices,
+                                   rtol=1e-5, atol=1e-3)
+        np.testing.assert_allclose(legacy_wire.vertex_colors,
+                                   wire.vertex_colors)
+        np.testing.assert_allclose(legacy_wire.edge_lengths,
+                                   wire.edge_lengths)
+
+    def test_geotracker_residuals(self) -> None:
+        count = BenchmarkConfig.residual_pins_count
+        rx, ry = BenchmarkConfig.render_size
+        vv = np.random.rand(count, 4).astype(np.float32) * (rx, ry, 1, 1)
+        p2d = np.random.rand(count, 2).astype(np.float32) * 1000
+        disabled_pins = np.arange(0, count, 7, dtype=np.int32)
+
+        legacy_wire = KTEdgeShader2D(SpaceView3D)
+        wire = KTEdgeShader2D(SpaceView3D)
+        legacy_time = timeit(repeat, legacy_gt_residuals, legacy_wire, vv, p2d,
+                             disabled_pins)
+        new_time = timeit(repeat, gt_residuals, wire, vv, p2d, disabled_pins)
+        _log.info(f'GeoTracker residuals {count} pins '
+                  f'x{BenchmarkConfig.residual_repeats}: '
+                  f'legacy {legacy_time:.3f}s -> {new_time:.3f}s')
+        self._compare_wires(legacy_wire, wire)
+
+    def test_facebuilder_residuals(self) -> None:
+        count = BenchmarkConfig.residual_pins_count
+        rx, ry = BenchmarkConfig.render_size
+        points = np.random.rand(count, 4) * (rx, ry, rx, ry)
+        kt_pins = [SimpleNamespace(img_pos=(p[0], p[1]),
+                                   surface_point=(p[2], p[3]))
+                   for p in points]
+
+        legacy_wire = KTEdgeShader2D(SpaceView3D)
+        wire = KTEdgeShader2D(SpaceView3D)
+        legacy_time = timeit(repeat, legacy_fb_residuals, legacy_wire, kt_pins)
+        new_time = timeit(repeat, fb_residuals, wire, kt_pins)
+        _log.info(f'FaceBuilder residuals {count} pins '
+                  f'x{BenchmarkConfig.residual_repeats}: '
+                  f'legacy {legacy_time:.3f}s -> {new_time:.3f}s')
+        self._compare_wires(legacy_wire, wire)
+
+
+def nearest_upscale(np_img: Any, min_pixels: int) -> Any:
+    h, w = np_img.shape[:2]
+    factor = max(1, math.ceil(math.sqrt(min_pixels / (w * h))))
+    return np.repeat(np.repeat(np_img, factor, axis=0), factor, axis=1)
+
+
+def box_downscale(np_img: Any, max_pixels: int) -> Any:
+    h, w = np_img.shape[:2]
+    factor = max(1, math.ceil(math.sqrt(w * h / max_pixels)))
+    h2, w2 = h // factor, w // factor
+    return np_img[:h2 * factor, :w2 * factor].reshape(
+        (h2, factor, w2, factor, -1)).mean(axis=(1, 3), dtype=np.float32)
+
+
+def cached_detect_faces(fb: Any, key: Any, np_img: Any) -> Any:
+    faces = get_cached_detected_faces(key)
+    if faces is None:
+        faces = fb.detect_faces(np_img, 1.0)
+        cache_detected_faces(key, faces)
+    return faces
+
+
+class FaceDetectionBenchmark(unittest.TestCase):
+    def _detection_photo(self) -> Any:
+        ''' Rendered heads upscaled to the size of a camera photo '''
+        render_filepath = test_utils.create_head_images()[-1]
+        render = bpy.data.images.load(render_filepath)
+        np_img = nearest_upscale(np_array_from_bpy_image(render),
+                                 BenchmarkConfig.detection_photo_pixels)
+        bpy.data.images.remove(render)
+        h, w = np_img.shape[:2]
+        img = bpy.data.images.new('detection_photo', width=w, height=h,
+                                  alpha=True)
+        img.pixels.foreach_set(np_img.ravel())
+        return img
+
+    def test_detection_input(self) -> None:
+        img = self._detection_photo()
+        w, h = img.size[:]
+
+        read_time = timeit(np_array_from_bpy_image, img)
+        np_img = np_array_from_bpy_image(img)
+        downscale_time = timeit(box_downscale, np_img,
+                                BenchmarkConfig.detection_max_pixels)
+        small_img = box_downscale(np_img,
+                                  BenchmarkConfig.detection_max_pixels)
+        _log.info(f'detection input {w}x{h}: read {read_time:.3f}s, '
+                  f'downscale to {small_img.shape[1]}x{small_img.shape[0]} '
+                  f'{downscale_time:.3f}s')
+
+        fb = FBLoader.get_builder()
+        if not fb.is_face_detector_available():
+            bpy.data.images.remove(img)
+            return
+
+        full_time = timeit(fb.detect_faces, np_img, 1.0)
+        small_time = timeit(fb.detect_faces, small_img, 1.0)
+        _log.info(f'detect_faces {w}x{h}: {full_time:.3f}s, '
+                  f'{small_img.shape[1]}x{small_img.shape[0]}: '
+                  f'{small_time:.3f}s')
+        full_faces = fb.detect_faces(np_img, 1.0)
+        small_faces = fb.detect_faces(small_img, 1.0)
+        self.assertEqual(BenchmarkConfig.faces_on_test_render,
+                         len(full_faces))
+        self.assertEqual(len(full_faces), len(small_faces))
+        scale = np_img.shape[0] / small_img.shape[0]
+        tolerance = 0.05 * h
+        for full_face, small_face in zip(
+                sorted(full_faces, key=lambda x: x.xy_min[0]),
+                sorted(small_faces, key=lambda x: x.xy_min[0])):
+            for full_xy, small_xy in [(full_face.xy_min, small_face.xy_min),
+                                      (full_face.xy_max, small_face.xy_max)]:
+                self.assertLess(abs(full_xy[0] - small_xy[0] * scale),
+                                tolerance)
+                self.assertLess(abs(full_xy[1] - small_xy[1] * scale),
+                                tolerance)
+
+        reset_detected_faces_cache()
+        key = (img.name, w, h)
+        first_time = timeit(cached_detect_faces, fb, key, np_img)
+        cached_time = timeit(cached_detect_faces, fb, key, np_img)
+        _log.info(f'cached detect_faces {w}x{h}: '
+                  f'{first_time:.3f}s -> {cached_time:.6f}s')
+        self.assertLess(cached_time, first_time)
+        reset_detected_faces_cache()
+        bpy.data.images.remove(img)
+
+
+class FrameShapesBenchmark(unittest.TestCase):
+    def _middle_insertion_object(self) -> Any:
+        count = BenchmarkConfig.frame_shapes_count
+        frames = [x for x in range(1, 2 * count + 1, 2)]
+        return create_frame_shapes_object(frames + [count])
+
+    def test_reorder_tracking_frames(self) -> None:
+        new_scene()
+        obj = self._middle_insertion_object()
+        legacy_time = timeit(legacy_reorder_tracking_frames, obj)
+        bpy.data.objects.remove(obj)
+
+        obj = self._middle_insertion_object()
+        new_time = timeit(reorder_tracking_frames, obj)
+        _log.info(f'reorder_tracking_frames '
+                  f'{BenchmarkConfig.frame_shapes_count} shapes: '
+                  f'legacy {legacy_time:.3f}s -> {new_time:.3f}s')
+        order = frame_shape_order(obj)
+        self.assertEqual(sorted(order), order)
+
+    def test_bubble_frame_shape(self) -> None:
+        new_scene()
+        count = BenchmarkConfig.frame_shapes_count
+        for name, frame in [('middle', count), ('start', 0)]:
+            obj = self._middle_insertion_object()
+            key_blocks = obj.data.shape_keys.key_blocks
+            key_blocks[-1].name = get_frame_shape_name(frame)
+            legacy_time = timeit(legacy_bubble_frame_shape, obj,
+                                 len(key_blocks) - 1, frame)
+            bpy.data.objects.remove(obj)
+
+            obj = self._middle_insertion_object()
+            key_blocks = obj.data.shape_keys.key_blocks
+            key_blocks[-1].name = get_frame_shape_name(frame)
+            invalidate_frame_shape_index(obj)
+            new_time = timeit(bubble_frame_shape, obj,
+                              len(key_blocks) - 1, frame)
+            _log.info(f'bubble_frame_shape {count} shapes, {name}: '
+                      f'legacy {legacy_time:.3f}s -> {new_time:.3f}s')
+            order = frame_shape_order(obj)
+            self.assertEqual(sorted(order), order)
+            self.assertEqual(key_blocks[0].name, 'Basis')
+            self.assertEqual(get_frame_shape_index(key_blocks).frame_position(
+                frame), order.index(frame) + 1)
+            bpy.data.objects.remove(obj)
+
+    def test_bubble_earliest_frame_shape(self) -> None:
+        new_scene()
+        obj = create_frame_shapes_object([1, 2, 3, 4, 0])
+        key_blocks = obj.data.shape_keys.key_blocks
+        shape_index = bubble_frame_shape(obj, len(key_blocks) - 1, 0)
+        self.assertEqual([kb.name for kb in key_blocks],
+                         ['Basis'] + [get_frame_shape_name(x)
+                                      for x in range(5)])
+        self.assertEqual(shape_index, 1)
+        bpy.data.objects.remove(obj)
+
+    def test_bubble_tracking_sequence(self) -> None:
+        new_scene()
+        obj = create_frame_shapes_object([])
+        key_blocks = obj.data.shape_keys.key_blocks
+        count = BenchmarkConfig.frame_shapes_count
+
+        def _track_backwards():
+            for frame in range(count, 0, -1):
+                shape_name = get_frame_shape_name(frame)
+                obj.shape_key_add(name=shape_name, from_mix=False)
+                append_frame_shape_to_index(obj, shape_name)
+                bubble_frame_shape(obj, len(key_blocks) - 1, frame)
+
+        track_time = timeit(_track_backwards)
+        _log.info(f'bubble_frame_shape backward tracking {count} frames: '
+                  f'{track_time:.3f}s')
+        self.assertEqual(key_blocks[0].name, 'Basis')
+        self.assertEqual(frame_shape_order(obj), list(range(1, count + 1)))
+        bpy.data.objects.remove(obj)
+
+
+if __name__ == '__main__':
+    try:
+        from teamcity import is_running_under_teamcity
+        from teamcity.unittestpy import TeamcityTestRunner
+        runner = TeamcityTestRunner()
+        _log.info('Teamcity TeamcityTestRunner is active')
+    except ImportError:
+        _log.error('ImportError: Teamcity is not installed')
+        runner = unittest.TextTestRunner()
+        _log.error('Unittest TextTestRunner is active')
+    except Exception:
+        _log.error('Unhandled error with Teamcity')
+        runner = unittest.TextTestRunner()
+        _log.error('Unittest TextTestRunner is active')
+
+    test_utils.clear_test_dir()
+    test_utils.create_test_dir()
+
+    suite = unittest.TestSuite()
+    for test_case in [FrameShapesBenchmark, BuildGeoBenchmark,
+                      ResidualsBenchmark, FaceDetectionBenchmark]:
+        suite.addTests(unittest.defaultTestLoader.loadTestsFromTestCase(
+            test_case))
+    result = runner.run(suite)
+
+    _log.info('Results: {}'.format(result))
+    if len(result.errors) != 0 or len(result.failures) != 0:
+        raise Exception('Test errors: {} failures: {}'.format(result.errors,
+                                                              result.failures))
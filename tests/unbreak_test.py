@@ -0,0 +1,157 @@
+# -------
+# Euler continuity tests, Blender is not required:
+# python -m unittest /full_path_to/unbreak_test.py
+# Inside Blender the result is also compared with the per-frame
+# pykeentools unbreak_rotation path:
+# blender -b -P /full_path_to/unbreak_test.py
+# -------
+from typing import Any
+import unittest
+import importlib.util
+import os
+from math import pi
+
+import numpy as np
+
+
+def _load_euler_module() -> Any:
+    ''' keentools package import needs bpy, so the module is loaded by path '''
+    path = os.path.join(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__))), 'keentools', 'utils', 'euler.py')
+    spec = importlib.util.spec_from_file_location('kt_euler', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+euler = _load_euler_module()
+
+
+def _pkt_unbreak_rotation() -> Any:
+    try:
+        from keentools.blender_independent_packages.pykeentools_loader import (
+            module as pkt_module)
+        return pkt_module().math.unbreak_rotation
+    except Exception:
+        return None
+
+
+def euler_xyz_to_matrix(rot: Any) -> np.ndarray:
+    x, y, z = rot
+    rx = np.array([[1, 0, 0],
+                   [0, np.cos(x), -np.sin(x)],
+                   [0, np.sin(x), np.cos(x)]])
+    ry = np.array([[np.cos(y), 0, np.sin(y)],
+                   [0, 1, 0],
+                   [-np.sin(y), 0, np.cos(y)]])
+    rz = np.array([[np.cos(z), -np.sin(z), 0],
+                   [np.sin(z), np.cos(z), 0],
+                   [0, 0, 1]])
+    return rz @ ry @ rx
+
+
+def nearest_equivalent(prev: np.ndarray, current: np.ndarray) -> np.ndarray:
+    ''' Per-frame reference: 2*pi shifts and Euler flip of current
+        closest to prev '''
+    best = None
+    best_cost = None
+    for candidate in (current, euler.flip_euler_xyz(current[None])[0]):
+        shifted = candidate + 2 * pi * np.round((prev - candidate) / (2 * pi))
+        cost = np.sum((shifted - prev) ** 2)
+        if best_cost is None or cost < best_cost:
+            best, best_cost = shifted, cost
+    return best
+
+
+def per_frame_unbreak(rotations: np.ndarray, unbreak_func: Any) -> np.ndarray:
+    result = [rotations[0]]
+    for current in rotations[1:]:
+        result.append(np.array(unbreak_func(result[-1], current),
+                               dtype=np.float64))
+    return np.array(result)
+
+
+def broken_sequence(smooth: np.ndarray, seed: int) -> np.ndarray:
+    ''' The same rotations with random Euler flips and 2*pi shifts,
+        the first row is kept '''
+    rng = np.random.default_rng(seed)
+    count = len(smooth)
+    flipped = rng.random(count) < 0.5
+    flipped[0] = False
+    broken = np.where(flipped[:, None], euler.flip_euler_xyz(smooth), smooth)
+    shifts = rng.integers(-2, 3, size=(count, 3))
+    broken = euler.wrap_angles(broken + 2 * pi * shifts)
+    broken[0] = smooth[0]
+    return broken
+
+
+def random_rotations(count: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-pi, pi, size=(count, 3))
+
+
+class UnbreakEulerTest(unittest.TestCase):
+    def assert_same_rotations(self, first: np.ndarray,
+                              second: np.ndarray) -> None:
+        for a, b in zip(first, second):
+            np.testing.assert_allclose(euler_xyz_to_matrix(a),
+                                       euler_xyz_to_matrix(b), atol=1e-9)
+
+    def test_short_sequences(self):
+        self.assertEqual(euler.unbreak_euler_array(np.empty((0, 3))).shape,
+                         (0, 3))
+        single = np.array([[4.0, 0.5, -4.0]])
+        np.testing.assert_array_equal(euler.unbreak_euler_array(single),
+                                      single)
+
+    def test_wrap_across_pi(self):
+        z = np.array([2.9, 3.05, -3.1, -2.95, 3.0, 2.8])
+        rotations = np.column_stack((np.full(len(z), 0.2),
+                                     np.full(len(z), 0.1), z))
+        result = euler.unbreak_euler_array(rotations)
+        np.testing.assert_allclose(result[:, :2], rotations[:, :2])
+        np.testing.assert_allclose(
+            result[:, 2], [2.9, 3.05, 2 * pi - 3.1, 2 * pi - 2.95,
+                           3.0, 2.8])
+        self.assertTrue(np.all(np.abs(np.diff(result, axis=0)) < pi))
+
+    def test_flip_is_restored(self):
+        t = np.linspace(0, 1, 200)
+        smooth = np.column_stack((4 * pi * t, 0.3 * np.sin(6 * t),
+                                  -3 * pi * t + 0.5))
+        broken = broken_sequence(smooth, seed=1)
+        self.assert_same_rotations(broken, smooth)
+
+        result = euler.unbreak_euler_array(broken)
+        np.testing.assert_allclose(result, smooth, atol=1e-9)
+
+    def test_keeps_rotations(self):
+        rotations = random_rotations(500, seed=2)
+        result = euler.unbreak_euler_array(rotations)
+        np.testing.assert_array_equal(result[0], rotations[0])
+        self.assert_same_rotations(result, rotations)
+
+    def test_greedy_branch_matches_per_frame(self):
+        for seed in range(10):
+            rotations = random_rotations(300, seed=seed)
+            expected = per_frame_unbreak(rotations, nearest_equivalent)
+            np.testing.assert_allclose(
+                euler.unbreak_euler_array(rotations), expected, atol=1e-9)
+
+    @unittest.skipIf(_pkt_unbreak_rotation() is None,
+                     'pykeentools is not available')
+    def test_matches_pykeentools_unbreak(self):
+        unbreak_rotation = _pkt_unbreak_rotation()
+        for seed in range(3):
+            rotations = random_rotations(300, seed=seed)
+            expected = per_frame_unbreak(rotations, unbreak_rotation)
+            np.testing.assert_allclose(
+                euler.unbreak_euler_array(rotations), expected, atol=1e-5)
+
+
+if __name__ == '__main__':
+    suite = unittest.defaultTestLoader.loadTestsFromTestCase(UnbreakEulerTest)
+    result = unittest.TextTestRunner().run(suite)
+    if len(result.errors) != 0 or len(result.failures) != 0:
+        raise Exception('Test errors: {} failures: {}'.format(result.errors,
+                                                              result.failures))